@@ -0,0 +1,206 @@
+"""This script benchmarks the acquisition pipeline end to end using the
+simulated instruments from ``turbinedaq.sim``.
+
+The NI, ACS, AFT, and FBG DAQ threads are run against the simulators in real
+time for each duration, with the turbine and carriage moving, and then their
+data is saved as after a run. For each run the callback latency percentiles,
+memory growth, dropped samples, and save time are reported, e.g., to check if
+the NI DAQ can keep up at 5 kHz::
+
+    python scripts/benchmark_acquisition.py --ni-sample-rates 2000 5000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from turbinedaq import sim
+
+# Replace the instruments with simulators before anything imports them
+sim.install()
+
+from acspy import acsc
+
+from turbinedaq import daqtasks, writers
+
+DURATIONS = [30.0, 300.0, 1800.0]
+SCENARIOS = ["cft", "aft"]
+FBG_PROPERTIES = {
+    "strain1": {"sensor type": "strain", "position": 0},
+    "strain2": {"sensor type": "strain", "position": 1},
+}
+
+
+def process_memory_mb():
+    """Return the memory used by this process in MB, or NaN if it can't be
+    measured.
+
+    If ``psutil`` isn't installed the peak resident set size is used, which
+    is only available on Unix.
+    """
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return np.nan
+    # This is in kB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def buffer_mb(data):
+    """Return the memory allocated by a ``DataBuffer`` in MB."""
+    return sum(data.capacity(key) for key in data) * data.dtype.itemsize / 1e6
+
+
+def time_calls(obj, name, durations):
+    """Wrap method ``name`` of ``obj`` so the duration of each call is
+    appended to the list ``durations``.
+    """
+    func = getattr(obj, name)
+
+    def timed(*args, **kwargs):
+        t0 = time.perf_counter()
+        result = func(*args, **kwargs)
+        durations.append(time.perf_counter() - t0)
+        return result
+
+    setattr(obj, name, timed)
+
+
+def percentiles(values, prefix):
+    """Return a dict of the 50th, 95th, and 99th percentile and maximum of
+    ``values`` in ms.
+    """
+    values = np.asarray(values) * 1000
+    if not values.size:
+        values = np.array([np.nan])
+    return {
+        f"{prefix}_p50_ms": np.percentile(values, 50),
+        f"{prefix}_p95_ms": np.percentile(values, 95),
+        f"{prefix}_p99_ms": np.percentile(values, 99),
+        f"{prefix}_max_ms": np.max(values),
+    }
+
+
+def start_motion(hc, turbine_axis):
+    """Spin the turbine at 60 RPM and tow the carriage at 1 m/s."""
+    for axis in [turbine_axis, 5]:
+        acsc.enable(hc, axis)
+    acsc.jog(hc, acsc.AMF_VELOCITY, turbine_axis, 60.0)
+    acsc.jog(hc, acsc.AMF_VELOCITY, 5, 1.0)
+
+
+def benchmark(scenario, duration, ni_sample_rate, savedir):
+    """Run the DAQ threads for one scenario and return a dict of results."""
+    hc = acsc.open_comm_simulator()
+    acs_durations = []
+    if scenario == "cft":
+        start_motion(hc, 4)
+        nithread = daqtasks.NiDaqThread(
+            usetrigger=False, duration=duration, sample_rate=ni_sample_rate
+        )
+        acsthread = daqtasks.AcsDaqThread(hc, makeprg=True)
+        fbgthread = daqtasks.FbgDaqThread(FBG_PROPERTIES)
+    else:
+        start_motion(hc, 6)
+        nithread = daqtasks.AftNiDaqThread(usetrigger=False, duration=duration)
+        acsthread = daqtasks.AftAcsDaqThread(hc, makeprg=True)
+        fbgthread = None
+    time_calls(acsthread, "read_rows", acs_durations)
+    threads = [t for t in [nithread, acsthread, fbgthread] if t is not None]
+    mem0 = process_memory_mb()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    nithread.clear()
+    acsthread.stop()
+    if fbgthread is not None:
+        fbgthread.stop()
+    for thread in threads:
+        thread.wait()
+    mem1 = process_memory_mb()
+    acsc.closeComm(hc)
+    # Latency is measured from when each block of samples was acquired to
+    # when the callback finished processing it
+    log = np.array(nithread.analogtask.callback_log).reshape(-1, 3)
+    block_period = nithread.nsamps / nithread.sr
+    ni_latency = log[:, 2] - log[:, 0]
+    ni_samples = len(nithread.data["time"])
+    results = {
+        "scenario": scenario,
+        "duration_s": duration,
+        "ni_sample_rate": nithread.sr,
+        **percentiles(ni_latency, "ni_latency"),
+        **percentiles(log[:, 2] - log[:, 1], "ni_callback"),
+        "ni_late_callbacks": int(np.sum(ni_latency > block_period)),
+        # Samples the clock acquired that never made it into the data
+        "ni_dropped": nithread.analogtask.nsamps_acquired - ni_samples,
+        **percentiles(acs_durations, "acs_read"),
+        "acs_dropped": acsthread.missing_samples,
+        "acs_overruns": acsthread.overruns,
+        "mem_growth_mb": mem1 - mem0,
+        "buffer_mb": buffer_mb(nithread.data) + buffer_mb(acsthread.data),
+    }
+    rawdata = {"nidata.h5": nithread.data, "acsdata.h5": acsthread.data}
+    if fbgthread is not None:
+        results["fbg_samples"] = len(fbgthread.data["time"])
+        rawdata["fbgdata.h5"] = fbgthread.data
+    t0 = time.perf_counter()
+    for fname, data in rawdata.items():
+        writers.save_raw_data(savedir, fname, data)
+    results["save_time_s"] = time.perf_counter() - t0
+    results["size_mb"] = (
+        sum(os.path.getsize(os.path.join(savedir, f)) for f in rawdata) / 1e6
+    )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--durations",
+        type=float,
+        nargs="+",
+        default=DURATIONS,
+        help="Run durations (s)",
+    )
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=SCENARIOS,
+        default=SCENARIOS,
+        help="Turbine types to simulate",
+    )
+    parser.add_argument(
+        "--ni-sample-rates",
+        type=float,
+        nargs="+",
+        default=[2000.0],
+        help="NI DAQ sample rates (Hz) for CFT runs",
+    )
+    parser.add_argument("--output", help="CSV file for saving results")
+    args = parser.parse_args()
+    results = []
+    for scenario in args.scenarios:
+        # The AFT NI DAQ sample rate is fixed
+        rates = args.ni_sample_rates if scenario == "cft" else [None]
+        for sr in rates:
+            for duration in args.durations:
+                rate = f" at {sr} Hz" if sr is not None else ""
+                print(f"Running {scenario} for {duration} s{rate}")
+                with tempfile.TemporaryDirectory() as tmpdir:
+                    results.append(benchmark(scenario, duration, sr, tmpdir))
+    df = pd.DataFrame(results).set_index(["scenario", "ni_sample_rate"])
+    with pd.option_context("display.max_columns", None, "display.width", 0):
+        print(df.round(3).T)
+    if args.output is not None:
+        df.to_csv(args.output)
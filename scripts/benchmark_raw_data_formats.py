@@ -0,0 +1,77 @@
+"""This script benchmarks the raw data formats on a synthetic NI-DAQ run.
+
+Each format is used to write and read back a run sampled at 2 kHz with 8
+channels, and the write time, read time, and file size are reported.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from pxl import timeseries as ts
+
+from turbinedaq.writers import RAW_DATA_FORMATS, savehdf
+
+SAMPLE_RATE = 2000
+ANALOG_CHANNELS = [
+    "torque_trans",
+    "torque_arm",
+    "drag_left",
+    "drag_right",
+    "LF_left",
+    "LF_right",
+]
+
+
+def make_run(duration, sr=SAMPLE_RATE, seed=0):
+    """Create a dict of smooth, noisy signals resembling a turbine tow."""
+    rng = np.random.default_rng(seed)
+    n = int(duration * sr)
+    t = np.arange(n, dtype=float) / sr
+    omega = 2 * np.pi * 1.5
+    data = {"time": t}
+    for i, chan in enumerate(ANALOG_CHANNELS):
+        signal = 10 * np.sin(omega * t + i) + 2 * np.sin(3 * omega * t)
+        noise = rng.normal(scale=0.05, size=n)
+        # Quantize to 24-bit resolution over a +/- 100 unit range
+        data[chan] = np.round((signal + noise) / 200 * 2**24) * 200 / 2**24
+    data["carriage_pos"] = np.round(1.0 * t / 2.5e-5) * 2.5e-5
+    data["turbine_angle"] = np.round(omega * t * 180 / np.pi / 0.1) * 0.1
+    return data
+
+
+def benchmark(data, fmt, tmpdir):
+    fpath = os.path.join(tmpdir, f"nidata-{fmt}.h5")
+    t0 = time.perf_counter()
+    if fmt == "hdf5":
+        ts.savehdf(fpath, data)
+    else:
+        savehdf(fpath, data, fmt=fmt, float32_keys=ANALOG_CHANNELS)
+    write_time = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ts.loadhdf(fpath)
+    read_time = time.perf_counter() - t0
+    return {
+        "format": fmt,
+        "write_time_s": write_time,
+        "read_time_s": read_time,
+        "size_mb": os.path.getsize(fpath) / 1e6,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--duration", type=float, default=600.0, help="Run duration (s)"
+    )
+    args = parser.parse_args()
+    print(f"Creating {args.duration} s run at {SAMPLE_RATE} Hz")
+    data = make_run(args.duration)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results = [benchmark(data, fmt, tmpdir) for fmt in RAW_DATA_FORMATS]
+    df = pd.DataFrame(results).set_index("format")
+    df["size_ratio"] = df.size_mb / df.size_mb["hdf5"]
+    print(df.round(3))
@@ -0,0 +1,6 @@
+import os
+
+if os.environ.get("TURBINEDAQ_SIMULATE"):
+    from turbinedaq import sim
+
+    sim.install()
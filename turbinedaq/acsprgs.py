@@ -4,13 +4,15 @@ from __future__ import division, print_function
 
 import os
 
+import numpy as np
+
 
 AFT_TEMPLATE = """
 ! AUTO-GENERATED -- CHANGES WILL BE OVERWRITTEN
 ! Here we will try to continuously collect data from the INF4
 global int collect_data
 global real start_time
-local int sample_period_ms
+global real sample_period_ms
 sample_period_ms = {sample_period_ms}
 global real ch1_force, ch2_force, ch3_force, ch4_force
 global real aft_data(8)({n_buffer_rows})
@@ -38,7 +40,7 @@ local real target, tsr, U, rpm, tacc, endpos, tzero, R
 global real data(3)(100)
 global real start_time
 global int collect_data
-local int sample_period_ms
+global real sample_period_ms
 sample_period_ms = {sample_period_ms}
 global real ch1_force, ch2_force, ch3_force, ch4_force
 global real aft_data(8)({n_buffer_rows})
@@ -118,8 +120,16 @@ def turbine_tow_prg(
     endpos=0.0,
     prgdir="./acsprgs",
     turbine_type="CFT",
+    sample_period_ms=1.0,
+    n_buffer_rows=100,
 ):
-    """This function builds an ACSPL+ program for turbine towing."""
+    """This function builds an ACSPL+ program for turbine towing.
+
+    The controller data collection sample period and number of rows in its
+    cyclic buffer can be set with ``sample_period_ms`` and ``n_buffer_rows``,
+    and should match the settings of the thread reading the data.
+    """
+    check_dc_params(sample_period_ms, n_buffer_rows)
     if turbine_type == "CFT":
         with open(os.path.join(prgdir, "turbine_tow.prg")) as f:
             prg = f.read().format(
@@ -127,32 +137,61 @@ def turbine_tow_prg(
                 tsr=tsr,
                 turbine_radius=turbine_radius,
                 endpos=endpos,
+                sample_period_ms=sample_period_ms,
+                n_buffer_rows=n_buffer_rows,
             )
     elif turbine_type == "AFT":
         prg = AFT_TOW_TEMPLATE.format(
-            sample_period_ms=1,
+            sample_period_ms=sample_period_ms,
             tow_speed=tow_speed,
             tsr=tsr,
             turbine_radius=turbine_radius,
             endpos=endpos,
-            n_buffer_rows=100,
+            n_buffer_rows=n_buffer_rows,
         )
     return prg
 
 
-def tare_torque_prg(rpm, dur, prgdir="./acsprgs"):
+def tare_torque_prg(
+    rpm, dur, prgdir="./acsprgs", sample_period_ms=1.0, n_buffer_rows=100
+):
     """Builds a tare torque ACSPL+ program"""
+    check_dc_params(sample_period_ms, n_buffer_rows)
     with open(os.path.join(prgdir, "tare_torque.prg")) as f:
-        prg = f.read().format(rpm=rpm, dur=dur)
+        prg = f.read().format(
+            rpm=rpm,
+            dur=dur,
+            sample_period_ms=sample_period_ms,
+            n_buffer_rows=n_buffer_rows,
+        )
     return prg
 
 
-def tare_drag_prg(tow_speed, prgdir="./acsprgs"):
+def tare_drag_prg(
+    tow_speed, prgdir="./acsprgs", sample_period_ms=1.0, n_buffer_rows=100
+):
+    check_dc_params(sample_period_ms, n_buffer_rows)
     with open(os.path.join(prgdir, "tare_drag.prg")) as f:
-        prg = f.read().format(tow_speed=tow_speed)
+        prg = f.read().format(
+            tow_speed=tow_speed,
+            sample_period_ms=sample_period_ms,
+            n_buffer_rows=n_buffer_rows,
+        )
     return prg
 
 
+def check_dc_params(sample_period_ms, n_buffer_rows):
+    """Check that controller data collection parameters are valid."""
+    if not np.isfinite(sample_period_ms) or sample_period_ms <= 0:
+        raise ValueError("Sample period must be positive")
+    if (
+        not np.isfinite(n_buffer_rows)
+        or int(n_buffer_rows) != n_buffer_rows
+        or n_buffer_rows < 2
+    ):
+        raise ValueError("Number of buffer rows must be an integer >= 2")
+
+
 def make_aft_prg(sample_period_ms=2, n_buffer_rows=100) -> str:
     """Create an AFT program to load into the controller."""
     return AFT_TEMPLATE.format(
@@ -0,0 +1,166 @@
+"""Polling of ACS controller axis status."""
+
+import ctypes
+import time
+
+import numpy as np
+from acspy import acsc
+from acspy.acsc import AcscError
+from PyQt5 import QtCore
+
+# Controller axis number for each axis shown in the ACS table widget, in
+# order of the table rows
+AXES = {"tow": 5, "turbine": 4, "y": 0, "z": 1, "aft": 6}
+
+# Global variables incremented by the homing programs
+HOME_COUNTERS = {
+    "tow": "homeCounter_tow",
+    "turbine": "homeCounter_AKD",
+    "y": "homeCounter_y",
+    "z": "homeCounter_z",
+    "aft": "homeCounter_AFT",
+}
+
+
+def read_integer_array(hc, varname, from1, to1):
+    """Read a range of a 1-D integer array in a single transaction.
+
+    ``acsc.readInteger`` only returns scalars, so the library function is
+    called directly with a buffer large enough for the whole range.
+    """
+    values = np.zeros(to1 - from1 + 1, dtype=np.intc)
+    acsc.call_acsc(
+        acsc.acs.acsc_ReadInteger,
+        hc,
+        acsc.NONE,
+        varname.encode(),
+        from1,
+        to1,
+        acsc.NONE,
+        acsc.NONE,
+        values.ctypes.data_as(ctypes.POINTER(ctypes.c_int)),
+        acsc.SYNCHRONOUS,
+    )
+    return values
+
+
+def probe_integers(hc, varnames):
+    """Return the subset of ``varnames`` that exist as integer variables in
+    the controller.
+    """
+    available = []
+    for varname in varnames:
+        try:
+            acsc.readInteger(hc, acsc.NONE, varname)
+            available.append(varname)
+        except AcscError:
+            pass
+    return available
+
+
+def read_home_counters(hc, available, home_counters=HOME_COUNTERS):
+    """Read the home counters that are known to exist, using zero for the
+    rest.
+
+    Counters that can no longer be read, e.g., because their program buffer
+    was cleared, are removed from ``available``.
+    """
+    values = {}
+    for name, varname in home_counters.items():
+        values[name] = 0
+        if varname not in available:
+            continue
+        try:
+            values[name] = acsc.readInteger(hc, acsc.NONE, varname)
+        except AcscError:
+            available.remove(varname)
+    return values
+
+
+class AcsStatus(object):
+    """A snapshot of the status of each axis, with dicts keyed by the names
+    in ``AXES``.
+    """
+
+    def __init__(self, enabled, rpos, fpos, fvel):
+        self.enabled = enabled
+        self.rpos = rpos
+        self.fpos = fpos
+        self.fvel = fvel
+        self.time = time.time()
+
+
+def read_status(hc, axes=AXES):
+    """Read the status of all axes.
+
+    Rather than querying each axis separately, the motor state, reference
+    position, feedback position, and feedback velocity are each read as one
+    range of the corresponding ACSPL+ array.
+    """
+    first = min(axes.values())
+    last = max(axes.values())
+    mst = read_integer_array(hc, "MST", first, last)
+    rpos = acsc.readReal(hc, acsc.NONE, "RPOS", first, last)
+    fpos = acsc.readReal(hc, acsc.NONE, "FPOS", first, last)
+    fvel = acsc.readReal(hc, acsc.NONE, "FVEL", first, last)
+    return AcsStatus(
+        enabled={
+            name: bool(mst[ax - first] & acsc.MST_ENABLE)
+            for name, ax in axes.items()
+        },
+        rpos={name: rpos[ax - first] for name, ax in axes.items()},
+        fpos={name: fpos[ax - first] for name, ax in axes.items()},
+        fvel={name: fvel[ax - first] for name, ax in axes.items()},
+    )
+
+
+class AcsStatusThread(QtCore.QThread):
+    """Thread that periodically reads the status of all axes and publishes
+    it with the ``status_updated`` signal, so slow controller communication
+    doesn't stall the GUI.
+
+    Home counters only exist if the corresponding homing programs are
+    loaded, so they are probed once when the thread starts, and only those
+    that exist are read, at a lower rate than the motion state. The
+    ``home_counters_changed`` signal is emitted when any value changes.
+    """
+
+    status_updated = QtCore.pyqtSignal(object)
+    home_counters_changed = QtCore.pyqtSignal(dict)
+
+    def __init__(self, hc, interval=0.2, home_counter_interval=1.0):
+        QtCore.QThread.__init__(self)
+        self.hc = hc
+        self.interval = interval
+        self.home_counter_interval = home_counter_interval
+        self.polling = True
+        self.status = None
+        self.available_home_counters = []
+        self.home_counters = None
+
+    def update_home_counters(self):
+        values = read_home_counters(self.hc, self.available_home_counters)
+        if values != self.home_counters:
+            self.home_counters = values
+            self.home_counters_changed.emit(values)
+
+    def run(self):
+        self.available_home_counters = probe_integers(
+            self.hc, HOME_COUNTERS.values()
+        )
+        t_home_counters = 0.0
+        while self.polling:
+            tnext = time.time() + self.interval
+            try:
+                self.status = read_status(self.hc)
+                self.status_updated.emit(self.status)
+                if time.time() - t_home_counters >= self.home_counter_interval:
+                    t_home_counters = time.time()
+                    self.update_home_counters()
+            except AcscError as e:
+                print("Cannot read ACS status:", e)
+            while self.polling and time.time() < tnext:
+                time.sleep(0.02)
+
+    def stop(self):
+        self.polling = False
@@ -0,0 +1,120 @@
+"""Data buffers for storing samples as they are acquired."""
+
+from collections.abc import Mapping
+
+import numpy as np
+
+
+class DataBuffer(Mapping):
+    """A growable columnar store for acquired data.
+
+    Each column is kept in a preallocated array that doubles in size when
+    full, so appending is amortized O(1) instead of copying the entire
+    history every time like ``np.append``. Indexing the buffer by column name
+    returns a view of only the samples collected so far, so it can be used
+    anywhere a dict of arrays was used before, e.g., for plotting or saving
+    with ``pxl.timeseries.savehdf``.
+
+    Parameters
+    ----------
+    columns : list of str
+        Names of the data columns.
+    capacity : int
+        Initial number of samples to allocate for each column. This should
+        be estimated from the expected sample rate and run duration to avoid
+        reallocation during a run.
+    dtype : data-type
+        Data type of the stored arrays.
+
+    Attributes
+    ----------
+    generation : int
+        Counter incremented whenever the contents change, so consumers such
+        as plots can cheaply tell if there is anything new.
+    """
+
+    def __init__(self, columns, capacity=1024, dtype=float):
+        self.dtype = np.dtype(dtype)
+        self.generation = 0
+        self._arrays = {}
+        self._lengths = {}
+        capacity = max(int(capacity), 1)
+        for col in columns:
+            self._arrays[col] = np.empty(capacity, dtype=self.dtype)
+            self._lengths[col] = 0
+
+    def __getitem__(self, key):
+        return self._arrays[key][: self._lengths[key]]
+
+    def __iter__(self):
+        return iter(self._arrays)
+
+    def __len__(self):
+        return len(self._arrays)
+
+    def __repr__(self):
+        lengths = ", ".join(f"{k}: {n}" for k, n in self._lengths.items())
+        return f"{type(self).__name__}({{{lengths}}})"
+
+    def capacity(self, key):
+        """Return the number of samples currently allocated for a column."""
+        return len(self._arrays[key])
+
+    def _reserve(self, key, n):
+        """Make sure a column has room for at least ``n`` samples."""
+        arr = self._arrays[key]
+        if n <= len(arr):
+            return arr
+        newcap = len(arr)
+        while newcap < n:
+            newcap *= 2
+        new = np.empty(newcap, dtype=self.dtype)
+        new[: self._lengths[key]] = arr[: self._lengths[key]]
+        self._arrays[key] = new
+        return new
+
+    def append(self, key, values):
+        """Append an array of values to a single column."""
+        values = np.asarray(values)
+        n0 = self._lengths[key]
+        n1 = n0 + values.size
+        arr = self._reserve(key, n1)
+        arr[n0:n1] = values.ravel()
+        # Update the length last so readers never see unwritten samples
+        self._lengths[key] = n1
+        self.generation += 1
+
+    def extend(self, block):
+        """Append a dict of arrays, one entry per column."""
+        for key, values in block.items():
+            self.append(key, values)
+
+    def set(self, key, values):
+        """Replace the entire contents of a column."""
+        values = np.asarray(values)
+        arr = self._reserve(key, values.size)
+        arr[: values.size] = values.ravel()
+        self._lengths[key] = values.size
+        self.generation += 1
+
+    def put(self, key, start, values):
+        """Overwrite a column from index ``start`` onward, discarding any
+        samples after the new values.
+        """
+        values = np.asarray(values)
+        start = min(start, self._lengths[key])
+        n1 = start + values.size
+        arr = self._reserve(key, n1)
+        arr[start:n1] = values.ravel()
+        self._lengths[key] = n1
+        self.generation += 1
+
+    def clear(self):
+        """Remove all samples, keeping the allocated memory."""
+        for key in self._lengths:
+            self._lengths[key] = 0
+        self.generation += 1
+
+    def to_dict(self):
+        """Return a dict containing copies of each column."""
+        return {key: np.array(self[key]) for key in self}
@@ -0,0 +1,105 @@
+"""Cache of an experiment's configuration files.
+
+Files in the ``config`` subdirectory of the working directory, e.g., the
+settling times and turbine properties, are parsed the first time they're
+needed and kept in memory, so they aren't read and parsed again between every
+run. Each entry is reloaded when its file's modification time changes, so
+edits made while the GUI or run engine is open are still picked up.
+"""
+
+import copy
+import json
+import os
+
+from turbinedaq import testplan
+
+DEFAULT_TURBINE_PROPERTIES = {
+    "RVAT": {"kind": "CFT", "radius": 0.5, "height": 1.0},
+    "RM2": {"kind": "CFT", "diameter": 1.075, "height": 0.807},
+    "AFT": {"kind": "AFT", "diameter": 1.0, "height": 1.0},
+}
+
+
+def load_json(fpath):
+    with open(fpath) as f:
+        return json.load(f)
+
+
+class ConfigCache(object):
+    """Cache of the files in an experiment's ``config`` directory.
+
+    Parameters
+    ----------
+    wdir : str
+        Experiment working directory.
+    """
+
+    def __init__(self, wdir):
+        self.wdir = wdir
+        self.configdir = os.path.join(wdir, "config")
+        # Modification time and parsed contents for each file name
+        self.entries = {}
+
+    def path(self, fname):
+        return os.path.join(self.configdir, fname)
+
+    def get(self, fname, load, default=None):
+        """Return config file ``fname`` parsed with ``load``, or ``default``
+        if it doesn't exist.
+
+        ``load`` is called with the file path only if the file hasn't been
+        loaded yet or has been modified since.
+        """
+        fpath = self.path(fname)
+        try:
+            mtime = os.stat(fpath).st_mtime
+        except OSError:
+            self.entries.pop(fname, None)
+            return default
+        entry = self.entries.get(fname)
+        if entry is None or entry[0] != mtime:
+            entry = (mtime, load(fpath))
+            self.entries[fname] = entry
+        return entry[1]
+
+    def read_json(self, fname, default=None):
+        """Return a copy of a JSON config file's contents, so callers can
+        modify it without changing the cache.
+        """
+        return copy.deepcopy(self.get(fname, load_json, default))
+
+    def settling_time(self):
+        """Return a function interpolating the time in seconds for the tank
+        to settle after a tow from ``settling_times.csv``.
+        """
+        f_interp = self.get("settling_times.csv", testplan.load_settling_times)
+        if f_interp is None:
+            raise IOError(
+                "No settling times found in " + self.path("settling_times.csv")
+            )
+        return f_interp
+
+    def turbine_properties(self):
+        """Return the default turbine properties updated with those in
+        ``turbine_properties.json``, filling in radius or diameter if only
+        one is supplied.
+        """
+        turbine_properties = copy.deepcopy(DEFAULT_TURBINE_PROPERTIES)
+        turbine_properties.update(
+            self.read_json("turbine_properties.json", {})
+        )
+        for props in turbine_properties.values():
+            if "radius" not in props:
+                props["radius"] = props["diameter"] / 2
+            if "diameter" not in props:
+                props["diameter"] = props["radius"] * 2
+        return turbine_properties
+
+    def vectrino_properties(self):
+        return self.read_json("vectrino_properties.json", {})
+
+    def fbg_properties(self):
+        return self.read_json("fbg_properties.json", {})
+
+    def odisi_properties(self):
+        return self.read_json("odisi_properties.json", {})
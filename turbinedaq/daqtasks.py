@@ -1,5 +1,6 @@
 """DAQ tasks."""
 
+import threading
 import time
 import warnings
 
@@ -19,239 +20,450 @@ from nidaqmx.stream_readers import (
 from nidaqmx.system.storage.persisted_channel import (
     PersistedChannel as GlobalVirtualChannel,
 )
-from pxl import fdiff
-from pxl import timeseries as ts
 from PyQt5 import QtCore
 
+from turbinedaq import timing
 from turbinedaq.acsprgs import make_aft_prg
+from turbinedaq.buffers import DataBuffer
+from turbinedaq.streaming import SmoothedDerivative
 
+# Maximum sample rate of the analog input modules in S/s
+NI_MAX_SAMPLE_RATE = 50000.0
 
-class NiDaqThread(QtCore.QThread):
-    collecting = QtCore.pyqtSignal()
-    cleared = QtCore.pyqtSignal()
+# Callbacks more frequent than this can't keep up, since each one has to
+# read the tasks and append to the data buffers from Python
+NI_MIN_BLOCK_PERIOD = 0.01
 
-    def __init__(self, usetrigger=True):
-        QtCore.QThread.__init__(self)
-        # Some parameters for the thread
-        self.usetrigger = usetrigger
-        self.collect = True
-        # Create some meta data for the run
-        self.metadata = {}
-        # Initialize sample rate
-        self.sr = 2000
-        self.metadata["Sample rate (Hz)"] = self.sr
-        self.nsamps = int(self.sr / 10)
-        # Create a dict of arrays for storing data
-        self.data = {
-            "turbine_angle": np.array([]),
-            "turbine_rpm": np.array([]),
-            "torque_trans": np.array([]),
-            "torque_arm": np.array([]),
-            "drag_left": np.array([]),
-            "drag_right": np.array([]),
-            "time": np.array([]),
-            "carriage_pos": np.array([]),
-            "LF_left": np.array([]),
-            "LF_right": np.array([]),
-        }
-        # Create tasks
-        self.analogtask = nidaqmx.Task("analog-inputs")
-        self.carpostask = nidaqmx.Task("carriage-pos")
-        self.turbangtask = nidaqmx.Task("turbine-angle")
-        self.odisistarttask = nidaqmx.Task("odisi-start")
-        self.odisistarttask.do_channels.add_do_chan(
-            "/cDAQ9188-16D66BBMod1/port0/line0"
+
+def daqmx_buffer_size(sample_rate: float) -> int:
+    """Return the size of the input buffer in samples per channel that
+    DAQmx allocates for continuous acquisition at ``sample_rate``.
+    """
+    if sample_rate <= 100:
+        return 1000
+    elif sample_rate <= 10000:
+        return 10000
+    elif sample_rate <= 1000000:
+        return 100000
+    return 1000000
+
+
+def default_block_size(sample_rate: float) -> int:
+    """Return the number of samples read per callback for ``sample_rate``.
+
+    This is the largest divisor of the DAQmx buffer size that gives at most
+    10 callbacks per second.
+    """
+    bufsize = daqmx_buffer_size(sample_rate)
+    nsamps = max(int(sample_rate / 10), 1)
+    while bufsize % nsamps:
+        nsamps -= 1
+    return nsamps
+
+
+def validate_ni_timing(sample_rate: float, nsamps: int) -> int:
+    """Check that an NI DAQ sample rate and callback block size are
+    compatible with each other and the DAQmx input buffer, and return the
+    buffer size in samples per channel.
+
+    Raises
+    ------
+    ValueError
+        If the sample rate is out of range, the callbacks would be too
+        frequent, or the blocks don't evenly fill at least two halves of the
+        DAQmx buffer, in which case the every N samples event can't be
+        registered, or the buffer would overflow while a block is read.
+    """
+    if not 0 < sample_rate <= NI_MAX_SAMPLE_RATE:
+        raise ValueError(
+            f"NI sample rate must be between 0 and {NI_MAX_SAMPLE_RATE} Hz, "
+            f"not {sample_rate}"
         )
-        self.odisistoptask = nidaqmx.Task("odisi-stop")
-        self.odisistoptask.do_channels.add_do_chan(
-            "/cDAQ9188-16D66BBMod1/port0/line1"
+    if nsamps < 1 or nsamps / sample_rate < NI_MIN_BLOCK_PERIOD:
+        raise ValueError(
+            f"NI block size of {nsamps} samples at {sample_rate} Hz is "
+            f"shorter than {NI_MIN_BLOCK_PERIOD} s"
         )
-        # Add channels to tasks
-        self.analogchans = [
-            "torque_trans",
-            "torque_arm",
-            "drag_left",
-            "drag_right",
-            "LF_left",
-            "LF_right",
-        ]
-        self.carposchan = "carriage_pos"
-        self.turbangchan = "turbine_angle"
+    bufsize = daqmx_buffer_size(sample_rate)
+    if nsamps > bufsize // 2 or bufsize % nsamps:
+        raise ValueError(
+            f"NI block size of {nsamps} samples must evenly divide half the "
+            f"DAQmx buffer of {bufsize} samples at {sample_rate} Hz, e.g., "
+            f"{default_block_size(sample_rate)}"
+        )
+    return bufsize
+
+
+class NiTaskSet(object):
+    """DAQmx tasks for acquiring analog inputs and encoder counts on a
+    common sample clock.
+
+    The tasks are created and configured once, including querying the scales
+    for the channel info, so they can be started and stopped for any number
+    of runs. Each start re-arms the start triggers.
+
+    Parameters
+    ----------
+    analogchans : list of str
+        Global virtual analog input channel names.
+    counterchans : list of str
+        Global virtual encoder channel names, each of which gets its own
+        counter task. ``turbine_angle`` is an angular encoder and the rest
+        are linear.
+    sample_rate : float
+        Sample rate in Hz.
+    nsamps : int
+        Number of samples per callback.
+    usetrigger : bool
+        Whether to wait for the start trigger on chassis PFI0.
+    odisi : bool
+        Whether to create the digital output tasks that trigger the ODiSI
+        interrogator.
+    """
+
+    def __init__(
+        self,
+        analogchans,
+        counterchans,
+        sample_rate,
+        nsamps,
+        usetrigger,
+        odisi=False,
+    ):
+        self.analogchans = list(analogchans)
+        self.counterchans = list(counterchans)
+        self.sr = sample_rate
+        self.nsamps = nsamps
+        self.bufsize = validate_ni_timing(sample_rate, nsamps)
+        self.callback = None
+        # Create tasks and add channels
+        self.analogtask = nidaqmx.Task("analog-inputs")
         self.analogtask.add_global_channels(
             [GlobalVirtualChannel(c) for c in self.analogchans]
         )
-        self.carpostask.add_global_channels(
-            [GlobalVirtualChannel(self.carposchan)]
-        )
-        self.turbangtask.add_global_channels(
-            [GlobalVirtualChannel(self.turbangchan)]
-        )
-        # Get channel information to add to metadata
-        self.chaninfo = {}
-        for channame in self.analogchans:
-            self.chaninfo[channame] = {}
-            scale = channame + "_scale"
-            self.chaninfo[channame]["Scale name"] = scale
-            self.chaninfo[channame]["Scale slope"] = daqmx.GetScaleLinSlope(
-                scale
-            )
-            self.chaninfo[channame]["Scale y-intercept"] = (
-                daqmx.GetScaleLinYIntercept(scale)
-            )
-            self.chaninfo[channame]["Scaled units"] = (
-                daqmx.GetScaleScaledUnits(scale)
-            )
-            self.chaninfo[channame]["Prescaled units"] = (
-                daqmx.GetScalePreScaledUnits(scale)
-            )
-        self.chaninfo[self.turbangchan] = {}
-        self.chaninfo[self.turbangchan]["Pulses per rev"] = (
-            daqmx.GetCIAngEncoderPulsesPerRev(
-                self.turbangtask._handle, self.turbangchan
-            )
-        )
-        self.chaninfo[self.turbangchan]["Units"] = daqmx.GetCIAngEncoderUnits(
-            self.turbangtask._handle, self.turbangchan
-        )
-        self.chaninfo[self.carposchan] = {}
-        self.chaninfo[self.carposchan]["Distance per pulse"] = (
-            daqmx.GetCILinEncoderDisPerPulse(
-                self.carpostask._handle, self.carposchan
-            )
-        )
-        self.chaninfo[self.carposchan]["Units"] = daqmx.GetCILinEncoderUnits(
-            self.carpostask._handle, self.carposchan
-        )
-        self.metadata["Channel info"] = self.chaninfo
-        # Configure sample clock timing
+        self.countertasks = {}
+        for chan in self.counterchans:
+            task = nidaqmx.Task(chan.replace("_", "-"))
+            task.add_global_channels([GlobalVirtualChannel(chan)])
+            self.countertasks[chan] = task
+        self.odisitasks = {}
+        if odisi:
+            for name, line in [("start", "line0"), ("stop", "line1")]:
+                task = nidaqmx.Task("odisi-" + name)
+                task.do_channels.add_do_chan(
+                    "/cDAQ9188-16D66BBMod1/port0/" + line
+                )
+                self.odisitasks[name] = task
+        self.chaninfo = self.get_chaninfo()
+        # Configure sample clock timing, which in continuous mode also sets
+        # the buffer size
         daqmx.CfgSampClkTiming(
             self.analogtask._handle,
             "",
             self.sr,
             daqmx.Val_Rising,
             daqmx.Val_ContSamps,
-            self.nsamps,
+            self.bufsize,
         )
         # Get source for analog sample clock
         trigname = daqmx.GetTerminalNameWithDevPrefix(
             self.analogtask._handle, "ai/SampleClock"
         )
-        daqmx.CfgSampClkTiming(
-            self.carpostask._handle,
-            trigname,
-            self.sr,
-            daqmx.Val_Rising,
-            daqmx.Val_ContSamps,
-            self.nsamps,
-        )
-        daqmx.CfgSampClkTiming(
-            self.turbangtask._handle,
-            trigname,
-            self.sr,
-            daqmx.Val_Rising,
-            daqmx.Val_ContSamps,
-            self.nsamps,
-        )
         # If using trigger for analog signals set source to chassis PFI0
-        if self.usetrigger:
+        if usetrigger:
             daqmx.CfgDigEdgeStartTrig(
                 self.analogtask._handle,
                 "/cDAQ9188-16D66BB/PFI0",
                 daqmx.Val_Falling,
             )
-        # Set trigger functions for counter channels
-        daqmx.SetStartTrigType(self.carpostask._handle, daqmx.Val_DigEdge)
-        daqmx.SetStartTrigType(self.turbangtask._handle, daqmx.Val_DigEdge)
+        # Counters are clocked and triggered by the analog task
         trigsrc = daqmx.GetTrigSrcWithDevPrefix(
             self.analogtask._handle, "ai/StartTrigger"
         )
-        daqmx.SetDigEdgeStartTrigSrc(self.carpostask._handle, trigsrc)
-        daqmx.SetDigEdgeStartTrigSrc(self.turbangtask._handle, trigsrc)
-        daqmx.SetDigEdgeStartTrigEdge(
-            self.carpostask._handle, daqmx.Val_Rising
-        )
-        daqmx.SetDigEdgeStartTrigEdge(
-            self.turbangtask._handle, daqmx.Val_Rising
+        for task in self.countertasks.values():
+            daqmx.CfgSampClkTiming(
+                task._handle,
+                trigname,
+                self.sr,
+                daqmx.Val_Rising,
+                daqmx.Val_ContSamps,
+                self.bufsize,
+            )
+            daqmx.SetStartTrigType(task._handle, daqmx.Val_DigEdge)
+            daqmx.SetDigEdgeStartTrigSrc(task._handle, trigsrc)
+            daqmx.SetDigEdgeStartTrigEdge(task._handle, daqmx.Val_Rising)
+        # Create readers and arrays to read into
+        self.reader = AnalogMultiChannelReader(self.analogtask.in_stream)
+        self.counterreaders = {
+            chan: CounterReader(task.in_stream)
+            for chan, task in self.countertasks.items()
+        }
+        self.analogdata = np.zeros((len(self.analogchans), self.nsamps))
+        self.counterdata = {
+            chan: np.zeros(self.nsamps) for chan in self.counterchans
+        }
+        # The event can only be registered once per task, so it calls
+        # whichever callback the current run started the tasks with
+        self.analogtask.register_every_n_samples_acquired_into_buffer_event(
+            sample_interval=self.nsamps, callback_method=self.every_n_samples
         )
 
-    def run(self):
-        """Start DAQmx tasks."""
-        stream = self.analogtask.in_stream
-        reader = AnalogMultiChannelReader(stream)
-        stream_cp = self.carpostask.in_stream
-        reader_cp = CounterReader(stream_cp)
-        stream_ta = self.turbangtask.in_stream
-        reader_ta = CounterReader(stream_ta)
-        data = np.zeros((len(self.analogchans), self.nsamps))
-        carpos = np.zeros(self.nsamps)
-        turbang = np.zeros(self.nsamps)
-
-        def every_n_samples(
-            task_handle, every_n_samps_event_type, n_samps, callback_data
-        ):
-            """Function called every N samples"""
-            reader.read_many_sample(
-                data, number_of_samples_per_channel=n_samps
-            )
-            self.data["torque_trans"] = np.append(
-                self.data["torque_trans"], data[0, :], axis=0
-            )
-            self.data["torque_arm"] = np.append(
-                self.data["torque_arm"], data[1, :], axis=0
-            )
-            self.data["drag_left"] = np.append(
-                self.data["drag_left"], data[2, :], axis=0
-            )
-            self.data["drag_right"] = np.append(
-                self.data["drag_right"], data[3, :], axis=0
-            )
-            self.data["LF_left"] = np.append(
-                self.data["LF_left"], data[4, :], axis=0
-            )
-            self.data["LF_right"] = np.append(
-                self.data["LF_right"], data[5, :], axis=0
-            )
-            self.data["time"] = (
-                np.arange(len(self.data["torque_trans"]), dtype=float)
-                / self.sr
-            )
-            reader_cp.read_many_sample_double(
-                carpos, number_of_samples_per_channel=n_samps
-            )
-            self.data["carriage_pos"] = np.append(
-                self.data["carriage_pos"], carpos
+    def get_chaninfo(self) -> dict:
+        """Get channel information to add to metadata."""
+        chaninfo = {}
+        for channame in self.analogchans:
+            chaninfo[channame] = {}
+            scale = channame + "_scale"
+            chaninfo[channame]["Scale name"] = scale
+            chaninfo[channame]["Scale slope"] = daqmx.GetScaleLinSlope(scale)
+            chaninfo[channame]["Scale y-intercept"] = (
+                daqmx.GetScaleLinYIntercept(scale)
             )
-            reader_ta.read_many_sample_double(
-                turbang, number_of_samples_per_channel=n_samps
+            chaninfo[channame]["Scaled units"] = daqmx.GetScaleScaledUnits(
+                scale
             )
-            self.data["turbine_angle"] = np.append(
-                self.data["turbine_angle"], turbang
+            chaninfo[channame]["Prescaled units"] = (
+                daqmx.GetScalePreScaledUnits(scale)
             )
-            self.data["turbine_rpm"] = ts.smooth(
-                fdiff.second_order_diff(
-                    self.data["turbine_angle"], self.data["time"]
+        for channame, task in self.countertasks.items():
+            chaninfo[channame] = {}
+            if channame == "turbine_angle":
+                chaninfo[channame]["Pulses per rev"] = (
+                    daqmx.GetCIAngEncoderPulsesPerRev(task._handle, channame)
+                )
+                chaninfo[channame]["Units"] = daqmx.GetCIAngEncoderUnits(
+                    task._handle, channame
+                )
+            else:
+                chaninfo[channame]["Distance per pulse"] = (
+                    daqmx.GetCILinEncoderDisPerPulse(task._handle, channame)
                 )
-                / 6.0,
-                8,
+                chaninfo[channame]["Units"] = daqmx.GetCILinEncoderUnits(
+                    task._handle, channame
+                )
+        return chaninfo
+
+    def every_n_samples(
+        self, task_handle, every_n_samps_event_type, n_samps, callback_data
+    ):
+        if self.callback is not None:
+            self.callback(n_samps)
+        return 0  # The function should return an integer
+
+    def read(self, n_samps):
+        """Read a block of samples from all tasks.
+
+        Returns
+        -------
+        analogdata : numpy.ndarray
+            Analog input data, with a row for each channel.
+        counterdata : dict
+            Encoder data keyed by channel name.
+
+        The arrays are reused for each block, so must be copied if kept.
+        """
+        self.reader.read_many_sample(
+            self.analogdata, number_of_samples_per_channel=n_samps
+        )
+        for chan, reader in self.counterreaders.items():
+            reader.read_many_sample_double(
+                self.counterdata[chan], number_of_samples_per_channel=n_samps
+            )
+        return self.analogdata, self.counterdata
+
+    def start(self, callback):
+        """Start the tasks, calling ``callback`` with the number of samples
+        for every block acquired.
+        """
+        self.callback = callback
+        # The counters are started first so they're armed for the analog
+        # task's start trigger
+        for task in self.countertasks.values():
+            task.start()
+        self.analogtask.start()
+
+    def stop(self):
+        self.analogtask.stop()
+        for task in self.countertasks.values():
+            task.stop()
+        self.callback = None
+
+    def pulse_odisi(self, name):
+        """Send a ``"start"`` or ``"stop"`` trigger pulse to the ODiSI
+        interrogator.
+        """
+        task = self.odisitasks[name]
+        task.start()
+        task.write(True)
+        time.sleep(1e-6)  # make longer to see pulse width on oscilloscope
+        task.write(False)
+        time.sleep(1e-6)  # make longer to see pulse width on oscilloscope
+        task.stop()
+
+    def close(self):
+        self.stop()
+        for task in [
+            self.analogtask,
+            *self.countertasks.values(),
+            *self.odisitasks.values(),
+        ]:
+            task.close()
+
+
+class NiTaskPool(object):
+    """Keeps the NI DAQ tasks for the session so they're reused by each run.
+
+    Only one set of tasks can exist at a time, since they share channels and
+    task names, so asking for a different configuration closes the current
+    tasks before creating new ones.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.tasks = None
+
+    def get(
+        self,
+        analogchans,
+        counterchans,
+        sample_rate,
+        nsamps,
+        usetrigger,
+        odisi=False,
+    ) -> NiTaskSet:
+        """Return an ``NiTaskSet`` with the given configuration, creating it
+        only if it differs from the last one.
+        """
+        key = (
+            tuple(analogchans),
+            tuple(counterchans),
+            sample_rate,
+            nsamps,
+            usetrigger,
+            odisi,
+        )
+        if key != self.key:
+            self.close()
+            self.tasks = NiTaskSet(
+                analogchans,
+                counterchans,
+                sample_rate,
+                nsamps,
+                usetrigger,
+                odisi=odisi,
             )
-            return 0  # The function should return an integer
+            self.key = key
+        return self.tasks
 
-        self.analogtask.register_every_n_samples_acquired_into_buffer_event(
-            sample_interval=self.nsamps, callback_method=every_n_samples
+    def close(self):
+        if self.tasks is not None:
+            self.tasks.close()
+        self.tasks = None
+        self.key = None
+
+
+task_pool = NiTaskPool()
+
+
+class NiDaqThread(QtCore.QThread):
+    collecting = QtCore.pyqtSignal()
+    cleared = QtCore.pyqtSignal()
+
+    def __init__(
+        self,
+        usetrigger=True,
+        duration=60.0,
+        sample_rate=2000,
+        nsamps=None,
+        pool=None,
+    ):
+        QtCore.QThread.__init__(self)
+        # Some parameters for the thread
+        self.usetrigger = usetrigger
+        self.collect = True
+        # Set once the tasks are started and waiting for the trigger
+        self.armed = threading.Event()
+        # Create some meta data for the run
+        self.metadata = {}
+        # Initialize sample rate and number of samples read per callback
+        self.sr = sample_rate
+        if nsamps is None:
+            nsamps = default_block_size(self.sr)
+        self.nsamps = int(nsamps)
+        self.bufsize = validate_ni_timing(self.sr, self.nsamps)
+        self.metadata["Sample rate (Hz)"] = self.sr
+        self.metadata["Samples per callback"] = self.nsamps
+        self.metadata["Buffer size (samples)"] = self.bufsize
+        # Create a buffer for storing data, sized for the expected duration
+        self.data = DataBuffer(
+            [
+                "turbine_angle",
+                "turbine_rpm",
+                "torque_trans",
+                "torque_arm",
+                "drag_left",
+                "drag_right",
+                "time",
+                "carriage_pos",
+                "LF_left",
+                "LF_right",
+            ],
+            capacity=self.sr * duration,
         )
-        # Start the tasks
-        self.carpostask.start()
-        self.turbangtask.start()
-        self.analogtask.start()
+        # Turbine RPM is computed incrementally from the turbine angle
+        self.rpm_calc = SmoothedDerivative(scale=6.0, window=8)
+        # Get the configured tasks from the pool, which only creates them if
+        # the configuration has changed since the last run
+        self.analogchans = [
+            "torque_trans",
+            "torque_arm",
+            "drag_left",
+            "drag_right",
+            "LF_left",
+            "LF_right",
+        ]
+        self.carposchan = "carriage_pos"
+        self.turbangchan = "turbine_angle"
+        if pool is None:
+            pool = task_pool
+        self.tasks = pool.get(
+            self.analogchans,
+            [self.carposchan, self.turbangchan],
+            self.sr,
+            self.nsamps,
+            self.usetrigger,
+            odisi=True,
+        )
+        self.analogtask = self.tasks.analogtask
+        self.carpostask = self.tasks.countertasks[self.carposchan]
+        self.turbangtask = self.tasks.countertasks[self.turbangchan]
+        self.metadata["Channel info"] = self.tasks.chaninfo
+
+    def run(self):
+        """Start DAQmx tasks."""
+
+        @timing.timed("NI callback")
+        def every_n_samples(n_samps):
+            """Function called every N samples"""
+            data, counts = self.tasks.read(n_samps)
+            for n, channame in enumerate(self.analogchans):
+                self.data.append(channame, data[n, :])
+            nt = len(self.data["time"])
+            self.data.append(
+                "time", np.arange(nt, nt + n_samps, dtype=float) / self.sr
+            )
+            self.data.append("carriage_pos", counts[self.carposchan])
+            self.data.append("turbine_angle", counts[self.turbangchan])
+            # Only compute RPM for the newest samples
+            start, rpm = self.rpm_calc.update(
+                self.data["turbine_angle"], self.data["time"]
+            )
+            self.data.put("turbine_rpm", start, rpm)
+
+        self.tasks.start(every_n_samples)
+        self.armed.set()
         # Send trigger for ODiSI Interrogater
-        self.odisistarttask.start()
-        for n in range(1):
-            self.odisistarttask.write(True)
-            time.sleep(1e-6)  # make longer to see pulse width on oscilloscope
-            self.odisistarttask.write(False)
-            time.sleep(1e-6)  # make longer to see pulse width on oscilloscope
-        self.odisistarttask.stop()
-        self.odisistarttask.close()
+        self.tasks.pulse_odisi("start")
         print("ODiSI interrogator starting measurements...")
         self.collecting.emit()
         # Keep the acquisition going until task it cleared
@@ -259,25 +471,16 @@ class NiDaqThread(QtCore.QThread):
             time.sleep(0.2)
 
     def stopdaq(self):
-        self.analogtask.stop()
-        self.carpostask.stop()
-        self.turbangtask.stop()
+        self.tasks.stop()
         # Send stop trigger to ODiSI Interrogator
-        self.odisistoptask.start()
-        for n in range(1):
-            self.odisistoptask.write(True)
-            time.sleep(1e-6)  # make longer to see pulse width on oscilloscope
-            self.odisistoptask.write(False)
-            time.sleep(1e-6)  # make longer to see pulse width on oscilloscope
-        self.odisistoptask.stop
-        self.odisistoptask.close()
+        self.tasks.pulse_odisi("stop")
         print("ODiSI interrogator stopping measurements...")
 
     def clear(self):
+        """Stop acquiring and return the tasks to the pool for the next
+        run.
+        """
         self.stopdaq()
-        self.analogtask.close()
-        self.carpostask.close()
-        self.turbangtask.close()
         self.collect = False
         self.cleared.emit()
 
@@ -291,64 +494,174 @@ class TareDragDAQ(QtCore.QThread):
 
 
 class AcsDaqThread(QtCore.QThread):
-    def __init__(self, acs_hc, sample_rate=1000, bufflen=100, makeprg=False):
+    # Name of the controller data collection array and the names of its rows
+    dcarray = "data"
+    columns = ["time", "carriage_vel", "turbine_rpm"]
+    # Program buffer to use when running our own data collection program
+    prgbuffer = 19
+    # Name of polling events in the timing report
+    timing_name = "ACS poll"
+
+    def __init__(
+        self,
+        acs_hc,
+        sample_rate=1000,
+        bufflen=100,
+        makeprg=False,
+        pingpong=False,
+    ):
         QtCore.QThread.__init__(self)
         self.hc = acs_hc
         self.collectdata = True
-        self.data = {
-            "carriage_vel": np.array([]),
-            "turbine_rpm": np.array([]),
-            "time": np.array([]),
-        }
+        self.data = DataBuffer(self.columns, capacity=sample_rate * 60)
         self.dblen = bufflen
         self.sr = sample_rate
         # Compute sleep time as slightly less than the time it would take to
         # fill the data buffer
         self.sleeptime = float(self.dblen) / float(self.sr) * 0.9
         self.makeprg = makeprg
+        # In ping-pong mode we read one half of the buffer while the
+        # controller fills the other
+        self.pingpong = pingpong
+        if self.pingpong and self.dblen % 2:
+            raise ValueError("Buffer length must be even in ping-pong mode")
+        self.overruns = 0
+        # Number of samples missing from the collected data, e.g., because
+        # the controller overwrote them before they were read
+        self.missing_samples = 0
+        self.t0 = None
+        self.period = 1000.0 / self.sr
+        self.last_index = 0
+
+    def collecting_data(self) -> bool:
+        try:
+            return bool(acsc.readInteger(self.hc, acsc.NONE, "collect_data"))
+        except AcscError as e:
+            warnings.warn(f"Failed to read 'collect_data': {e}")
+            return False
+
+    def read_sample_period(self) -> float:
+        """Read the data collection sample period in ms from the controller,
+        falling back to the sample rate we were created with.
+        """
+        try:
+            return acsc.readReal(self.hc, acsc.NONE, "sample_period_ms")
+        except AcscError as e:
+            warnings.warn(f"Failed to read 'sample_period_ms': {e}")
+            return 1000.0 / self.sr
+
+    def read_rows(self, first, last):
+        """Read rows ``first`` through ``last`` of the DC array."""
+        return acsc.readReal(
+            self.hc,
+            acsc.NONE,
+            self.dcarray,
+            0,
+            len(self.columns) - 1,
+            first,
+            last,
+        )
 
-    def run(self):
-        def collecting_data() -> bool:
-            try:
-                return bool(
-                    acsc.readInteger(self.hc, acsc.NONE, "collect_data")
-                )
-            except AcscError as e:
-                warnings.warn(f"Failed to read 'collect_data': {e}")
-                return False
+    def poll(self, first, last):
+        """Read rows ``first`` through ``last`` of the DC array and append
+        any new samples, recording the time taken.
+        """
+        with timing.measure(self.timing_name):
+            self.append_new(self.read_rows(first, last))
+
+    def controller_samples(self) -> float:
+        """Number of sample periods elapsed in the controller since data
+        collection started.
+        """
+        tnow = acsc.readReal(self.hc, acsc.NONE, "TIME")
+        return (tnow - self.t0) / self.period
+
+    def append_new(self, newdata):
+        """Append samples from DC data newer than the last one collected."""
+        # Controller time is monotonic, so we can use the sample index
+        # computed from it as a cursor rather than remembering every time
+        # we've seen
+        index = np.round((newdata[0] - self.t0) / self.period)
+        newdata = newdata[:, index > self.last_index]
+        if newdata.shape[1] == 0:
+            return
+        # Sort by time
+        order = newdata[0].argsort()
+        newdata = newdata[:, order]
+        index = index[index > self.last_index][order]
+        # Count any skipped sample indices as gaps in the data
+        steps = np.diff(index, prepend=self.last_index)
+        nmissing = int(np.sum(np.clip(steps - 1, 0, None)))
+        if nmissing > 0:
+            self.missing_samples += nmissing
+            warnings.warn(f"{nmissing} ACS samples were missed")
+        self.last_index = index[-1]
+        newdata[0] = (newdata[0] - self.t0) / 1000.0
+        for col, row in zip(self.columns, newdata):
+            self.data.append(col, row)
 
+    def run(self):
         if self.makeprg:
             self.makedaqprg()
-            acsc.loadBuffer(self.hc, 19, self.prg, 1024)
-            acsc.runBuffer(self.hc, 19)
-        while not collecting_data():
+            acsc.loadBuffer(self.hc, self.prgbuffer, self.prg, 1024)
+            acsc.runBuffer(self.hc, self.prgbuffer)
+        while not self.collecting_data():
+            if not self.collectdata:
+                # Stopped before the program started collecting
+                return
             time.sleep(0.01)
         # Get the time in the ACS controller where we started data collection
         # so we can subtract it off later
-        t0 = acsc.readReal(self.hc, acsc.NONE, "start_time")
-        times_collected = np.array([])
+        self.t0 = acsc.readReal(self.hc, acsc.NONE, "start_time")
+        self.period = self.read_sample_period()
+        self.last_index = 0
+        if self.pingpong:
+            self.collect_halves()
+        else:
+            self.collect_full()
+
+    def collect_full(self):
+        """Collect data by periodically reading the entire DC buffer."""
         while self.collectdata:
-            # Sleep to let half of the buffer fill
+            # Sleep to let most of the buffer fill
             time.sleep(self.sleeptime)
-            # Read the entire data buffer
-            newdata = acsc.readReal(
-                self.hc, acsc.NONE, "data", 0, 2, 0, self.dblen - 1
-            )
-            # Slice out only the new data
-            idx = (newdata[0] > t0) & ~np.isin(newdata[0], times_collected)
-            newdata = newdata[:, idx]
-            # Sort by time
-            newdata = newdata[:, newdata[0].argsort()]
-            # Track times collected
-            times_collected = np.append(times_collected, newdata[0])
-            t = (newdata[0] - t0) / 1000.0
-            self.data["time"] = np.append(self.data["time"], t)
-            self.data["carriage_vel"] = np.append(
-                self.data["carriage_vel"], newdata[1]
-            )
-            self.data["turbine_rpm"] = np.append(
-                self.data["turbine_rpm"], newdata[2]
-            )
+            self.poll(0, self.dblen - 1)
+
+    def collect_halves(self):
+        """Collect data by reading each half of the DC buffer once the
+        controller has filled it and moved on to the other half.
+        """
+        half = self.dblen // 2
+        # Wait a few samples past the end of each half in case the first
+        # sample wasn't taken exactly at the start time
+        margin = max(half // 10, 2)
+        nread = 0
+        while self.collectdata:
+            ncollected = self.controller_samples()
+            if ncollected - nread > self.dblen:
+                # We fell more than a whole buffer behind, so skip ahead to
+                # the most recently completed half
+                self.overruns += 1
+                warnings.warn("ACS data buffer overrun; samples were lost")
+                nread = (int(ncollected) // half - 1) * half
+            nready = nread + half + margin
+            if ncollected < nready:
+                # Sleep until the controller should be done with this half
+                time.sleep((nready - ncollected) * self.period / 1000.0)
+                continue
+            first = nread % self.dblen
+            self.poll(first, first + half - 1)
+            # The controller starts overwriting this half after one full
+            # buffer, so check that it didn't do so while we were reading
+            if self.controller_samples() > nread + self.dblen:
+                self.overruns += 1
+                warnings.warn("ACS data buffer overrun during read")
+            nread += half
+        # Pick up anything collected since the last half was read
+        try:
+            self.poll(0, self.dblen - 1)
+        except AcscError as e:
+            warnings.warn(f"Failed to read final ACS data: {e}")
 
     def makedaqprg(self):
         """Create an ACSPL+ program to load into the controller"""
@@ -359,6 +672,8 @@ class AcsDaqThread(QtCore.QThread):
         self.prg.declare_2darray("GLOBAL", "real", "data", 3, self.dblen)
         self.prg.addline("GLOBAL REAL start_time")
         self.prg.addline("GLOBAL INT collect_data")
+        self.prg.addline("GLOBAL REAL sample_period_ms")
+        self.prg.addline(f"sample_period_ms = {1000.0 / self.sr}")
         self.prg.addline("collect_data = 1")
         self.prg.add_dc(
             "data", self.dblen, self.sr, "TIME, RVEL(5), FVEL(4)", "/c"
@@ -368,6 +683,15 @@ class AcsDaqThread(QtCore.QThread):
         self.prg.addline("STOPDC")
         self.prg.addstopline()
 
+    @property
+    def metadata(self) -> dict:
+        return {
+            "Sample rate (Hz)": 1000.0 / self.period,
+            "Buffer length": self.dblen,
+            "Missing samples": self.missing_samples,
+            "Overruns": self.overruns,
+        }
+
     def stop(self):
         self.collectdata = False
         try:
@@ -376,89 +700,24 @@ class AcsDaqThread(QtCore.QThread):
             print("Could not write collect_data = 0")
 
 
-class AftAcsDaqThread(QtCore.QThread):
+class AftAcsDaqThread(AcsDaqThread):
     """A thread for collecting data from the ACS EC controller that runs the
     AFT test bed.
     """
 
-    def __init__(self, acs_hc, sample_rate=1000, bufflen=100, makeprg=False):
-        QtCore.QThread.__init__(self)
-        self.hc = acs_hc
-        self.collectdata = True
-        self.data = {
-            "time": np.array([]),
-            "load_cell_ch1": np.array([]),
-            "load_cell_ch2": np.array([]),
-            "load_cell_ch3": np.array([]),
-            "load_cell_ch4": np.array([]),
-            "turbine_pos": np.array([]),
-            "turbine_rpm": np.array([]),
-            "carriage_vel": np.array([]),
-        }
-        self.dblen = bufflen
-        self.sr = sample_rate
-        # Compute sleep time as slightly less than the time it would take to
-        # fill the data buffer
-        self.sleeptime = float(self.dblen) / float(self.sr) * 0.9
-        self.makeprg = makeprg
-
-    def run(self):
-        def collecting_data() -> bool:
-            try:
-                return bool(
-                    acsc.readInteger(self.hc, acsc.NONE, "collect_data")
-                )
-            except AcscError as e:
-                warnings.warn(f"Failed to read 'collect_data': {e}")
-                return False
-
-        if self.makeprg:
-            self.makedaqprg()
-            acsc.loadBuffer(self.hc, 17, self.prg, 1024)
-            acsc.runBuffer(self.hc, 17)
-        while not collecting_data():
-            time.sleep(0.01)
-        # Get the time in the ACS controller where we started data collection
-        # so we can subtract it off later
-        t0 = acsc.readReal(self.hc, acsc.NONE, "start_time")
-        times_collected = np.array([])
-        while self.collectdata:
-            # Sleep to let half of the buffer fill
-            time.sleep(self.sleeptime)
-            # Read the entire data buffer
-            newdata = acsc.readReal(
-                self.hc, acsc.NONE, "aft_data", 0, 7, 0, self.dblen - 1
-            )
-            # Slice out only the new data
-            idx = (newdata[0] > t0) & ~np.isin(newdata[0], times_collected)
-            newdata = newdata[:, idx]
-            # Sort by time
-            newdata = newdata[:, newdata[0].argsort()]
-            # Track times collected
-            times_collected = np.append(times_collected, newdata[0])
-            t = (newdata[0] - t0) / 1000.0
-            self.data["time"] = np.append(self.data["time"], t)
-            self.data["load_cell_ch1"] = np.append(
-                self.data["load_cell_ch1"], newdata[1]
-            )
-            self.data["load_cell_ch2"] = np.append(
-                self.data["load_cell_ch2"], newdata[2]
-            )
-            self.data["load_cell_ch3"] = np.append(
-                self.data["load_cell_ch3"], newdata[3]
-            )
-            self.data["load_cell_ch4"] = np.append(
-                self.data["load_cell_ch4"], newdata[4]
-            )
-            self.data["turbine_pos"] = np.append(
-                self.data["turbine_pos"], newdata[5]
-            )
-            self.data["turbine_rpm"] = np.append(
-                self.data["turbine_rpm"], newdata[6]
-            )
-            self.data["carriage_vel"] = np.append(
-                self.data["carriage_vel"], newdata[7]
-            )
+    dcarray = "aft_data"
+    columns = [
+        "time",
+        "load_cell_ch1",
+        "load_cell_ch2",
+        "load_cell_ch3",
+        "load_cell_ch4",
+        "turbine_pos",
+        "turbine_rpm",
+        "carriage_vel",
+    ]
+    prgbuffer = 17
+    timing_name = "AFT ACS poll"
 
     def makedaqprg(self):
         """Create an ACSPL+ program to load into the controller"""
@@ -466,13 +725,6 @@ class AftAcsDaqThread(QtCore.QThread):
             sample_period_ms=int(1 / self.sr * 1000), n_buffer_rows=self.dblen
         )
 
-    def stop(self):
-        self.collectdata = False
-        try:
-            acsc.writeInteger(self.hc, "collect_data", 0)
-        except:
-            print("Could not write collect_data = 0")
-
 
 class FbgDaqThread(QtCore.QThread):
     def __init__(self, fbg_props, usetrigger=False):
@@ -503,7 +755,8 @@ class FbgDaqThread(QtCore.QThread):
 
     def run(self):
         while self.collectdata:
-            self.interr.get_data()
+            with timing.measure("FBG poll"):
+                self.interr.get_data()
             self.interr.sleep()
 
     def stop(self):
@@ -553,30 +806,45 @@ class AftNiDaqThread(QtCore.QThread):
     collecting = QtCore.pyqtSignal()
     cleared = QtCore.pyqtSignal()
 
-    def __init__(self, usetrigger=True):
+    def __init__(
+        self,
+        usetrigger=True,
+        duration=60.0,
+        sample_rate=100,
+        nsamps=None,
+        pool=None,
+    ):
         QtCore.QThread.__init__(self)
         # Some parameters for the thread
         self.usetrigger = usetrigger
         self.collect = True
+        # Set once the tasks are started and waiting for the trigger
+        self.armed = threading.Event()
         # Create some meta data for the run
         self.metadata = {}
-        # Initialize sample rate
-        self.sr = 100
+        # Initialize sample rate and number of samples read per callback
+        self.sr = sample_rate
+        if nsamps is None:
+            nsamps = default_block_size(self.sr)
+        self.nsamps = int(nsamps)
+        self.bufsize = validate_ni_timing(self.sr, self.nsamps)
         self.metadata["Sample rate (Hz)"] = self.sr
-        self.nsamps = int(self.sr / 10)
-        # Create a dict of arrays for storing data
-        self.data = {
-            "resistor_temp": np.array([]),
-            "water_temp": np.array([]),
-            "fore_temp": np.array([]),
-            "aft_temp": np.array([]),
-            "time": np.array([]),
-            "carriage_pos": np.array([]),
-        }
-        # Create tasks
-        self.analogtask = nidaqmx.Task("analog-inputs")
-        self.carpostask = nidaqmx.Task("carriage-pos")
-        # Add channels to tasks
+        self.metadata["Samples per callback"] = self.nsamps
+        self.metadata["Buffer size (samples)"] = self.bufsize
+        # Create a buffer for storing data, sized for the expected duration
+        self.data = DataBuffer(
+            [
+                "resistor_temp",
+                "water_temp",
+                "fore_temp",
+                "aft_temp",
+                "time",
+                "carriage_pos",
+            ],
+            capacity=self.sr * duration,
+        )
+        # Get the configured tasks from the pool, which only creates them if
+        # the configuration has changed since the last run
         self.analogchans = [
             "resistor_temp",
             "water_temp",
@@ -584,137 +852,49 @@ class AftNiDaqThread(QtCore.QThread):
             "aft_temp",
         ]
         self.carposchan = "carriage_pos"
-        self.analogtask.add_global_channels(
-            [GlobalVirtualChannel(c) for c in self.analogchans]
-        )
-        self.carpostask.add_global_channels(
-            [GlobalVirtualChannel(self.carposchan)]
-        )
-        # Get channel information to add to metadata
-        self.chaninfo = {}
-        for channame in self.analogchans:
-            self.chaninfo[channame] = {}
-            scale = channame + "_scale"
-            self.chaninfo[channame]["Scale name"] = scale
-            self.chaninfo[channame]["Scale slope"] = daqmx.GetScaleLinSlope(
-                scale
-            )
-            self.chaninfo[channame]["Scale y-intercept"] = (
-                daqmx.GetScaleLinYIntercept(scale)
-            )
-            self.chaninfo[channame]["Scaled units"] = (
-                daqmx.GetScaleScaledUnits(scale)
-            )
-            self.chaninfo[channame]["Prescaled units"] = (
-                daqmx.GetScalePreScaledUnits(scale)
-            )
-        self.chaninfo[self.carposchan] = {}
-        self.chaninfo[self.carposchan]["Distance per pulse"] = (
-            daqmx.GetCILinEncoderDisPerPulse(
-                self.carpostask._handle, self.carposchan
-            )
-        )
-        self.chaninfo[self.carposchan]["Units"] = daqmx.GetCILinEncoderUnits(
-            self.carpostask._handle, self.carposchan
-        )
-        self.metadata["Channel info"] = self.chaninfo
-        # Configure sample clock timing
-        daqmx.CfgSampClkTiming(
-            self.analogtask._handle,
-            "",
+        if pool is None:
+            pool = task_pool
+        self.tasks = pool.get(
+            self.analogchans,
+            [self.carposchan],
             self.sr,
-            daqmx.Val_Rising,
-            daqmx.Val_ContSamps,
             self.nsamps,
+            self.usetrigger,
         )
-        # Get source for analog sample clock
-        trigname = daqmx.GetTerminalNameWithDevPrefix(
-            self.analogtask._handle, "ai/SampleClock"
-        )
-        daqmx.CfgSampClkTiming(
-            self.carpostask._handle,
-            trigname,
-            self.sr,
-            daqmx.Val_Rising,
-            daqmx.Val_ContSamps,
-            self.nsamps,
-        )
-        # If using trigger for analog signals set source to chassis PFI0
-        if self.usetrigger:
-            daqmx.CfgDigEdgeStartTrig(
-                self.analogtask._handle,
-                "/cDAQ9188-16D66BB/PFI0",
-                daqmx.Val_Falling,
-            )
-        # Set trigger functions for counter channels
-        daqmx.SetStartTrigType(self.carpostask._handle, daqmx.Val_DigEdge)
-        trigsrc = daqmx.GetTrigSrcWithDevPrefix(
-            self.analogtask._handle, "ai/StartTrigger"
-        )
-        daqmx.SetDigEdgeStartTrigSrc(self.carpostask._handle, trigsrc)
-        daqmx.SetDigEdgeStartTrigEdge(
-            self.carpostask._handle, daqmx.Val_Rising
-        )
+        self.analogtask = self.tasks.analogtask
+        self.carpostask = self.tasks.countertasks[self.carposchan]
+        self.metadata["Channel info"] = self.tasks.chaninfo
 
     def run(self):
         """Start DAQmx tasks."""
-        stream = self.analogtask.in_stream
-        reader = AnalogMultiChannelReader(stream)
-        stream_cp = self.carpostask.in_stream
-        reader_cp = CounterReader(stream_cp)
-        data = np.zeros((len(self.analogchans), self.nsamps))
-        carpos = np.zeros(self.nsamps)
-
-        def every_n_samples(
-            task_handle, every_n_samps_event_type, n_samps, callback_data
-        ):
+
+        @timing.timed("AFT NI callback")
+        def every_n_samples(n_samps):
             """Function called every N samples"""
-            reader.read_many_sample(
-                data, number_of_samples_per_channel=n_samps
-            )
-            self.data["resistor_temp"] = np.append(
-                self.data["resistor_temp"], data[0, :], axis=0
-            )
-            self.data["water_temp"] = np.append(
-                self.data["water_temp"], data[1, :], axis=0
-            )
-            self.data["fore_temp"] = np.append(
-                self.data["fore_temp"], data[2, :], axis=0
-            )
-            self.data["aft_temp"] = np.append(
-                self.data["aft_temp"], data[3, :], axis=0
+            data, counts = self.tasks.read(n_samps)
+            for n, channame in enumerate(self.analogchans):
+                self.data.append(channame, data[n, :])
+            nt = len(self.data["time"])
+            self.data.append(
+                "time", np.arange(nt, nt + n_samps, dtype=float) / self.sr
             )
-            self.data["time"] = (
-                np.arange(len(self.data["resistor_temp"]), dtype=float)
-                / self.sr
-            )
-            reader_cp.read_many_sample_double(
-                carpos, number_of_samples_per_channel=n_samps
-            )
-            self.data["carriage_pos"] = np.append(
-                self.data["carriage_pos"], carpos
-            )
-            return 0  # The function should return an integer
+            self.data.append("carriage_pos", counts[self.carposchan])
 
-        self.analogtask.register_every_n_samples_acquired_into_buffer_event(
-            sample_interval=self.nsamps, callback_method=every_n_samples
-        )
-        # Start the tasks
-        self.carpostask.start()
-        self.analogtask.start()
+        self.tasks.start(every_n_samples)
+        self.armed.set()
         self.collecting.emit()
         # Keep the acquisition going until task is cleared
         while self.collect:
             time.sleep(0.2)
 
     def stopdaq(self):
-        self.analogtask.stop()
-        self.carpostask.stop()
+        self.tasks.stop()
 
     def clear(self):
+        """Stop acquiring and return the tasks to the pool for the next
+        run.
+        """
         self.stopdaq()
-        self.analogtask.close()
-        self.carpostask.close()
         self.collect = False
         self.cleared.emit()
 
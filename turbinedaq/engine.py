@@ -0,0 +1,393 @@
+"""Headless execution of test plans, without the GUI."""
+
+import argparse
+import os
+import shutil
+import time
+
+from acspy import acsc
+
+from turbinedaq import (
+    configcache,
+    daqtasks,
+    runindex,
+    runtypes,
+    testplan,
+    writers,
+)
+from turbinedaq.testplan import load_test_plan, tare_idle_time
+
+
+def autoprocess_cmd(wdir, section, nrun):
+    """Return the shell command for processing a run with the experiment's
+    ``py_package``.
+    """
+    pycmd = (
+        "from py_package import processing; "
+        + "print(processing.process_run('{}',{}))".format(section, nrun)
+    )
+    return ["cd", "/D", wdir, "&", "python", "-c", pycmd]
+
+
+class RunEngine(object):
+    """Executes the runs in a test plan back-to-back without a GUI.
+
+    Runs are created with the same ``runtypes`` classes as the GUI and saved
+    to the same layout, i.e., ``data/raw/<section>/<run>`` inside the
+    working directory, so the GUI and engine can be used interchangeably on
+    the same experiment. Each run is saved in the background while waiting
+    for the tank to settle before the next.
+
+    Parameters
+    ----------
+    wdir : str
+        Experiment working directory.
+    hc : int
+        ACS controller communication handle. If ``None``, a connection is
+        opened to the controller, or the simulator if that fails.
+    raw_data_format : str
+        Raw data format, i.e., a key of ``writers.RAW_DATA_FORMATS``.
+    autoprocess : bool
+        Whether to process each run after it's saved.
+    wait : bool
+        Whether to wait for the tank to settle between runs.
+    optimize : bool
+        Whether to reorder the remaining runs in a section to minimize the
+        predicted time to execute them.
+    """
+
+    def __init__(
+        self,
+        wdir,
+        hc=None,
+        raw_data_format="hdf5",
+        autoprocess=False,
+        wait=True,
+        optimize=False,
+    ):
+        self.wdir = wdir
+        if hc is None:
+            try:
+                hc = acsc.open_comm_ethernet_tcp("10.0.0.100")
+            except acsc.AcscError:
+                print("Cannot connect to ACS NTM controller")
+                print("Connecting to simulator")
+                hc = acsc.open_comm_simulator()
+        self.hc = hc
+        self.raw_data_format = raw_data_format
+        self.autoprocess = autoprocess
+        self.wait = wait
+        self.optimize = optimize
+        self.aborted = False
+        self.running = False
+        self.run = None
+        self.savethread = None
+        # Section and number of the run being saved
+        self.saving = None
+        self.test_plan = load_test_plan(wdir)
+        # Share done runs with the GUI through the same run index
+        self.run_index = runindex.RunIndex(os.path.join(wdir, "data", "raw"))
+        self.plan_scheduler = testplan.PlanScheduler(
+            self.test_plan, self.run_index
+        )
+        self.config = configcache.ConfigCache(wdir)
+
+    @property
+    def turbine_properties(self):
+        return self.config.turbine_properties()
+
+    @property
+    def vec_salinity(self):
+        return self.config.vectrino_properties().get("salinity", 0.0)
+
+    @property
+    def fbg_properties(self):
+        return self.config.fbg_properties()
+
+    @property
+    def odisi_properties(self):
+        return self.config.odisi_properties()
+
+    def rundir(self, section, nrun):
+        return os.path.join(self.wdir, "data", "raw", section, str(nrun))
+
+    def is_run_done(self, section, nrun):
+        """Check if a run has been saved."""
+        self.plan_scheduler.refresh()
+        return self.run_index.is_done(section, nrun)
+
+    def is_section_done(self, section):
+        return self.next_run(section) is None
+
+    def next_run(self, section):
+        """Return the number of the first run in a section that isn't done,
+        or ``None`` if they all are.
+        """
+        # Pick up runs saved or deleted outside of this engine
+        self.plan_scheduler.refresh()
+        return self.plan_scheduler.get(section).peek()
+
+    def create_run(self, section, nrun):
+        """Create the run object for a run in the test plan."""
+        run_props = self.test_plan[section]
+        run_props = run_props[run_props.run == nrun].iloc[0]
+        savedir = self.rundir(section, nrun)
+        name = section + " run " + str(nrun)
+        kind, params = testplan.run_params(
+            section, run_props, self.turbine_properties
+        )
+        if kind == "tare drag":
+            run = runtypes.TareDragRun(self.hc, **params)
+        elif kind == "tare torque":
+            run = runtypes.TareTorqueRun(self.hc, **params)
+        elif kind == "strut torque":
+            run = runtypes.StrutTorqueRun(self.hc, **params)
+        else:
+            turbine = params.pop("turbine")
+            turbine_properties = dict(self.turbine_properties[turbine])
+            run = runtypes.TurbineTow(
+                acs_ntm_hcomm=self.hc,
+                nidaq=True,
+                vecsavepath=os.path.join(savedir, "vecdata"),
+                turbine_properties=turbine_properties,
+                fbg_properties=self.fbg_properties,
+                odisi_properties=self.odisi_properties,
+                vec_salinity=self.vec_salinity,
+                savedir=savedir,
+                raw_data_format=self.raw_data_format,
+                **params,
+            )
+            run.metadata["Turbine"] = turbine_properties
+            run.metadata["Turbine"]["name"] = turbine
+        run.metadata["Name"] = name
+        return run
+
+    def rawdata(self, run):
+        """Return a dict of the raw data from a run that still needs to be
+        saved, keyed by file name.
+        """
+        rawdata = {}
+        nidata = {k: v for k, v in run.nidata.items() if k != "turbine_rpm"}
+        if isinstance(run, runtypes.TurbineTow):
+            # NI, ACS, and FBG data are written during the run
+            if run.writer is None:
+                rawdata["acsdata.h5"] = run.acsdaqthread.data
+                rawdata["nidata.h5"] = nidata
+                if run.fbg:
+                    rawdata["fbgdata.h5"] = run.fbgdata
+        else:
+            rawdata["acsdata.h5"] = run.acsdata
+            rawdata["nidata.h5"] = nidata
+        return rawdata
+
+    def idle_time(self, section, run):
+        """Return the time in seconds to wait for the tank to settle."""
+        if not isinstance(run, runtypes.TurbineTow):
+            return tare_idle_time(section, getattr(run, "U", None))
+        if run.autoaborted or run.settling:
+            return 5
+        return self.settling_time(run.U)
+
+    def settling_time(self, U):
+        """Return the time in seconds for the tank to settle after a tow at
+        ``U`` m/s from ``config/settling_times.csv``.
+        """
+        return float(self.config.settling_time()(U))
+
+    def optimize_section(self, section):
+        """Reorder the remaining runs in a section to minimize the predicted
+        time to execute them.
+
+        Returns
+        -------
+        predicted : float
+            Predicted time in seconds in the new order.
+        baseline : float
+            Predicted time in seconds in test plan order.
+        """
+        df = self.test_plan[section]
+        self.plan_scheduler.refresh()
+        runs = self.plan_scheduler.get(section).runs()
+        order = testplan.optimize_order(section, df, runs, self.settling_time)
+        self.plan_scheduler.set_order(section, order)
+        predicted = testplan.predict_duration(
+            section, df, order, self.settling_time, self.turbine_properties
+        )
+        baseline = testplan.predict_duration(
+            section, df, runs, self.settling_time, self.turbine_properties
+        )
+        return predicted, baseline
+
+    def execute(self, section, nrun):
+        """Execute a single run and start saving its data in the background.
+
+        Returns
+        -------
+        run : QThread
+            The finished run object.
+        """
+        self.wait_for_save()
+        savedir = self.rundir(section, nrun)
+        if not os.path.isdir(savedir):
+            os.makedirs(savedir)
+        print("Starting", section, "run", nrun)
+        self.run = run = self.create_run(section, nrun)
+        vecdata = run.vec.data if getattr(run, "vectrino", False) else None
+        # Execute in this thread, since there is no event loop to wait on
+        tstart = time.time()
+        self.running = True
+        try:
+            run.run()
+        except BaseException:
+            # Stop the run, e.g., on a keyboard interrupt, rather than
+            # leaving the tow and DAQ running
+            print("Aborting", section, "run", nrun)
+            run.abort()
+            run.acsdaqthread.stop()
+            if isinstance(run, runtypes.TurbineTow):
+                run.disarm()
+            run.acsdaqthread.wait()
+            raise
+        finally:
+            self.running = False
+        run.acsdaqthread.wait()
+        if getattr(run, "arm_failed", False):
+            print("Deleting files from run that couldn't start")
+            shutil.rmtree(savedir)
+            return run
+        if run.aborted or getattr(run, "autoaborted", False):
+            return run
+        rawdata = self.rawdata(run)
+        if vecdata is not None:
+            rawdata["vecdata.h5"] = vecdata
+        postcmd = None
+        if self.autoprocess:
+            postcmd = autoprocess_cmd(self.wdir, section, nrun)
+        print("Saving to " + savedir)
+        self.savethread = writers.SaveThread(
+            savedir,
+            rawdata,
+            run.metadata,
+            fmt=self.raw_data_format,
+            float32_keys={"nidata.h5": run.daqthread.analogchans},
+            postcmd=postcmd,
+            timing_since=tstart,
+        )
+        self.saving = (section, nrun)
+        self.savethread.start()
+        return run
+
+    def wait_for_save(self):
+        """Wait for the last run to be saved and mark it as done."""
+        if self.savethread is None:
+            return
+        self.savethread.wait()
+        if self.saving is not None:
+            section, nrun = self.saving
+            self.saving = None
+            if self.savethread.error is None:
+                self.plan_scheduler.mark_done(section, nrun)
+            else:
+                print("Failed to save to " + self.savethread.savedir)
+
+    def run_section(self, section, max_runs=None):
+        """Execute runs in a section until it's done, ``max_runs`` have been
+        executed, or the engine is aborted.
+        """
+        nruns = 0
+        if self.optimize:
+            predicted, baseline = self.optimize_section(section)
+            print(
+                "Predicted time for '{}': {:.1f} min ({:.1f} min in test "
+                "plan order)".format(section, predicted / 60, baseline / 60)
+            )
+        while not self.aborted:
+            if max_runs is not None and nruns >= max_runs:
+                break
+            nrun = self.next_run(section)
+            if nrun is None:
+                print("'{}' is done".format(section))
+                break
+            if not acsc.getMotorState(self.hc, 5)["enabled"]:
+                print("Tow axis is not enabled")
+                break
+            try:
+                run = self.execute(section, nrun)
+            except ValueError as e:
+                # Invalid DAQ settings in the test plan
+                print("Cannot start {} run {}: {}".format(section, nrun, e))
+                break
+            nruns += 1
+            if run.aborted or getattr(run, "arm_failed", False):
+                break
+            # Wait for the save, which overlaps with the settling time
+            tsave = time.time()
+            self.wait_for_save()
+            if self.wait and self.next_run(section) is not None:
+                idlesec = self.idle_time(section, run)
+                print("Waiting " + str(idlesec) + " seconds until next run")
+                remaining = idlesec - (time.time() - tsave)
+                while not self.aborted and remaining > 0:
+                    time.sleep(min(remaining, 0.5))
+                    remaining = idlesec - (time.time() - tsave)
+        self.wait_for_save()
+        return nruns
+
+    def abort(self):
+        """Abort the current run and stop executing the test plan."""
+        self.aborted = True
+        if self.running:
+            self.run.abort()
+
+    def close(self):
+        daqtasks.task_pool.close()
+        acsc.closeComm(self.hc)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Execute a test plan section without the GUI"
+    )
+    parser.add_argument("wdir", help="Experiment working directory")
+    parser.add_argument("section", help="Test plan section")
+    parser.add_argument(
+        "--max-runs", type=int, default=None, help="Maximum number of runs"
+    )
+    parser.add_argument(
+        "--raw-data-format",
+        default="hdf5",
+        choices=list(writers.RAW_DATA_FORMATS),
+    )
+    parser.add_argument(
+        "--autoprocess", action="store_true", help="Process each run"
+    )
+    parser.add_argument(
+        "--no-wait",
+        action="store_true",
+        help="Don't wait for the tank to settle between runs",
+    )
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Reorder runs to minimize the time waiting for the tank",
+    )
+    args = parser.parse_args()
+    engine = RunEngine(
+        args.wdir,
+        raw_data_format=args.raw_data_format,
+        autoprocess=args.autoprocess,
+        wait=not args.no_wait,
+        optimize=args.optimize,
+    )
+    if args.section not in engine.test_plan:
+        parser.error("No test plan section '{}'".format(args.section))
+    try:
+        engine.run_section(args.section, max_runs=args.max_runs)
+    except KeyboardInterrupt:
+        engine.abort()
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
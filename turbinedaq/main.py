@@ -12,16 +12,24 @@ from typing import Literal
 import guiqwt
 import guiqwt.curve
 import numpy as np
-import pandas as pd
-import scipy.interpolate
 from acspy import acsc
-from pxl import timeseries as ts
 from PyQt5 import QtCore, QtGui
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
 
-from turbinedaq import daqtasks, runtypes, vectasks
+from turbinedaq import (
+    acsstatus,
+    configcache,
+    daqtasks,
+    plotting,
+    runindex,
+    runtypes,
+    testplan,
+    timing,
+    vectasks,
+    writers,
+)
 from turbinedaq.mainwindow import *
 
 fluid_params = {"rho": 1000.0}
@@ -38,6 +46,7 @@ class MainWindow(QMainWindow):
         # Create AFT dock widgets
         self.create_aft_dock_widget()
         self.create_aft_ni_dock_widget()
+        self.create_timing_dock_widget()
         # Add initial items to AFT row of ACS table widget
         for n in range(1, 6):
             item = QtWidgets.QTableWidgetItem()
@@ -61,6 +70,32 @@ class MainWindow(QMainWindow):
         self.turbine_mode_action_group.triggered.connect(
             self.on_turbine_mode_change
         )
+        # Add action group for choosing the raw data format
+        self.menu_raw_data_format = self.ui.menuSettings.addMenu(
+            "Raw data format"
+        )
+        self.raw_data_format_action_group = QtWidgets.QActionGroup(
+            self.menu_raw_data_format
+        )
+        self.raw_data_format_action_group.setExclusive(True)
+        for fmt in writers.RAW_DATA_FORMATS:
+            action = QtWidgets.QAction(
+                fmt,
+                self.menu_raw_data_format,
+                checkable=True,
+                checked=fmt == "hdf5",
+            )
+            self.menu_raw_data_format.addAction(action)
+            self.raw_data_format_action_group.addAction(action)
+        self.raw_data_format_action_group.triggered.connect(
+            self.on_raw_data_format_change
+        )
+        # Add action for reordering runs to shorten the test plan
+        self.action_optimize_order = QtWidgets.QAction(
+            "Optimize Run Order", self.ui.menuTest_Plan
+        )
+        self.ui.menuTest_Plan.addAction(self.action_optimize_order)
+        self.action_optimize_order.triggered.connect(self.on_optimize_order)
         # Create time vector
         self.t = np.array([])
         self.time_last_run = time.time()
@@ -72,17 +107,20 @@ class MainWindow(QMainWindow):
         self.monitorfbg = False
         self.monitorodisi = False
         self.run_in_progress = False
+        self.run_start_time = None
         self.test_plan_loaded = False
         self.autoprocess = True
         self.enabled_axes = {}
         self.test_plan = {}
         self.turbinetow = None
+        self.savethread = None
         self.nidata = {}
         self.acsdata = {}
         # Add file path combobox to toolbar
         self.line_edit_wdir = QLineEdit()
         self.ui.toolBar_directory.addWidget(self.line_edit_wdir)
         self.wdir = "C:\\temp"
+        self.config_cache = None
         self.line_edit_wdir.setText("C:\\temp")
         self.toolbutton_wdir = QToolButton()
         self.ui.toolBar_directory.addWidget(self.toolbutton_wdir)
@@ -103,6 +141,8 @@ class MainWindow(QMainWindow):
         self.read_fbg_properties()
         self.read_odisi_properties()
         # Import test plan
+        self.test_plan_model = testplan.TestPlanModel(self)
+        self.ui.tableViewTestPlan.setModel(self.test_plan_model)
         self.load_test_plan()
         # Initialize plots
         self.initialize_plots()
@@ -121,7 +161,8 @@ class MainWindow(QMainWindow):
                 pass
         # Start timers
         self.timer.start(200)
-        self.plot_timer.start(100)
+        self.plot_timer.start(50)
+        self.acs_status_thread.start()
         # Remember FBG dock widget visibility from last session
         if "FBG visible" in self.settings:
             self.ui.dockWidget_FBG.setVisible(self.settings["FBG visible"])
@@ -169,6 +210,10 @@ class MainWindow(QMainWindow):
             self.ui.actionNI_DAQ_AFT.setChecked(
                 self.settings["AFT NI visible"]
             )
+        # Remember timing dock widget visibility from last session
+        if "Timing visible" in self.settings:
+            self.dockwidget_timing.setVisible(self.settings["Timing visible"])
+            self.action_view_timing.setChecked(self.settings["Timing visible"])
 
     def create_aft_dock_widget(self):
         self.dockWidget_AFT = QtWidgets.QDockWidget(self.ui.centralwidget)
@@ -312,6 +357,65 @@ class MainWindow(QMainWindow):
         # Set invisible by default
         self.dockwidget_aft_ni.setVisible(False)
 
+    def create_timing_dock_widget(self) -> None:
+        """Create a dock widget showing timing statistics of the DAQ
+        callbacks, ACS polls, plot refreshes, and saves.
+        """
+        self.dockwidget_timing = QtWidgets.QDockWidget(self.ui.centralwidget)
+        self.dockwidget_timing.setFeatures(
+            QtWidgets.QDockWidget.AllDockWidgetFeatures
+        )
+        self.dockwidget_timing.setObjectName("dockwidget_timing")
+        self.dockwidget_timing.setWindowTitle("Timing")
+        self.table_timing = QtWidgets.QTableWidget(self.dockwidget_timing)
+        self.table_timing.setObjectName("table_timing")
+        self.timing_columns = {
+            "Count": "count",
+            "Mean (ms)": "mean_ms",
+            "p99 (ms)": "p99_ms",
+            "Max (ms)": "max_ms",
+            "Max interval (ms)": "max_interval_ms",
+            "Dropped": "dropped",
+        }
+        self.table_timing.setColumnCount(len(self.timing_columns))
+        self.table_timing.setHorizontalHeaderLabels(list(self.timing_columns))
+        self.table_timing.setEditTriggers(
+            QtWidgets.QAbstractItemView.NoEditTriggers
+        )
+        self.dockwidget_timing.setWidget(self.table_timing)
+        self.ui.gridLayout_4.addWidget(self.dockwidget_timing, 0, 7, 6, 1)
+        # Add view menu action
+        self.action_view_timing = QtWidgets.QAction(
+            "Timing", self.ui.menuView, checkable=True, checked=False
+        )
+        self.ui.menuView.addAction(self.action_view_timing)
+        self.action_view_timing.toggled.connect(
+            self.dockwidget_timing.setVisible
+        )
+        self.dockwidget_timing.visibilityChanged.connect(
+            self.action_view_timing.setChecked
+        )
+        # Set invisible by default
+        self.dockwidget_timing.setVisible(False)
+
+    def update_timing_table(self, window=10.0):
+        """Show timing statistics for the last ``window`` seconds."""
+        summary = timing.registry.summary(since=time.time() - window)
+        self.table_timing.setRowCount(len(summary))
+        self.table_timing.setVerticalHeaderLabels(list(summary))
+        for row, stats in enumerate(summary.values()):
+            for col, key in enumerate(self.timing_columns.values()):
+                value = stats[key]
+                if value is None:
+                    text = ""
+                elif key in ("count", "dropped"):
+                    text = str(value)
+                else:
+                    text = f"{value:.2f}"
+                item = QtWidgets.QTableWidgetItem(text)
+                item.setTextAlignment(QtCore.Qt.AlignCenter)
+                self.table_timing.setItem(row, col, item)
+
     @property
     def settings_fpath(self) -> str:
         return os.path.join(
@@ -380,6 +484,22 @@ class MainWindow(QMainWindow):
             self.ui.checkBox_singleRunLF.setChecked(val)
         if "Mode" in self.settings:
             self.mode = self.settings["Mode"]
+        self.load_raw_data_format()
+
+    def load_raw_data_format(self):
+        """Check the raw data format saved for the working directory."""
+        formats = self.settings.get("Raw data format", {})
+        self.raw_data_format = formats.get(self.wdir, "hdf5")
+
+    @property
+    def raw_data_format(self) -> str:
+        return self.raw_data_format_action_group.checkedAction().text()
+
+    @raw_data_format.setter
+    def raw_data_format(self, val: str):
+        for action in self.raw_data_format_action_group.actions():
+            if action.text() == val:
+                action.setChecked(True)
 
     @property
     def mode(self) -> Literal["CFT", "AFT"]:
@@ -404,99 +524,103 @@ class MainWindow(QMainWindow):
 
         TODO: Make this more explicitly required to handle the AFT.
         """
-        self.turbine_properties = {
-            "RVAT": {"kind": "CFT", "radius": 0.5, "height": 1.0},
-            "RM2": {"kind": "CFT", "diameter": 1.075, "height": 0.807},
-            "AFT": {"kind": "AFT", "diameter": 1.0, "height": 1.0},
-        }
-        fpath = os.path.join(self.wdir, "config", "turbine_properties.json")
+        config = self.get_config()
+        fpath = config.path("turbine_properties.json")
         print(f"Attempting to read turbine properties from: {fpath}")
-        try:
-            with open(fpath) as f:
-                new = json.load(f)
-            self.turbine_properties.update(new)
+        if os.path.isfile(fpath):
             print("Turbine properties loaded")
-        except IOError:
+        else:
             print("No turbine properties file found")
-        # Calculate radius if only diameter supplied and vice versa
-        for turbine in self.turbine_properties:
-            if not "radius" in self.turbine_properties[turbine]:
-                self.turbine_properties[turbine]["radius"] = (
-                    self.turbine_properties[turbine]["diameter"] / 2
-                )
-            if not "diameter" in self.turbine_properties[turbine]:
-                self.turbine_properties[turbine]["diameter"] = (
-                    self.turbine_properties[turbine]["radius"] * 2
-                )
+        self.turbine_properties = config.turbine_properties()
 
     def read_vectrino_properties(self):
-        fpath = os.path.join(self.wdir, "config", "vectrino_properties.json")
-        try:
-            with open(fpath) as f:
-                vecprops = json.load(f)
-                self.vec_salinity = vecprops["salinity"]
+        vecprops = self.get_config().vectrino_properties()
+        self.vec_salinity = vecprops.get("salinity", 0.0)
+        if vecprops:
             print("Vectrino properties loaded")
-        except IOError:
-            self.vec_salinity = 0.0
 
     def read_fbg_properties(self):
-        fpath = os.path.join(self.wdir, "config", "fbg_properties.json")
-        try:
-            with open(fpath) as f:
-                self.fbg_properties = json.load(f)
+        self.fbg_properties = self.get_config().fbg_properties()
+        if self.fbg_properties:
             print("FBG properties loaded")
-        except IOError:
-            self.fbg_properties = {}
 
     def read_odisi_properties(self):
-        fpath = os.path.join(self.wdir, "config", "odisi_properties.json")
-        try:
-            with open(fpath) as f:
-                self.odisi_properties = json.load(f)
+        self.odisi_properties = self.get_config().odisi_properties()
+        if self.odisi_properties:
             print("ODiSI properties loaded")
-        except IOError:
-            self.odisi_properties = {}
+
+    def get_config(self):
+        """Return the cache of config files in the working directory."""
+        if self.config_cache is None or self.config_cache.wdir != self.wdir:
+            self.config_cache = configcache.ConfigCache(self.wdir)
+        return self.config_cache
 
     def is_run_done(self, section, number):
-        """Look as subfolders to determine progress of experiment."""
-        runpath = os.path.join(self.wdir, "data", "raw", section, str(number))
-        if os.path.isdir(runpath) and "metadata.json" in os.listdir(runpath):
-            return True
-        else:
-            return False
+        """Check the run index to determine progress of experiment."""
+        return self.run_index.is_done(section, number)
 
     def is_section_done(self, section):
         """Detects if a test plan section is done."""
-        done = True
-        for nrun in self.test_plan[section]["run"]:
-            if not self.is_run_done(section, nrun):
-                done = False
-        return done
+        return self.plan_scheduler.get(section).done
+
+    def settling_time(self, U):
+        """Return the time in seconds for the tank to settle after a tow at
+        ``U`` m/s from ``config/settling_times.csv``.
+        """
+        return float(self.get_config().settling_time()(U))
+
+    def on_optimize_order(self):
+        """Reorder the remaining runs in the current test plan section to
+        minimize the predicted time to execute them.
+        """
+        section = str(self.ui.comboBox_testPlanSection.currentText())
+        df = self.test_plan.get(section)
+        if df is None or "run" not in df:
+            return
+        runs = self.plan_scheduler.get(section).runs()
+        try:
+            order = testplan.optimize_order(
+                section, df, runs, self.settling_time
+            )
+            predicted = testplan.predict_duration(
+                section, df, order, self.settling_time, self.turbine_properties
+            )
+            baseline = testplan.predict_duration(
+                section, df, runs, self.settling_time, self.turbine_properties
+            )
+        except IOError:
+            QMessageBox.warning(
+                self,
+                "Cannot Optimize",
+                "Settling times not found in config/settling_times.csv",
+            )
+            return
+        self.plan_scheduler.set_order(section, order)
+        msg = (
+            "Predicted time for {} remaining runs: {:.1f} min "
+            "({:.1f} min in test plan order)".format(
+                len(order), predicted / 60, baseline / 60
+            )
+        )
+        print(msg)
+        QMessageBox.information(self, "Run Order Optimized", msg)
 
     def load_test_plan(self):
         """Load test plan from CSVs in the 'Test plan' or 'test-plan'
         subdirectory.
         """
-        tpdir = os.path.join(self.wdir, "config", "test-plan")
-        tpdir_legacy = os.path.join(self.wdir, "config", "test plan")
-        if not os.path.isdir(tpdir) and os.path.isdir(tpdir_legacy):
-            print("Using legacy test plan directory")
-            tpdir = tpdir_legacy
         self.test_plan_loaded = False
-        self.test_plan = {}
-        self.test_plan_sections = []
+        self.run_index = runindex.RunIndex(
+            os.path.join(self.wdir, "data", "raw")
+        )
+        self.test_plan = testplan.load_test_plan(self.wdir)
+        self.plan_scheduler = testplan.PlanScheduler(
+            self.test_plan, self.run_index
+        )
+        self.test_plan_sections = list(self.test_plan)
         self.test_plan_runs = []
-        if os.path.isdir(tpdir):
-            test_plan_files = os.listdir(os.path.join(tpdir))
-            for f in test_plan_files:
-                if ".csv" in f:
-                    self.test_plan[f.replace(".csv", "")] = pd.read_csv(
-                        os.path.join(tpdir, f)
-                    )
-                    self.test_plan_sections.append(f.replace(".csv", ""))
         if not self.test_plan:
-            """Clear everything from table widget. Doesn't work right now."""
-            self.ui.tableWidgetTestPlan.clearContents()
+            self.test_plan_model.clear()
             print("No test plan found in working directory")
         else:
             # Set combobox items to reflect test plan sections
@@ -510,69 +634,18 @@ class MainWindow(QMainWindow):
             self.test_plan_into_table()
 
     def test_plan_into_table(self):
-        """Takes test plan values and puts them in table widget"""
+        """Show the current test plan section in the table view"""
         section = str(self.ui.comboBox_testPlanSection.currentText())
         if section in self.test_plan:
-            paramlist = list(self.test_plan[section].columns)
-            self.ui.tableWidgetTestPlan.setColumnCount(len(paramlist) + 1)
-            self.ui.tableWidgetTestPlan.setHorizontalHeaderLabels(
-                paramlist + ["Done?"]
+            # Pick up runs saved or deleted outside of this session
+            self.plan_scheduler.refresh()
+            self.test_plan_model.set_section(
+                section, self.test_plan[section], self.run_index
             )
-            self.ui.tableWidgetTestPlan.setRowCount(
-                len(self.test_plan[section][paramlist[0]])
-            )
-            for i in range(len(paramlist)):
-                itemlist = self.test_plan[section][paramlist[i]]
-                for n in range(len(itemlist)):
-                    self.ui.tableWidgetTestPlan.setItem(
-                        n, i, QTableWidgetItem(str(itemlist[n]))
-                    )
-                    # Check if run is done
-                    if str(section).lower() != "top level":
-                        isdone = self.is_run_done(section, n)
-                        if isdone:
-                            self.ui.tableWidgetTestPlan.setItem(
-                                n, i + 1, QTableWidgetItem("Yes")
-                            )
-                            for j in range(i + 2):
-                                self.ui.tableWidgetTestPlan.item(
-                                    n, j
-                                ).setForeground(QtCore.Qt.darkGreen)
-                                self.ui.tableWidgetTestPlan.item(
-                                    n, j
-                                ).setBackground(QtCore.Qt.lightGray)
-                        else:
-                            self.ui.tableWidgetTestPlan.setItem(
-                                n, i + 1, QTableWidgetItem("No")
-                            )
-                    elif str(section).lower() == "top level":
-                        self.update_sections_done()
-                    self.ui.tableWidgetTestPlan.item(n, i).setTextAlignment(
-                        QtCore.Qt.AlignCenter
-                    )
-                    self.ui.tableWidgetTestPlan.item(
-                        n, i + 1
-                    ).setTextAlignment(QtCore.Qt.AlignCenter)
             # Set column widths
-            self.ui.tableWidgetTestPlan.setColumnWidth(0, 31)
-            self.ui.tableWidgetTestPlan.setColumnWidth(len(paramlist), 43)
-
-    def update_sections_done(self):
-        for n in range(self.ui.tableWidgetTestPlan.rowCount()):
-            #            section_type = str(self.ui.tableWidgetTestPlan.item(n, 0).text())
-            #            section_u = str(self.ui.tableWidgetTestPlan.item(n, 0).text())
-            #            print section_u
-            #            section = section_type + "-" + section_u
-            #            isdone = self.is_section_done(section)
-            #            print section
-            isdone = None
-            if isdone:
-                text = QTableWidgetItem("Yes")
-            elif isdone == None:
-                text = QTableWidgetItem("Maybe")
-            else:
-                text = QTableWidgetItem("No")
-            self.ui.tableWidgetTestPlan.setItem(n + 1, -1, text)
+            ncols = self.test_plan_model.columnCount()
+            self.ui.tableViewTestPlan.setColumnWidth(0, 31)
+            self.ui.tableViewTestPlan.setColumnWidth(ncols - 1, 43)
 
     def add_acs_checkboxes(self):
         """Add checkboxes for axes being enabled."""
@@ -670,6 +743,7 @@ class MainWindow(QMainWindow):
             self.line_edit_wdir.setText(self.wdir)
         self.wdir = str(self.line_edit_wdir.text())
         self.settings["Last working directory"] = self.wdir
+        self.load_raw_data_format()
         self.load_test_plan()
         self.read_turbine_properties()
         self.read_vectrino_properties()
@@ -728,12 +802,19 @@ class MainWindow(QMainWindow):
         section = str(self.ui.comboBox_testPlanSection.currentText())
         if str(section).lower() == "top level":
             self.ui.actionStart.setDisabled(True)
-            self.update_sections_done()
         else:
             self.ui.actionStart.setEnabled(True)
         if section in self.test_plan:
             self.test_plan_into_table()
 
+    def on_raw_data_format_change(self, action):
+        """Remember the raw data format for this working directory."""
+        fmt = action.text()
+        print("Saving raw data as", fmt, "in", self.wdir)
+        if "Raw data format" not in self.settings:
+            self.settings["Raw data format"] = {}
+        self.settings["Raw data format"][self.wdir] = fmt
+
     def on_turbine_mode_change(self, action):
         """Respond to a change in turbine mode."""
         mode = action.text()
@@ -765,6 +846,12 @@ class MainWindow(QMainWindow):
             ntm = "simulated"
         txt = f" ACS NTM controller: {ntm} "
         self.label_acs_connect.setText(txt)
+        # Poll axis status in the background
+        self.acs_status_thread = acsstatus.AcsStatusThread(self.hc)
+        self.acs_status_thread.status_updated.connect(self.update_acs)
+        self.acs_status_thread.home_counters_changed.connect(
+            self.update_home_counters
+        )
 
     def initialize_plots(self):
         # Torque trans plot
@@ -884,6 +971,80 @@ class MainWindow(QMainWindow):
             plot.add_item(curve)
             setattr(self, f"curve_aft_ni_{n}", curve)
             setattr(self, f"plot_aft_ni_{n}", plot)
+        self.create_plot_scheduler()
+
+    def create_plot_scheduler(self):
+        """Create the scheduler that redraws each dock widget's plots when
+        it's visible and its data source has advanced.
+        """
+        self.plot_scheduler = plotting.PlotScheduler()
+        acsdata = lambda: self.acsdata if self.monitoracs else None
+        nidata = lambda: self.nidata if self.monitorni else None
+        groups = [
+            (
+                "ACS",
+                self.update_plots_acs,
+                acsdata,
+                self.ui.dockWidget_acscontrol,
+            ),
+            ("AFT", self.update_plots_aft, acsdata, self.dockWidget_AFT),
+            ("NI", self.update_plots_ni, nidata, self.ui.dockWidgetNISignals),
+            (
+                "Lateral forces",
+                self.update_plots_lf,
+                nidata,
+                self.ui.dockWidget_LF,
+            ),
+            (
+                "AFT NI",
+                self.update_plots_aft_ni,
+                nidata,
+                self.dockwidget_aft_ni,
+            ),
+            (
+                "Vectrino",
+                self.update_plots_vec,
+                lambda: self.vecdata if self.monitorvec else None,
+                self.ui.dockWidgetVectrino,
+            ),
+            (
+                "FBG",
+                self.update_plots_fbg,
+                lambda: self.fbgdata if self.monitorfbg else None,
+                self.ui.dockWidget_FBG,
+            ),
+        ]
+        rates = self.settings.get("Plot refresh rates", {})
+        self.menu_plot_refresh_rate = self.ui.menuSettings.addMenu(
+            "Plot refresh rate"
+        )
+        for name, update, source, dock in groups:
+            self.plot_scheduler.add(
+                name,
+                update,
+                source,
+                dock.isVisible,
+                rate=rates.get(name, 10.0),
+            )
+            action = QtWidgets.QAction(name, self.menu_plot_refresh_rate)
+            action.triggered.connect(
+                lambda checked, name=name: self.on_plot_refresh_rate(name)
+            )
+            self.menu_plot_refresh_rate.addAction(action)
+
+    def on_plot_refresh_rate(self, name):
+        """Ask for a new refresh rate for a group of plots."""
+        rate, ok = QInputDialog.getDouble(
+            self,
+            "Plot refresh rate",
+            f"{name} plot refresh rate (Hz):",
+            self.plot_scheduler.rates[name],
+            0.1,
+            20.0,
+            1,
+        )
+        if ok:
+            self.plot_scheduler.set_rate(name, rate)
 
     def on_start(self):
         """Start whatever is visible in the tab widget."""
@@ -1019,18 +1180,9 @@ class MainWindow(QMainWindow):
         """Continue test plan"""
         section = str(self.ui.comboBox_testPlanSection.currentText())
         self.section = section
-        if not self.is_section_done(section):
+        nextrun = self.plan_scheduler.get(section).peek()
+        if nextrun is not None:
             print("Continuing", section)
-            # Find next run to do by looking in the Done? column
-            nruns = self.ui.tableWidgetTestPlan.rowCount()
-            donecol = self.ui.tableWidgetTestPlan.columnCount() - 1
-            for n in range(nruns):
-                doneval = self.ui.tableWidgetTestPlan.item(n, donecol).text()
-                if doneval == "No":
-                    nextrun = int(
-                        float(self.ui.tableWidgetTestPlan.item(n, 0).text())
-                    )
-                    break
             print("Starting run", str(nextrun))
             self.savedir = os.path.join(self.wdir, "data", "raw", section)
             self.currentrun = nextrun
@@ -1047,60 +1199,17 @@ class MainWindow(QMainWindow):
             # Get parameters from test plan
             run_props = self.test_plan[section]
             run_props = run_props[run_props.run == nextrun].iloc[0]
-            if "tare" in section.lower() and "drag" in section.lower():
-                self.do_tare_drag_tow(run_props.tow_speed)
-            elif "tare" in section.lower() and "torque" in section.lower():
-                rpm = run_props.rpm
-                revs = run_props.revs
-                dur = revs / rpm * 60
-                self.do_tare_torque_run(rpm, dur)
-            elif "strut" in section.lower() and "torque" in section.lower():
-                if "turbine" in run_props:
-                    turbine = run_props.turbine
-                else:
-                    turbine = self.turbine_properties.keys()[0]
-                ref_speed = run_props.ref_speed
-                tsr = run_props.tsr
-                radius = self.turbine_properties[turbine]["radius"]
-                revs = run_props.revs
-                self.do_strut_torque_run(ref_speed, tsr, radius, revs)
+            kind, params = testplan.run_params(
+                section, run_props, self.turbine_properties
+            )
+            if kind == "tare drag":
+                self.do_tare_drag_tow(**params)
+            elif kind == "tare torque":
+                self.do_tare_torque_run(**params)
+            elif kind == "strut torque":
+                self.do_strut_torque_run(**params)
             else:
-                # Do turbine tow
-                U = run_props.tow_speed
-                tsr = run_props.tsr
-                if "turbine" in run_props:
-                    turbine = run_props["turbine"]
-                else:
-                    turbine = list(self.turbine_properties.keys())[0]
-                if "vectrino" in run_props:
-                    vectrino = run_props.vectrino
-                else:
-                    vectrino = True
-                if vectrino:
-                    y_R = run_props["y/R"]
-                    z_H = run_props["z/H"]
-                else:
-                    y_R = z_H = None
-                try:
-                    fbg = run_props["fbg"]
-                except KeyError:
-                    fbg = False
-                try:
-                    odisi = run_props["odisi"]
-                except KeyError:
-                    odisi = False
-                settling = "settling" in section.lower()
-                self.do_turbine_tow(
-                    U=U,
-                    tsr=tsr,
-                    y_R=y_R,
-                    z_H=z_H,
-                    vectrino=vectrino,
-                    turbine=turbine,
-                    fbg=fbg,
-                    odisi=odisi,
-                    settling=settling,
-                )
+                self.do_turbine_tow(**params)
         else:
             print("'{}' is done".format(section))
             self.ui.actionStart.trigger()
@@ -1116,29 +1225,50 @@ class MainWindow(QMainWindow):
         fbg=False,
         odisi=False,
         settling=False,
+        acs_sample_rate=1000,
+        acs_bufflen=100,
+        ni_sample_rate=None,
+        ni_block_size=None,
     ):
         """Executes a single turbine tow."""
         if acsc.getMotorState(self.hc, 5)["enabled"]:
             self.abort = False
             vecsavepath = os.path.join(self.savesubdir, "vecdata")
             turbine_properties = self.turbine_properties[turbine]
-            self.turbinetow = runtypes.TurbineTow(
-                acs_ntm_hcomm=self.hc,
-                U=U,
-                tsr=tsr,
-                y_R=y_R,
-                z_H=z_H,
-                nidaq=True,
-                vectrino=vectrino,
-                vecsavepath=vecsavepath,
-                turbine_properties=turbine_properties,
-                fbg=fbg,
-                fbg_properties=self.fbg_properties,
-                odisi=odisi,
-                odisi_properties=self.odisi_properties,
-                settling=settling,
-                vec_salinity=self.vec_salinity,
-            )
+            try:
+                self.turbinetow = runtypes.TurbineTow(
+                    acs_ntm_hcomm=self.hc,
+                    U=U,
+                    tsr=tsr,
+                    y_R=y_R,
+                    z_H=z_H,
+                    nidaq=True,
+                    vectrino=vectrino,
+                    vecsavepath=vecsavepath,
+                    turbine_properties=turbine_properties,
+                    fbg=fbg,
+                    fbg_properties=self.fbg_properties,
+                    odisi=odisi,
+                    odisi_properties=self.odisi_properties,
+                    settling=settling,
+                    vec_salinity=self.vec_salinity,
+                    acs_sample_rate=acs_sample_rate,
+                    acs_bufflen=acs_bufflen,
+                    ni_sample_rate=ni_sample_rate,
+                    ni_block_size=ni_block_size,
+                    savedir=self.savesubdir,
+                    raw_data_format=self.raw_data_format,
+                )
+            except ValueError as e:
+                # Invalid DAQ settings in the test plan
+                print("Cannot start turbine tow:", e)
+                text = str(self.label_runstatus.text()).split()
+                text = " ".join(text[:3])
+                self.label_runstatus.setText(text + " cannot start ")
+                self.ui.actionStart.trigger()
+                msg = "Run cannot start: {}".format(e)
+                QMessageBox.information(self, "Cannot Start", msg)
+                return
             self.turbinetow.towfinished.connect(self.on_tow_finished)
             self.turbinetow.metadata["Name"] = self.currentname
             self.turbinetow.metadata["Turbine"] = turbine_properties
@@ -1153,6 +1283,7 @@ class MainWindow(QMainWindow):
             # if odisi:
             #     self.odisidata = self.turbinetow.odisidata
             self.run_in_progress = True
+            self.run_start_time = time.time()
             self.monitoracs = True
             self.monitorni = True
             self.monitorvec = vectrino
@@ -1180,6 +1311,7 @@ class MainWindow(QMainWindow):
         self.monitorvec = False
         self.monitorodisi = False
         self.run_in_progress = True
+        self.run_start_time = time.time()
         self.tarerun.start()
 
     def do_tare_torque_run(self, rpm, dur):
@@ -1194,6 +1326,7 @@ class MainWindow(QMainWindow):
         self.monitorodisi = True
         self.monitorvec = False
         self.run_in_progress = True
+        self.run_start_time = time.time()
         self.tarerun.start()
 
     def do_strut_torque_run(self, ref_speed, tsr, radius, revs):
@@ -1210,6 +1343,7 @@ class MainWindow(QMainWindow):
         self.monitorvec = False
         self.monitorodisi = False
         self.run_in_progress = True
+        self.run_start_time = time.time()
         self.tarerun.start()
 
     def on_tare_run_finished(self):
@@ -1226,17 +1360,16 @@ class MainWindow(QMainWindow):
         # Save data from the run that just finished
         savedir = self.savesubdir
         if not self.tarerun.aborted:
+            print("Saving to " + savedir)
             nidata = dict(self.nidata)
             if "turbine_rpm" in nidata:
                 del nidata["turbine_rpm"]
-            self.save_raw_data(savedir, "acsdata.h5", self.acsdata)
-            self.save_raw_data(savedir, "nidata.h5", nidata)
-            with open(os.path.join(savedir, "metadata.json"), "w") as fn:
-                json.dump(self.tarerun.metadata, fn, indent=4, default=str)
-            text = str(self.label_runstatus.text())
-            if "in progress" in text:
-                self.label_runstatus.setText(text[:-13] + " saved ")
-            print("Saved")
+            self.start_save(
+                savedir,
+                {"acsdata.h5": self.acsdata, "nidata.h5": nidata},
+                self.tarerun.metadata,
+                float32_keys={"nidata.h5": self.tarerun.daqthread.analogchans},
+            )
         elif self.tarerun.aborted:
             quit_msg = "Delete files from aborted run?"
             reply = QMessageBox.question(
@@ -1254,29 +1387,14 @@ class MainWindow(QMainWindow):
                     U = self.tarerun.U
                 except AttributeError:
                     U = None
-                if U == None:
-                    if (
-                        "strut" in self.section.lower()
-                        and "torque" in self.section.lower()
-                    ):
-                        idlesec = 30
-                    else:
-                        idlesec = 5
-                elif U <= 0.6:
-                    idlesec = 30
-                elif U <= 1.0:
-                    idlesec = 60
-                elif U <= 1.1:
-                    idlesec = 90
-                else:
-                    idlesec = 120
+                idlesec = testplan.tare_idle_time(self.section, U)
                 print("Waiting " + str(idlesec) + " seconds until next run")
                 QtCore.QTimer.singleShot(idlesec * 1000, self.on_idletimer)
                 # Scroll test plan so completed run is in view
                 try:
                     i = int(self.currentrun) + 1
-                    cr = self.ui.tableWidgetTestPlan.item(i, 0)
-                    self.ui.tableWidgetTestPlan.scrollToItem(cr)
+                    cr = self.test_plan_model.index(i, 0)
+                    self.ui.tableViewTestPlan.scrollTo(cr)
                 except:
                     pass
         else:
@@ -1297,26 +1415,28 @@ class MainWindow(QMainWindow):
         self.time_last_run = time.time()
         # Save data from the run that just finished
         savedir = self.savesubdir
-        if not self.turbinetow.aborted and not self.turbinetow.autoaborted:
+        if self.turbinetow.arm_failed:
+            print("Deleting files from run that couldn't start")
+            shutil.rmtree(self.savesubdir)
+            self.label_runstatus.setText(self.currentname + " not started ")
+        elif not self.turbinetow.aborted and not self.turbinetow.autoaborted:
             # Create directory and save the data inside
             print("Saving to " + savedir)
-            nidata = dict(self.nidata)
-            if "turbine_rpm" in nidata:
-                del nidata["turbine_rpm"]
-            self.save_raw_data(savedir, "acsdata.h5", self.acsdata)
-            self.save_raw_data(savedir, "nidata.h5", nidata)
+            rawdata = {}
+            # NI, ACS, and FBG data are written during the run if possible
+            if self.turbinetow.writer is None:
+                nidata = dict(self.nidata)
+                if "turbine_rpm" in nidata:
+                    del nidata["turbine_rpm"]
+                rawdata["acsdata.h5"] = self.acsdata
+                rawdata["nidata.h5"] = nidata
+                if self.turbinetow.fbg:
+                    rawdata["fbgdata.h5"] = self.fbgdata
             if self.turbinetow.vectrino:
-                self.save_raw_data(savedir, "vecdata.h5", self.vecdata)
-            if self.turbinetow.fbg:
-                self.save_raw_data(savedir, "fbgdata.h5", self.fbgdata)
+                rawdata["vecdata.h5"] = self.vecdata
             # if self.turbinetow.odisi:
-            #     self.save_raw_data(savedir, "odisidata.h5", self.odisidata)
-            with open(os.path.join(savedir, "metadata.json"), "w") as fn:
-                json.dump(self.turbinetow.metadata, fn, indent=4, default=str)
-            text = str(self.label_runstatus.text())
-            if "in progress" in text:
-                self.label_runstatus.setText(text[:-13] + " saved ")
-            print("Saved")
+            #     rawdata["odisidata.h5"] = self.odisidata
+            cmdlist = None
             if self.autoprocess:
                 section = self.section
                 nrun = str(self.currentrun)
@@ -1328,7 +1448,15 @@ class MainWindow(QMainWindow):
                     )
                 )
                 cmdlist = ["cd", "/D", self.wdir, "&", "python", "-c", pycmd]
-                subprocess.call(cmdlist, shell=True)
+            self.start_save(
+                savedir,
+                rawdata,
+                self.turbinetow.metadata,
+                float32_keys={
+                    "nidata.h5": self.turbinetow.daqthread.analogchans
+                },
+                postcmd=cmdlist,
+            )
         elif self.turbinetow.aborted:
             quit_msg = "Delete files from aborted run?"
             reply = QMessageBox.question(
@@ -1341,21 +1469,17 @@ class MainWindow(QMainWindow):
             shutil.rmtree(self.savesubdir)
         # Update test plan table
         self.test_plan_into_table()
+        if self.turbinetow.arm_failed:
+            # Stop instead of retrying while the instruments aren't ready
+            if self.ui.actionStart.isChecked():
+                self.ui.actionStart.trigger()
         # If executing a test plan start a single shot timer for next run
-        if self.ui.tabTestPlan.isVisible():
+        elif self.ui.tabTestPlan.isVisible():
             if self.ui.actionStart.isChecked():
                 if self.turbinetow.autoaborted or self.turbinetow.settling:
                     idlesec = 5
                 else:
-                    tow_speed = self.turbinetow.U
-                    stpath = os.path.join(
-                        self.wdir, "config", "settling_times.csv"
-                    )
-                    stdf = pd.read_csv(stpath)
-                    f_interp = scipy.interpolate.interp1d(
-                        stdf.tow_speed, stdf.settling_time
-                    )
-                    idlesec = f_interp(tow_speed)
+                    idlesec = self.settling_time(self.turbinetow.U)
                 print("Waiting " + str(idlesec) + " seconds until next run")
                 QtCore.QTimer.singleShot(
                     int(idlesec * 1000), self.on_idletimer
@@ -1363,8 +1487,8 @@ class MainWindow(QMainWindow):
                 # Scroll test plan so completed run is in view
                 try:
                     i = int(self.currentrun) + 1
-                    cr = self.ui.tableWidgetTestPlan.item(i, 0)
-                    self.ui.tableWidgetTestPlan.scrollToItem(cr)
+                    cr = self.test_plan_model.index(i, 0)
+                    self.ui.tableViewTestPlan.scrollTo(cr)
                 except:
                     pass
         else:
@@ -1376,8 +1500,45 @@ class MainWindow(QMainWindow):
         self.fbgdata = {}
         # self.odisidata = {}
 
+    def start_save(
+        self, savedir, rawdata, metadata, float32_keys={}, postcmd=None
+    ):
+        """Save data from a run in a separate thread.
+
+        The test plan table is updated once the save is complete.
+        """
+        self.savethread = writers.SaveThread(
+            savedir,
+            rawdata,
+            metadata,
+            fmt=self.raw_data_format,
+            float32_keys=float32_keys,
+            postcmd=postcmd,
+            timing_since=self.run_start_time,
+        )
+        self.savethread.saved.connect(self.on_saved)
+        self.savethread.start()
+
+    def on_saved(self, savedir):
+        if self.savethread.error is not None:
+            print("Failed to save to " + savedir)
+        else:
+            section, nrun = os.path.split(
+                os.path.relpath(savedir, self.run_index.rawdir)
+            )
+            self.plan_scheduler.mark_done(section, nrun)
+            text = str(self.label_runstatus.text())
+            if "in progress" in text:
+                self.label_runstatus.setText(text[:-13] + " saved ")
+            print("Saved")
+        self.test_plan_into_table()
+
     def on_idletimer(self):
         if self.ui.actionStart.isChecked():
+            # Wait for the previous run to be saved so it's marked as done
+            if self.savethread is not None and self.savethread.isRunning():
+                QtCore.QTimer.singleShot(500, self.on_idletimer)
+                return
             self.do_test_plan()
 
     def on_monitor_acs(self):
@@ -1478,20 +1639,18 @@ class MainWindow(QMainWindow):
             acsc.disable(self.hc, 6)
 
     def on_timer(self):
-        self.update_acs()
         self.time_since_last_run = time.time() - self.time_last_run
         self.label_timer.setText(
             "Time since last run: "
             + str(int(self.time_since_last_run))
             + " s "
         )
+        if self.dockwidget_timing.isVisible():
+            self.update_timing_table()
 
     def on_plot_timer(self):
-        if self.monitoracs:
-            self.update_plots_acs()
-            self.update_plots_aft()
         if self.monitorvec:
-            self.update_plots_vec()
+            self.check_vecdata()
             try:
                 if not self.run_in_progress:
                     self.label_vecstatus.setText(self.vecthread.vecstatus)
@@ -1499,10 +1658,7 @@ class MainWindow(QMainWindow):
                     self.label_vecstatus.setText(self.turbinetow.vecstatus)
             except AttributeError:
                 pass
-        if self.monitorni:
-            self.update_plots_ni()
-        if self.monitorfbg:
-            self.update_plots_fbg()
+        self.plot_scheduler.tick()
         # if self.monitorodisi:
         #     self.update_plots_odisi()
 
@@ -1527,35 +1683,98 @@ class MainWindow(QMainWindow):
             shell=True,
         )
 
+    def set_curve_data(self, curve, plot, t, y):
+        """Set the data for a curve, showing only the last ``plot_len_sec``
+        seconds, min/max decimated to the width of the plot in pixels, so the
+        cost of redrawing doesn't grow with the length of the run.
+        """
+        t, y = plotting.window_decimate(t, y, self.plot_len_sec, plot.width())
+        curve.set_data(t, y)
+
     def update_plots_acs(self):
         """Update the acs plots for carriage speed, rpm, and tsr"""
         t = self.acsdata["time"]
-        self.curve_acs_carvel.set_data(t, self.acsdata["carriage_vel"])
+        self.set_curve_data(
+            self.curve_acs_carvel,
+            self.plot_acs_carvel,
+            t,
+            self.acsdata["carriage_vel"],
+        )
         self.plot_acs_carvel.replot()
-        self.curve_acs_rpm.set_data(t, self.acsdata["turbine_rpm"])
+        self.set_curve_data(
+            self.curve_acs_rpm,
+            self.plot_acs_rpm,
+            t,
+            self.acsdata["turbine_rpm"],
+        )
         self.plot_acs_rpm.replot()
 
     def update_plots_ni(self):
         t = self.nidata["time"]
         if "drag_left" in self.nidata:
-            self.curve_drag_left.set_data(t, self.nidata["drag_left"])
+            self.set_curve_data(
+                self.curve_drag_left,
+                self.plot_drag_left,
+                t,
+                self.nidata["drag_left"],
+            )
             self.plot_drag_left.replot()
-            self.curve_torque_trans.set_data(t, self.nidata["torque_trans"])
-            self.curve_torque_arm.set_data(t, self.nidata["torque_arm"])
+            self.set_curve_data(
+                self.curve_torque_trans,
+                self.plot_torque,
+                t,
+                self.nidata["torque_trans"],
+            )
+            self.set_curve_data(
+                self.curve_torque_arm,
+                self.plot_torque,
+                t,
+                self.nidata["torque_arm"],
+            )
             self.plot_torque.replot()
-            self.curve_drag_right.set_data(t, self.nidata["drag_right"])
+            self.set_curve_data(
+                self.curve_drag_right,
+                self.plot_drag_right,
+                t,
+                self.nidata["drag_right"],
+            )
             self.plot_drag_right.replot()
             if len(self.nidata["drag_left"]) == len(self.nidata["drag_right"]):
-                self.curve_drag.set_data(
-                    t, self.nidata["drag_left"] + self.nidata["drag_right"]
+                # Only sum the samples that will be plotted
+                i0 = plotting.window_start(t, self.plot_len_sec)
+                self.set_curve_data(
+                    self.curve_drag,
+                    self.plot_drag,
+                    t[i0:],
+                    self.nidata["drag_left"][i0:]
+                    + self.nidata["drag_right"][i0:],
                 )
                 self.plot_drag.replot()
-            self.curve_rpm_ni.set_data(t, self.nidata["turbine_rpm"])
+            self.set_curve_data(
+                self.curve_rpm_ni,
+                self.plot_rpm_ni,
+                t,
+                self.nidata["turbine_rpm"],
+            )
             self.plot_rpm_ni.replot()
-            self.curve_LF_left.set_data(t, self.nidata["LF_left"])
-            self.curve_LF_right.set_data(t, self.nidata["LF_right"])
-            self.plot_LF.replot()
-        elif "resistor_temp" in self.nidata:
+
+    def update_plots_lf(self):
+        """Update the lateral force plot."""
+        if "LF_left" not in self.nidata:
+            return
+        t = self.nidata["time"]
+        self.set_curve_data(
+            self.curve_LF_left, self.plot_LF, t, self.nidata["LF_left"]
+        )
+        self.set_curve_data(
+            self.curve_LF_right, self.plot_LF, t, self.nidata["LF_right"]
+        )
+        self.plot_LF.replot()
+
+    def update_plots_aft_ni(self):
+        """Update the AFT NI-DAQ plots."""
+        t = self.nidata["time"]
+        if "resistor_temp" in self.nidata:
             # Create a list of keys in order of the plots
             signals = [
                 "resistor_temp",
@@ -1566,34 +1785,49 @@ class MainWindow(QMainWindow):
             for n, signal in enumerate(signals):
                 n_plot = n + 1  # These are 1-indexed per their names
                 curve = getattr(self, f"curve_aft_ni_{n_plot}")
-                curve.set_data(t, self.nidata[signal])
                 plot = getattr(self, f"plot_aft_ni_{n_plot}")
+                self.set_curve_data(curve, plot, t, self.nidata[signal])
                 plot.replot()
 
-    def update_plots_vec(self):
-        """This function updates the Vectrino plots."""
+    def check_vecdata(self):
+        """Check the start of a run for bad Vectrino data."""
         t = self.vecdata["time"]
         if len(t) > 400 and len(t) < 600 and self.run_in_progress:
             if len(np.where(np.abs(self.vecdata["v"][:450]) > 0.5)[0]) > 50:
                 self.badvecdata.emit()
+
+    def update_plots_vec(self):
+        """This function updates the Vectrino plots."""
+        t = self.vecdata["time"]
         meancorr = self.vecdata["corr_u"]
         meansnr = self.vecdata["snr_u"]
-        self.curve_vecu.set_data(t, self.vecdata["u"])
+        self.set_curve_data(
+            self.curve_vecu, self.plot_vecu, t, self.vecdata["u"]
+        )
         self.plot_vecu.replot()
-        self.curve_vecv.set_data(t, self.vecdata["v"])
+        self.set_curve_data(
+            self.curve_vecv, self.plot_vecv, t, self.vecdata["v"]
+        )
         self.plot_vecv.replot()
-        self.curve_vecw.set_data(t, self.vecdata["w"])
+        self.set_curve_data(
+            self.curve_vecw, self.plot_vecw, t, self.vecdata["w"]
+        )
         self.plot_vecw.replot()
-        self.curve_vec_corr.set_data(t, meancorr)
+        self.set_curve_data(
+            self.curve_vec_corr, self.plot_vec_corr, t, meancorr
+        )
         self.plot_vec_corr.replot()
-        self.curve_vec_snr.set_data(t, meansnr)
+        self.set_curve_data(self.curve_vec_snr, self.plot_vec_snr, t, meansnr)
         self.plot_vec_snr.replot()
 
     def update_plots_fbg(self):
         """This function updates the FBG plots."""
         t = self.fbgdata["time"]
-        for fbg, curve in zip(self.fbgs, self.fbg_curves):
-            curve.set_data(t, self.fbgdata[fbg.name + "_strain"])
+        for n, (fbg, curve) in enumerate(zip(self.fbgs, self.fbg_curves)):
+            plot = self.fbg_plot_list[n % 5]
+            self.set_curve_data(
+                curve, plot, t, self.fbgdata[fbg.name + "_strain"]
+            )
         for plot in self.fbg_plot_list:
             plot.replot()
 
@@ -1612,115 +1846,56 @@ class MainWindow(QMainWindow):
             curve = getattr(self, f"curve_aft_{channel}")
             plot = getattr(self, f"plot_aft_{channel}")
             data = self.acsdata[f"load_cell_ch{channel}"]
-            curve.set_data(t, data)
+            self.set_curve_data(curve, plot, t, data)
             plot.replot()
 
-    def update_acs(self):
-        """Update all the non-time-critical ACS controller data."""
-        if self.hc is None:
-            return
-        self.checkbox_y_axis.setChecked(
-            acsc.getMotorState(self.hc, 0)["enabled"]
-        )
-        self.checkbox_z_axis.setChecked(
-            acsc.getMotorState(self.hc, 1)["enabled"]
-        )
-        self.checkbox_turbine_axis.setChecked(
-            acsc.getMotorState(self.hc, 4)["enabled"]
-        )
-        self.checkbox_tow_axis.setChecked(
-            acsc.getMotorState(self.hc, 5)["enabled"]
-        )
-        self.checkbox_aft_axis.setChecked(
-            acsc.getMotorState(self.hc, 6)["enabled"]
-        )
+    def update_acs(self, status):
+        """Update all the non-time-critical ACS controller data from a status
+        snapshot published by the ACS status thread.
+        """
+        for name, enabled in status.enabled.items():
+            getattr(self, f"checkbox_{name}_axis").setChecked(enabled)
         # Put this data into table widget
-        try:
-            hc_tow = acsc.readInteger(self.hc, acsc.NONE, "homeCounter_tow")
-        except acsc.AcscError:
-            hc_tow = 0
-        try:
-            hc_turbine = acsc.readInteger(
-                self.hc, acsc.NONE, "homeCounter_AKD"
+        for row, name in enumerate(acsstatus.AXES):
+            self.ui.tableWidget_acs.item(row, 3).setText(
+                str(status.rpos[name])
+            )
+            self.ui.tableWidget_acs.item(row, 4).setText(
+                str(status.fpos[name])
+            )
+            self.ui.tableWidget_acs.item(row, 5).setText(
+                str(status.fvel[name])
             )
-        except acsc.AcscError:
-            hc_turbine = 0
-        try:
-            hc_y = acsc.readInteger(self.hc, acsc.NONE, "homeCounter_y")
-        except acsc.AcscError:
-            hc_y = 0
-        try:
-            hc_z = acsc.readInteger(self.hc, acsc.NONE, "homeCounter_z")
-        except acsc.AcscError:
-            hc_z = 0
-        try:
-            hc_aft = acsc.readInteger(self.hc, acsc.NONE, "homeCounter_AFT")
-        except acsc.AcscError:
-            hc_aft = 0
-        self.ui.tableWidget_acs.item(0, 2).setText(str(hc_tow))
-        self.ui.tableWidget_acs.item(1, 2).setText(str(hc_turbine))
-        self.ui.tableWidget_acs.item(2, 2).setText(str(hc_y))
-        self.ui.tableWidget_acs.item(3, 2).setText(str(hc_z))
-        self.ui.tableWidget_acs.item(4, 2).setText(str(hc_aft))
-        # Set reference position text
-        self.ui.tableWidget_acs.item(0, 3).setText(
-            str(acsc.getRPosition(self.hc, 5))
-        )
-        self.ui.tableWidget_acs.item(1, 3).setText(
-            str(acsc.getRPosition(self.hc, 4))
-        )
-        self.ui.tableWidget_acs.item(2, 3).setText(
-            str(acsc.getRPosition(self.hc, 0))
-        )
-        self.ui.tableWidget_acs.item(3, 3).setText(
-            str(acsc.getRPosition(self.hc, 1))
-        )
-        self.ui.tableWidget_acs.item(4, 3).setText(
-            str(acsc.getRPosition(self.hc, 6))
-        )
-        # Set feedback position text
-        self.ui.tableWidget_acs.item(0, 4).setText(
-            str(acsc.getFPosition(self.hc, 5))
-        )
-        self.ui.tableWidget_acs.item(1, 4).setText(
-            str(acsc.getFPosition(self.hc, 4))
-        )
-        self.ui.tableWidget_acs.item(2, 4).setText(
-            str(acsc.getFPosition(self.hc, 0))
-        )
-        self.ui.tableWidget_acs.item(3, 4).setText(
-            str(acsc.getFPosition(self.hc, 1))
-        )
-        self.ui.tableWidget_acs.item(4, 4).setText(
-            str(acsc.getFPosition(self.hc, 6))
-        )
-        # Set feedback velocity text
-        self.ui.tableWidget_acs.item(0, 5).setText(
-            str(acsc.getFVelocity(self.hc, 5))
-        )
-        self.ui.tableWidget_acs.item(1, 5).setText(
-            str(acsc.getFVelocity(self.hc, 4))
-        )
-        self.ui.tableWidget_acs.item(2, 5).setText(
-            str(acsc.getFVelocity(self.hc, 0))
-        )
-        self.ui.tableWidget_acs.item(3, 5).setText(
-            str(acsc.getFVelocity(self.hc, 1))
-        )
-        self.ui.tableWidget_acs.item(4, 5).setText(
-            str(acsc.getFVelocity(self.hc, 6))
-        )
 
-    def save_raw_data(self, savedir, fname, datadict, verbose=True):
-        """Saves a dict of raw data in HDF5 format."""
-        fpath = os.path.join(savedir, fname)
+    def update_home_counters(self, home_counters):
+        """Update the home counters in the ACS table widget."""
+        for row, name in enumerate(acsstatus.AXES):
+            self.ui.tableWidget_acs.item(row, 2).setText(
+                str(home_counters[name])
+            )
+
+    def save_raw_data(
+        self, savedir, fname, datadict, verbose=True, float32_keys=()
+    ):
+        """Saves a dict of raw data in HDF5 format.
+
+        Data are saved in the raw data format selected for the working
+        directory, in which case any columns in ``float32_keys`` may be
+        stored with single precision.
+        """
         if verbose:
             print("Saving {} to {}".format(fname, savedir))
-        if not os.path.isdir(savedir):
-            os.makedirs(savedir)
-        ts.savehdf(fpath, datadict)
+        writers.save_raw_data(
+            savedir,
+            fname,
+            datadict,
+            fmt=self.raw_data_format,
+            float32_keys=float32_keys,
+        )
 
     def closeEvent(self, event):
+        if self.savethread is not None:
+            self.savethread.wait()
         self.settings["Last working directory"] = self.wdir
         self.settings["Last window location"] = [
             self.pos().x(),
@@ -1740,6 +1915,7 @@ class MainWindow(QMainWindow):
         self.settings["ODiSI visible"] = self.ui.dockWidget_ODiSI.isVisible()
         self.settings["AFT visible"] = self.dockWidget_AFT.isVisible()
         self.settings["AFT NI visible"] = self.dockwidget_aft_ni.isVisible()
+        self.settings["Timing visible"] = self.dockwidget_timing.isVisible()
         self.settings["Lateral forces visible"] = (
             self.ui.dockWidget_LF.isVisible()
         )
@@ -1750,6 +1926,7 @@ class MainWindow(QMainWindow):
         # self.settings[
         #     "Shakedown lateral forces"
         # ] = self.ui.checkBox_singleRunLF.isChecked()
+        self.settings["Plot refresh rates"] = self.plot_scheduler.rates
         self.settings["Vectrino visible"] = (
             self.ui.dockWidgetVectrino.isVisible()
         )
@@ -1781,6 +1958,8 @@ class MainWindow(QMainWindow):
             os.mkdir(settings_dir)
         with open(self.settings_fpath, "w") as fn:
             json.dump(self.settings, fn, indent=4, default=str)
+        self.acs_status_thread.stop()
+        self.acs_status_thread.wait()
         acsc.closeComm(self.hc)
         self.hc = None
         if self.monitorni and not self.run_in_progress:
@@ -1791,6 +1970,9 @@ class MainWindow(QMainWindow):
             self.fbgthread.stop()
         if self.monitorodisi and not self.run_in_progress:
             self.odisithread.stop()
+        # Release the NI DAQ tasks kept for reuse between runs
+        if not self.run_in_progress:
+            daqtasks.task_pool.close()
 
 
 def main():
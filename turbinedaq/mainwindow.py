@@ -2,7 +2,7 @@
 
 # Form implementation generated from reading ui file 'gui/mainwindow.ui'
 #
-# Created by: PyQt5 UI code generator 5.15.9
+# Created by: PyQt5 UI code generator 5.15.11
 #
 # WARNING: Any manual changes made to this file will be lost when pyuic5 is
 # run again.  Do not edit this file unless you know what you are doing.
@@ -175,40 +175,24 @@ class Ui_MainWindow(object):
         self.toolButtonOpenSection = QtWidgets.QToolButton(self.tabTestPlan)
         self.toolButtonOpenSection.setObjectName("toolButtonOpenSection")
         self.gridLayout_9.addWidget(self.toolButtonOpenSection, 0, 2, 1, 1)
-        self.tableWidgetTestPlan = QtWidgets.QTableWidget(self.tabTestPlan)
-        self.tableWidgetTestPlan.setMaximumSize(QtCore.QSize(367, 16777215))
-        self.tableWidgetTestPlan.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAsNeeded)
-        self.tableWidgetTestPlan.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAsNeeded)
-        self.tableWidgetTestPlan.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
-        self.tableWidgetTestPlan.setAlternatingRowColors(False)
-        self.tableWidgetTestPlan.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
-        self.tableWidgetTestPlan.setTextElideMode(QtCore.Qt.ElideMiddle)
-        self.tableWidgetTestPlan.setObjectName("tableWidgetTestPlan")
-        self.tableWidgetTestPlan.setColumnCount(7)
-        self.tableWidgetTestPlan.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableWidgetTestPlan.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableWidgetTestPlan.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableWidgetTestPlan.setHorizontalHeaderItem(2, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableWidgetTestPlan.setHorizontalHeaderItem(3, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableWidgetTestPlan.setHorizontalHeaderItem(4, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableWidgetTestPlan.setHorizontalHeaderItem(5, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableWidgetTestPlan.setHorizontalHeaderItem(6, item)
-        self.tableWidgetTestPlan.horizontalHeader().setDefaultSectionSize(57)
-        self.tableWidgetTestPlan.horizontalHeader().setMinimumSectionSize(20)
-        self.tableWidgetTestPlan.horizontalHeader().setStretchLastSection(False)
-        self.tableWidgetTestPlan.verticalHeader().setVisible(False)
-        self.tableWidgetTestPlan.verticalHeader().setDefaultSectionSize(15)
-        self.tableWidgetTestPlan.verticalHeader().setHighlightSections(False)
-        self.tableWidgetTestPlan.verticalHeader().setMinimumSectionSize(15)
-        self.tableWidgetTestPlan.verticalHeader().setStretchLastSection(False)
-        self.gridLayout_9.addWidget(self.tableWidgetTestPlan, 1, 0, 1, 3)
+        self.tableViewTestPlan = QtWidgets.QTableView(self.tabTestPlan)
+        self.tableViewTestPlan.setMaximumSize(QtCore.QSize(367, 16777215))
+        self.tableViewTestPlan.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAsNeeded)
+        self.tableViewTestPlan.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAsNeeded)
+        self.tableViewTestPlan.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.tableViewTestPlan.setAlternatingRowColors(False)
+        self.tableViewTestPlan.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.tableViewTestPlan.setTextElideMode(QtCore.Qt.ElideMiddle)
+        self.tableViewTestPlan.setObjectName("tableViewTestPlan")
+        self.tableViewTestPlan.horizontalHeader().setDefaultSectionSize(57)
+        self.tableViewTestPlan.horizontalHeader().setMinimumSectionSize(20)
+        self.tableViewTestPlan.horizontalHeader().setStretchLastSection(False)
+        self.tableViewTestPlan.verticalHeader().setVisible(False)
+        self.tableViewTestPlan.verticalHeader().setDefaultSectionSize(15)
+        self.tableViewTestPlan.verticalHeader().setHighlightSections(False)
+        self.tableViewTestPlan.verticalHeader().setMinimumSectionSize(15)
+        self.tableViewTestPlan.verticalHeader().setStretchLastSection(False)
+        self.gridLayout_9.addWidget(self.tableViewTestPlan, 1, 0, 1, 3)
         self.tabWidgetMode.addTab(self.tabTestPlan, "")
         self.tabProcessing = QtWidgets.QWidget()
         self.tabProcessing.setObjectName("tabProcessing")
@@ -837,20 +821,6 @@ class Ui_MainWindow(object):
         self.tabWidgetMode.setTabText(self.tabWidgetMode.indexOf(self.tabSingleRun), _translate("MainWindow", "Shakedown Run"))
         self.label_32.setText(_translate("MainWindow", "Section"))
         self.toolButtonOpenSection.setText(_translate("MainWindow", "..."))
-        item = self.tableWidgetTestPlan.horizontalHeaderItem(0)
-        item.setText(_translate("MainWindow", "Run"))
-        item = self.tableWidgetTestPlan.horizontalHeaderItem(1)
-        item.setText(_translate("MainWindow", "Turbine"))
-        item = self.tableWidgetTestPlan.horizontalHeaderItem(2)
-        item.setText(_translate("MainWindow", "U (m/s)"))
-        item = self.tableWidgetTestPlan.horizontalHeaderItem(3)
-        item.setText(_translate("MainWindow", "λ"))
-        item = self.tableWidgetTestPlan.horizontalHeaderItem(4)
-        item.setText(_translate("MainWindow", "y/R"))
-        item = self.tableWidgetTestPlan.horizontalHeaderItem(5)
-        item.setText(_translate("MainWindow", "z/H"))
-        item = self.tableWidgetTestPlan.horizontalHeaderItem(6)
-        item.setText(_translate("MainWindow", "Done?"))
         self.tabWidgetMode.setTabText(self.tabWidgetMode.indexOf(self.tabTestPlan), _translate("MainWindow", "Test Plan"))
         self.groupBox.setTitle(_translate("MainWindow", "Results"))
         self.label_20.setText(_translate("MainWindow", "C_P"))
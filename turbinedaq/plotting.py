@@ -0,0 +1,151 @@
+"""Functions for preparing data for live plots."""
+
+import time
+
+import numpy as np
+
+from turbinedaq import timing
+
+
+def window_start(t, length):
+    """Return the index of the first sample in the last ``length`` seconds of
+    the monotonic time array ``t``.
+    """
+    if len(t) == 0:
+        return 0
+    return int(np.searchsorted(t, t[-1] - length))
+
+
+def minmax_decimate(x, y, nbins):
+    """Reduce ``x`` and ``y`` to the minimum and maximum of ``y`` in each of
+    ``nbins`` equal-length bins, kept in their original order.
+
+    Since each bin maps to roughly one pixel column, the plotted envelope
+    looks the same as plotting every sample, but the number of points is
+    bounded by the plot width rather than the length of the data.
+    """
+    n = min(len(x), len(y))
+    x = np.asarray(x[:n])
+    y = np.asarray(y[:n])
+    nbins = max(int(nbins), 1)
+    if n <= 2 * nbins:
+        return x, y
+    binsize = n // nbins
+    nfull = nbins * binsize
+    bins = y[:nfull].reshape(nbins, binsize)
+    offsets = np.arange(nbins) * binsize
+    imin = np.argmin(bins, axis=1) + offsets
+    imax = np.argmax(bins, axis=1) + offsets
+    ind = [imin, imax]
+    # Keep the samples left over after the last full bin
+    if nfull < n:
+        tail = y[nfull:]
+        ind.append([nfull + np.argmin(tail), nfull + np.argmax(tail)])
+    # Always end on the latest sample, and don't repeat samples that are both
+    # the minimum and maximum of a bin
+    ind.append([n - 1])
+    ind = np.unique(np.concatenate(ind))
+    return x[ind], y[ind]
+
+
+def window_decimate(t, y, length, nbins):
+    """Slice ``t`` and ``y`` to the last ``length`` seconds and min/max
+    decimate to ``nbins`` bins.
+    """
+    n = min(len(t), len(y))
+    t, y = t[:n], y[:n]
+    i0 = window_start(t, length)
+    return minmax_decimate(t[i0:], y[i0:], nbins)
+
+
+def data_generation(data):
+    """Return a value that changes whenever new samples are added to a data
+    mapping.
+
+    Mappings with a ``generation`` counter, e.g., ``DataBuffer`` objects,
+    use it directly. Otherwise the length of the time array is used.
+    """
+    generation = getattr(data, "generation", None)
+    if generation is None:
+        try:
+            generation = len(data["time"])
+        except KeyError:
+            generation = 0
+    return id(data), generation
+
+
+class PlotGroup(object):
+    """A group of plots, e.g., in one dock widget, updated together from a
+    single data source.
+
+    Parameters
+    ----------
+    update : callable
+        Function that sets the curve data and replots.
+    source : callable
+        Function that returns the data mapping to plot, or ``None`` if the
+        source isn't being monitored.
+    visible : callable
+        Function that returns whether the plots are visible.
+    rate : float
+        Maximum refresh rate in Hz.
+    """
+
+    def __init__(self, update, source, visible, rate=10.0):
+        self.update = update
+        self.source = source
+        self.visible = visible
+        self.rate = rate
+        self.last_time = 0.0
+        self.last_generation = None
+
+    def is_due(self, now):
+        """Return whether the plots should be redrawn, i.e., they are
+        visible, new data has arrived, and enough time has passed.
+        """
+        if now - self.last_time < 1.0 / self.rate:
+            return False
+        if not self.visible():
+            return False
+        data = self.source()
+        if data is None:
+            return False
+        generation = data_generation(data)
+        if generation == self.last_generation:
+            return False
+        self.last_generation = generation
+        return True
+
+
+class PlotScheduler(object):
+    """Redraws groups of plots only when they are visible and their data
+    source has advanced, each at its own refresh rate.
+    """
+
+    def __init__(self):
+        self.groups = {}
+
+    def add(self, name, update, source, visible, rate=10.0):
+        self.groups[name] = PlotGroup(update, source, visible, rate=rate)
+
+    def set_rate(self, name, rate):
+        if rate <= 0:
+            raise ValueError("Refresh rate must be positive")
+        self.groups[name].rate = rate
+
+    @property
+    def rates(self):
+        return {name: group.rate for name, group in self.groups.items()}
+
+    def tick(self, now=None):
+        """Update all plot groups that are due, returning their names."""
+        if now is None:
+            now = time.time()
+        updated = []
+        for name, group in self.groups.items():
+            if group.is_due(now):
+                with timing.measure(f"Plot refresh ({name})"):
+                    group.update()
+                group.last_time = now
+                updated.append(name)
+        return updated
@@ -0,0 +1,170 @@
+"""Index of which runs have been saved.
+
+A run is done once its ``metadata.json`` has been saved in
+``data/raw/<section>/<run>``. Checking that for every run of a large test plan
+on a network share is slow, so the index scans the raw data directory once,
+keeps the done runs in memory, and persists them to a small manifest. The
+modification time of each section directory is stored alongside its runs, so
+only sections where run directories have been added or removed since, e.g.,
+by deleting a run to redo it, need to be rescanned. Run directories that
+exist but aren't done yet are stored too, since saving a run's metadata
+into its existing directory, e.g., by the run engine or a save still in
+progress, doesn't change the section directory. Likewise, deleting only a
+run's metadata doesn't, so in unchanged sections each indexed run's metadata
+is checked again, which still avoids listing every section directory.
+"""
+
+import json
+import os
+
+# File name of the manifest, saved in the raw data directory
+MANIFEST_FNAME = "run-index.json"
+
+
+class RunIndex(object):
+    """Index of done runs in a raw data directory.
+
+    Parameters
+    ----------
+    rawdir : str
+        Raw data directory, i.e., ``data/raw`` inside the working directory.
+    """
+
+    def __init__(self, rawdir):
+        self.rawdir = rawdir
+        self.fpath = os.path.join(rawdir, MANIFEST_FNAME)
+        # Done run numbers, run numbers with directories that aren't done
+        # yet, and directory modification time for each section
+        self.runs = {}
+        self.pending = {}
+        self.mtimes = {}
+        self.load()
+        self.refresh()
+
+    def load(self):
+        """Load the manifest if it exists."""
+        try:
+            with open(self.fpath) as f:
+                manifest = json.load(f)
+        except (IOError, ValueError):
+            return
+        for section, entry in manifest.items():
+            if "pending" not in entry:
+                # Written before pending runs were stored, so rescan
+                continue
+            self.runs[section] = set(entry["runs"])
+            self.pending[section] = set(entry["pending"])
+            self.mtimes[section] = entry["mtime"]
+
+    def save(self):
+        """Write the manifest, replacing it in one step so it's never left
+        partially written.
+        """
+        if not os.path.isdir(self.rawdir):
+            return
+        manifest = {
+            section: {
+                "mtime": self.mtimes.get(section),
+                "runs": sorted(runs),
+                "pending": sorted(self.pending.get(section, ())),
+            }
+            for section, runs in self.runs.items()
+        }
+        tmp = self.fpath + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self.fpath)
+
+    def metadata_exists(self, section, nrun) -> bool:
+        return os.path.isfile(
+            os.path.join(self.rawdir, section, str(nrun), "metadata.json")
+        )
+
+    def scan_section(self, section):
+        """Find the done runs and the run directories that aren't done yet
+        in a section by listing its directory.
+        """
+        sectiondir = os.path.join(self.rawdir, section)
+        runs = set()
+        pending = set()
+        for entry in os.scandir(sectiondir):
+            if not entry.is_dir():
+                continue
+            try:
+                nrun = int(entry.name)
+            except ValueError:
+                continue
+            if os.path.isfile(os.path.join(entry.path, "metadata.json")):
+                runs.add(nrun)
+            else:
+                pending.add(nrun)
+        return runs, pending
+
+    def refresh(self):
+        """Rescan sections whose directories have changed since they were
+        last indexed and check whether runs in the others have been saved or
+        had their metadata deleted since, saving the manifest if anything
+        changed.
+        """
+        if not os.path.isdir(self.rawdir):
+            changed = bool(self.runs)
+            self.runs = {}
+            self.pending = {}
+            self.mtimes = {}
+            return changed
+        sections = set()
+        changed = False
+        for entry in os.scandir(self.rawdir):
+            if not entry.is_dir():
+                continue
+            section = entry.name
+            sections.add(section)
+            mtime = entry.stat().st_mtime
+            if self.mtimes.get(section) != mtime:
+                runs, pending = self.scan_section(section)
+                self.runs[section] = runs
+                self.pending[section] = pending
+                self.mtimes[section] = mtime
+                changed = True
+                continue
+            saved = {
+                nrun
+                for nrun in self.pending.get(section, ())
+                if self.metadata_exists(section, nrun)
+            }
+            deleted = {
+                nrun
+                for nrun in self.runs[section]
+                if not self.metadata_exists(section, nrun)
+            }
+            if saved or deleted:
+                self.runs[section] = (self.runs[section] | saved) - deleted
+                self.pending[section] = (
+                    self.pending.get(section, set()) - saved
+                ) | deleted
+                changed = True
+        for section in set(self.runs) - sections:
+            del self.runs[section]
+            self.pending.pop(section, None)
+            self.mtimes.pop(section, None)
+            changed = True
+        if changed:
+            self.save()
+        return changed
+
+    def is_done(self, section, nrun) -> bool:
+        return int(nrun) in self.runs.get(section, ())
+
+    def done_runs(self, section) -> set:
+        return set(self.runs.get(section, ()))
+
+    def mark_done(self, section, nrun):
+        """Add a run that was just saved to the index."""
+        self.runs.setdefault(section, set()).add(int(nrun))
+        self.pending.get(section, set()).discard(int(nrun))
+        sectiondir = os.path.join(self.rawdir, section)
+        if os.path.isdir(sectiondir):
+            # The section directory changed when the run's directory was
+            # created, which is accounted for now
+            self.mtimes[section] = os.stat(sectiondir).st_mtime
+        self.save()
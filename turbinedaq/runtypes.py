@@ -3,6 +3,7 @@
 from __future__ import division, print_function
 
 import time
+from concurrent.futures import ThreadPoolExecutor
 from subprocess import check_output
 
 import numpy as np
@@ -10,7 +11,26 @@ from acspy import acsc
 from nortek.controls import PdControl
 from PyQt5 import QtCore
 
-from . import acsprgs, daqtasks
+from . import acsprgs, daqtasks, writers
+
+# Program state bit set while an ACS buffer is running
+PST_RUN = 0x02
+
+
+def wait_program_end(hc, nbuf, poll_ms=500):
+    """Wait for the ACSPL+ program in buffer ``nbuf`` to end.
+
+    The wait is split into short timeouts so a keyboard interrupt is handled
+    while a run is in progress.
+    """
+    while True:
+        try:
+            acsc.waitProgramEnd(hc, nbuf, poll_ms)
+            return
+        except acsc.AcscError:
+            # Timed out, unless the program ended in the meantime
+            if not acsc.getProgramState(hc, nbuf) & PST_RUN:
+                return
 
 
 class TurbineTow(QtCore.QThread):
@@ -35,6 +55,12 @@ class TurbineTow(QtCore.QThread):
         odisi_properties={},
         settling=False,
         vec_salinity=0.0,
+        acs_sample_rate=1000,
+        acs_bufflen=100,
+        ni_sample_rate=None,
+        ni_block_size=None,
+        savedir=None,
+        raw_data_format="hdf5",
     ):
         QtCore.QThread.__init__(self)
         self.hc = acs_ntm_hcomm
@@ -50,11 +76,29 @@ class TurbineTow(QtCore.QThread):
         self.fbg = fbg
         self.odisi = odisi
         self.settling = settling
+        # Estimate run duration so data buffers can be sized up front
+        self.duration = 24.5 / self.U + 30.0
+        # Use the defaults for settings left blank in the test plan
+        if acs_sample_rate is None or np.isnan(acs_sample_rate):
+            acs_sample_rate = 1000
+        if acs_bufflen is None or np.isnan(acs_bufflen):
+            acs_bufflen = 100
+        self.acs_sample_rate = acs_sample_rate
+        self.acs_bufflen = int(acs_bufflen)
         self.build_acsprg()
         if self.turbine_type == "AFT":
-            self.acsdaqthread = daqtasks.AftAcsDaqThread(self.hc)
+            self.acsdaqthread = daqtasks.AftAcsDaqThread(
+                self.hc,
+                sample_rate=self.acs_sample_rate,
+                bufflen=self.acs_bufflen,
+                pingpong=True,
+            )
         else:
-            self.acsdaqthread = daqtasks.AcsDaqThread(self.hc)
+            self.acsdaqthread = daqtasks.AcsDaqThread(
+                self.hc,
+                sample_rate=self.acs_sample_rate,
+                bufflen=self.acs_bufflen,
+            )
         self.maxvel = U * 1.3
         self.usetrigger = True
         self.vecsavepath = vecsavepath
@@ -62,7 +106,13 @@ class TurbineTow(QtCore.QThread):
         self.vecstatus = "Vectrino disconnected "
         self.autoaborted = False
         self.aborted = False
+        # Set if the instruments couldn't be armed, so nothing was recorded
+        self.arm_failed = False
         self.vec_salinity = vec_salinity
+        # Maximum time to wait for instruments to get ready, and time to let
+        # the Vectrino settle once collecting data
+        self.arm_timeout = 30.0
+        self.vec_settle_time = 6.0
         commit = check_output(["git", "rev-parse", "--verify", "HEAD"])[:-1]
         self.metadata = {
             "Tow speed (m/s)": float(U),
@@ -74,13 +124,24 @@ class TurbineTow(QtCore.QThread):
             self.vec = PdControl()
             self.metadata["Vectrino metadata"] = {"y/R": y_R, "z/H": z_H}
         if self.nidaq:
+            # Use the DAQ thread's defaults for settings left blank in the
+            # test plan
+            ni_kwargs = {}
+            if ni_sample_rate is not None and not np.isnan(ni_sample_rate):
+                ni_kwargs["sample_rate"] = float(ni_sample_rate)
+            if ni_block_size is not None and not np.isnan(ni_block_size):
+                ni_kwargs["nsamps"] = int(ni_block_size)
             if self.turbine_type == "AFT":
                 self.daqthread = daqtasks.AftNiDaqThread(
-                    usetrigger=self.usetrigger
+                    usetrigger=self.usetrigger,
+                    duration=self.duration,
+                    **ni_kwargs,
                 )
             else:
                 self.daqthread = daqtasks.NiDaqThread(
-                    usetrigger=self.usetrigger
+                    usetrigger=self.usetrigger,
+                    duration=self.duration,
+                    **ni_kwargs,
                 )
             self.nidata = self.daqthread.data
             self.metadata["NI metadata"] = self.daqthread.metadata
@@ -94,6 +155,23 @@ class TurbineTow(QtCore.QThread):
             self.odisithread = daqtasks.ODiSIDaqThread(odisi_properties)
             self.metadata["ODiSI metadata"] = self.odisithread.metadata
             # self.odisidata = self.odisithread.data
+        # If we know where to save, write data to disk as it's collected
+        self.writer = None
+        if savedir is not None:
+            sources = {"acsdata.h5": self.acsdaqthread.data}
+            float32_keys = {}
+            if self.nidaq:
+                sources["nidata.h5"] = self.nidata
+                float32_keys["nidata.h5"] = self.daqthread.analogchans
+            if self.fbg:
+                sources["fbgdata.h5"] = self.fbgdata
+            self.writer = writers.HdfStreamWriter(
+                savedir,
+                sources,
+                exclude={"nidata.h5": ["turbine_rpm"]},
+                fmt=raw_data_format,
+                float32_keys=float32_keys,
+            )
 
     def build_acsprg(self):
         """Create the ACSPL+ program for running the run.
@@ -110,6 +188,8 @@ class TurbineTow(QtCore.QThread):
             self.R,
             endpos=endpos,
             turbine_type=self.turbine_type,
+            sample_period_ms=1000.0 / self.acs_sample_rate,
+            n_buffer_rows=self.acs_bufflen,
         )
 
     def setvecconfig(self):
@@ -152,71 +232,124 @@ class TurbineTow(QtCore.QThread):
         ] = self.vec.sampling_volume
         print("Vectrino configuration set")
 
-    def run(self):
-        """Start the run.
+    def move_traverse(self):
+        """Move the y- and z-axes to the Vectrino measurement location and
+        disable them once in position.
+        """
+        acsc.enable(self.hc, 0)
+        acsc.enable(self.hc, 1)
+        while (
+            not acsc.getMotorState(self.hc, 0)["enabled"]
+            or not acsc.getMotorState(self.hc, 1)["enabled"]
+        ):
+            time.sleep(0.1)
+        acsc.toPoint(self.hc, None, 0, self.y_R * self.R)
+        acsc.toPoint(self.hc, None, 1, self.z_H * self.H)
+        while (
+            not acsc.getMotorState(self.hc, 0)["in position"]
+            or not acsc.getMotorState(self.hc, 1)["in position"]
+        ):
+            time.sleep(0.3)
+        print("y- and z-axes in position")
+        acsc.disable(self.hc, 0)
+        acsc.disable(self.hc, 1)
 
-        Comms should be open already with the controller.
+    def arm_vectrino(self) -> bool:
+        """Connect to and configure the Vectrino and start it waiting for
+        the trigger, returning whether it's ready.
         """
-        acsc.setOutput(self.hc, 1, 16, 0)
-        if self.vectrino:
-            acsc.enable(self.hc, 0)
-            acsc.enable(self.hc, 1)
-            while (
-                not acsc.getMotorState(self.hc, 0)["enabled"]
-                or not acsc.getMotorState(self.hc, 1)["enabled"]
-            ):
-                self.msleep(100)
-            acsc.toPoint(self.hc, None, 0, self.y_R * self.R)
-            acsc.toPoint(self.hc, None, 1, self.z_H * self.H)
-            while (
-                not acsc.getMotorState(self.hc, 0)["in position"]
-                or not acsc.getMotorState(self.hc, 1)["in position"]
-            ):
-                self.msleep(300)
-            print("y- and z-axes in position")
-            acsc.disable(self.hc, 0)
-            acsc.disable(self.hc, 1)
-            self.vec.serial_port = "COM2"
-            self.vec.connect()
-            tstart = time.time()
-            self.timeout = False
-            self.vecstatus = "Connecting to Vectrino..."
-            while not self.vec.connected:
-                self.msleep(300)
-                if time.time() - tstart > 10:
-                    print("Vectrino timed out")
-                    self.timeout = True
-                    break
-            if not self.timeout:
-                self.vec.stop()
-                self.setvecconfig()
-                if self.recordvno:
-                    self.vec.start_disk_recording(self.vecsavepath)
-                self.vec.start()
-                self.vecstatus = "Vectrino connected "
-                while self.vec.state != "Confirmation mode":
-                    self.msleep(100)
-                print("Vectrino in data collection mode")
-                print("Waiting 6 seconds")
-                self.sleep(6)
+        self.vec.serial_port = "COM2"
+        self.vec.connect()
+        tstart = time.time()
+        self.timeout = False
+        self.vecstatus = "Connecting to Vectrino..."
+        while not self.vec.connected:
+            time.sleep(0.3)
+            if time.time() - tstart > 10:
+                print("Vectrino timed out")
+                self.timeout = True
+                return False
+        self.vec.stop()
+        self.setvecconfig()
+        if self.recordvno:
+            self.vec.start_disk_recording(self.vecsavepath)
+        self.vec.start()
+        self.vecstatus = "Vectrino connected "
+        while self.vec.state != "Confirmation mode":
+            if time.time() - tstart > self.arm_timeout:
+                print("Vectrino did not enter data collection mode")
+                return False
+            time.sleep(0.1)
+        print("Vectrino in data collection mode")
+        # The Vectrino needs some time before it responds to the sync
+        # signal, which overlaps with moving the traverse and arming the
+        # other instruments
+        time.sleep(self.vec_settle_time)
+        return True
+
+    def arm(self) -> bool:
+        """Get all instruments ready for the trigger concurrently, returning
+        whether they all are.
+
+        The Vectrino is connected and configured while the traverse moves,
+        and the DAQ threads are started meanwhile. Each step is waited on
+        through its future, rather than sleeping for a fixed time.
+        """
+        steps = {}
+        with ThreadPoolExecutor() as pool:
+            if self.vectrino:
+                steps["Traverse"] = pool.submit(self.move_traverse)
+                steps["Vectrino"] = pool.submit(self.arm_vectrino)
+            # QThreads are started from this thread and only waited on by
+            # the pool
+            if self.nidaq:
                 self.daqthread.start()
-                if self.fbg:
-                    self.fbgthread.start()
-                if self.odisi:
-                    self.odisithread.start()
-                self.start_motion()
-        elif self.nidaq:
-            self.daqthread.start()
+                steps["NI DAQ"] = pool.submit(
+                    self.daqthread.armed.wait, self.arm_timeout
+                )
             if self.fbg:
                 self.fbgthread.start()
             if self.odisi:
                 self.odisithread.start()
-            # Sleep so the DAQ can start listening for the trigger
-            time.sleep(1)
-            self.start_motion()
-        else:
-            # Start motion
-            self.start_motion()
+            ready = True
+            for name, future in steps.items():
+                if future.result() is False:
+                    print(name, "failed to get ready")
+                    ready = False
+        return ready and not self.aborted
+
+    def disarm(self):
+        """Stop any instruments started by ``arm`` if the run can't
+        start.
+        """
+        if self.nidaq:
+            self.daqthread.clear()
+        if self.fbg:
+            self.fbgthread.stop()
+        if self.odisi:
+            self.odisithread.stop()
+        if self.vectrino:
+            self.vec.stop()
+        if self.writer is not None:
+            self.writer.finish()
+
+    def run(self):
+        """Start the run.
+
+        Comms should be open already with the controller.
+        """
+        if self.writer is not None:
+            self.writer.start()
+        acsc.setOutput(self.hc, 1, 16, 0)
+        tstart = time.time()
+        if not self.arm():
+            print("Run cannot start because instruments are not ready")
+            self.arm_failed = not self.aborted
+            self.disarm()
+            self.towfinished.emit()
+            return
+        self.metadata["Arming time (s)"] = time.time() - tstart
+        self.start_motion()
 
     def start_motion(self):
         self.acsdaqthread.start()
@@ -228,12 +361,18 @@ class TurbineTow(QtCore.QThread):
             acsc.enable(self.hc, 6)
         acsc.enable(self.hc, 5)
         acsc.runBuffer(self.hc, nbuf)
-        # Wait until the program is done executing
-        prgstate = acsc.getProgramState(self.hc, nbuf)
-        while prgstate == 3:
-            time.sleep(0.3)
-            prgstate = acsc.getProgramState(self.hc, nbuf)
+        # Wait until the program is done executing, which the controller
+        # signals as soon as it ends or is stopped by an abort
+        wait_program_end(self.hc, nbuf)
         self.acsdaqthread.stop()
+        self.acsdaqthread.wait()
+        self.metadata["ACS metadata"] = self.acsdaqthread.metadata
+        if self.acsdaqthread.missing_samples:
+            print(
+                "Warning:",
+                self.acsdaqthread.missing_samples,
+                "ACS samples missing",
+            )
         if self.nidaq:
             self.daqthread.clear()
             print("NI tasks cleared")
@@ -241,6 +380,8 @@ class TurbineTow(QtCore.QThread):
             self.fbgthread.stop()
         if self.odisi:
             self.odisithread.stop()
+        if self.writer is not None:
+            self.writer.finish()
         if self.vectrino:
             if self.settling:
                 # Wait 10 minutes to measure tank settling time
@@ -311,7 +452,11 @@ class TareDragRun(QtCore.QThread):
             "Time created": time.asctime(),
             "TurbineDAQ version": commit,
         }
-        self.daqthread = daqtasks.NiDaqThread(usetrigger=True)
+        # Tow out, return at 0.6 m/s, plus some margin
+        duration = 24.5 / U + 24.5 / 0.6 + 15.0
+        self.daqthread = daqtasks.NiDaqThread(
+            usetrigger=True, duration=duration
+        )
         self.nidata = self.daqthread.data
         self.metadata["NI metadata"] = self.daqthread.metadata
 
@@ -334,10 +479,9 @@ class TareDragRun(QtCore.QThread):
         acsc.loadBuffer(self.hc, nbuf, self.acs_prg, 2048)
         acsc.enable(self.hc, 5)
         acsc.runBuffer(self.hc, nbuf)
-        prgstate = acsc.getProgramState(self.hc, nbuf)
-        while prgstate == 3:  # means the program is running in the controller
-            time.sleep(0.3)
-            prgstate = acsc.getProgramState(self.hc, nbuf)
+        # Wait until the program is done executing, which the controller
+        # signals as soon as it ends or is stopped by an abort
+        wait_program_end(self.hc, nbuf)
         self.acsdaqthread.stop()
         self.daqthread.clear()
         self.runfinished.emit()
@@ -373,7 +517,9 @@ class TareTorqueRun(QtCore.QThread):
             "Time created": time.asctime(),
             "TurbineDAQ version": commit,
         }
-        self.daqthread = daqtasks.NiDaqThread(usetrigger=True)
+        self.daqthread = daqtasks.NiDaqThread(
+            usetrigger=True, duration=dur + 15.0
+        )
         self.nidata = self.daqthread.data
         self.metadata["NI metadata"] = self.daqthread.metadata
         self.odisithread = daqtasks.ODiSIDaqThread(odisi_properties)
@@ -400,10 +546,9 @@ class TareTorqueRun(QtCore.QThread):
         acsc.loadBuffer(self.hc, nbuf, self.acs_prg, 2048)
         acsc.enable(self.hc, 4)
         acsc.runBuffer(self.hc, nbuf)
-        prgstate = acsc.getProgramState(self.hc, nbuf)
-        while prgstate == 3:
-            time.sleep(0.3)
-            prgstate = acsc.getProgramState(self.hc, nbuf)
+        # Wait until the program is done executing, which the controller
+        # signals as soon as it ends or is stopped by an abort
+        wait_program_end(self.hc, nbuf)
         self.acsdaqthread.stop()
         self.daqthread.clear()
         self.runfinished.emit()
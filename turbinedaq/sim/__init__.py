@@ -0,0 +1,100 @@
+"""Simulated hardware backends.
+
+The simulators replace the ACS controller library, NI-DAQmx, the Nortek
+Vectrino, and the Micron Optics FBG interrogator by installing stand-in
+modules in ``sys.modules``, so the rest of TurbineDAQ runs unmodified
+without any instruments connected. Set the ``TURBINEDAQ_SIMULATE``
+environment variable to install them when ``turbinedaq`` is imported, or
+use ``simulated()`` as a context manager.
+"""
+
+import contextlib
+import sys
+
+from . import acsc, daqmx, micronopt, nidaqmx, nortek
+
+# Modules replaced by the simulators
+MODULES = {
+    "acspy.acsc": acsc,
+    "daqmx": daqmx,
+    "micronopt": micronopt,
+    "nidaqmx": nidaqmx,
+    "nidaqmx.stream_readers": nidaqmx,
+    "nidaqmx.system": nidaqmx,
+    "nidaqmx.system.storage": nidaqmx,
+    "nidaqmx.system.storage.persisted_channel": nidaqmx,
+    "nortek": nortek,
+    "nortek.controls": nortek,
+}
+
+# TurbineDAQ modules that import hardware modules, which must be reimported
+# after installing or uninstalling the simulators
+DEPENDENT_MODULES = [
+    "turbinedaq.acsstatus",
+    "turbinedaq.daqtasks",
+    "turbinedaq.vectasks",
+    "turbinedaq.runtypes",
+    "turbinedaq.engine",
+    "turbinedaq.main",
+]
+
+_originals = None
+
+
+def purge_dependent_modules():
+    for name in DEPENDENT_MODULES:
+        sys.modules.pop(name, None)
+        parent, _, attr = name.rpartition(".")
+        if parent in sys.modules and hasattr(sys.modules[parent], attr):
+            delattr(sys.modules[parent], attr)
+
+
+def install():
+    """Install the simulators in place of the hardware modules."""
+    global _originals
+    if _originals is not None:
+        return
+    _originals = {name: sys.modules.get(name) for name in MODULES}
+    import acspy
+
+    _originals["acspy.acsc (attribute)"] = acspy.__dict__.get("acsc")
+    sys.modules.update(MODULES)
+    acspy.acsc = acsc
+    purge_dependent_modules()
+
+
+def uninstall():
+    """Restore the hardware modules replaced by ``install``."""
+    global _originals
+    if _originals is None:
+        return
+    import acspy
+
+    attr = _originals.pop("acspy.acsc (attribute)")
+    if attr is None:
+        acspy.__dict__.pop("acsc", None)
+    else:
+        acspy.acsc = attr
+    for name, module in _originals.items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
+    _originals = None
+    purge_dependent_modules()
+
+
+def installed():
+    return _originals is not None
+
+
+@contextlib.contextmanager
+def simulated():
+    """Context manager that installs the simulators for its duration."""
+    already_installed = installed()
+    install()
+    try:
+        yield
+    finally:
+        if not already_installed:
+            uninstall()
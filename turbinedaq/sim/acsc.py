@@ -0,0 +1,304 @@
+"""A simulated replacement for ``acspy.acsc`` backed by ``SimController``.
+
+Only the functions used by TurbineDAQ are provided. Communication handles
+are integers that index the open simulated controllers.
+"""
+
+import ctypes
+
+import numpy as np
+
+from .controller import (
+    MST_ENABLE,
+    MST_INPOS,
+    MST_MOVE,
+    AcscError,
+    SimController,
+)
+
+__all__ = ["AcscError"]
+
+AMF_WAIT = 0x00000001
+AMF_RELATIVE = 0x00000002
+AMF_VELOCITY = 0x00000004
+MST_ACC = 0x00000040
+SYNCHRONOUS = None
+INVALID = -1
+IGNORE = -1
+ASYNCHRONOUS = -2
+NONE = -1
+INFINITE = -1
+
+controllers = {}
+
+
+def current_controller():
+    """Return the most recently opened controller, which the other
+    simulated instruments use to follow the carriage and turbine, or
+    ``None`` if no controller is open.
+    """
+    if not controllers:
+        return None
+    return controllers[max(controllers)]
+
+
+def get_controller(hcomm):
+    try:
+        return controllers[hcomm]
+    except KeyError:
+        raise AcscError(f"Invalid communication handle {hcomm}")
+
+
+def open_comm_simulator() -> int:
+    hcomm = max(controllers, default=0) + 1
+    controllers[hcomm] = SimController()
+    return hcomm
+
+
+def open_comm_ethernet_tcp(address="10.0.0.100", port=701) -> int:
+    return open_comm_simulator()
+
+
+def openCommEthernetTCP(address="10.0.0.100", port=701) -> int:
+    return open_comm_ethernet_tcp(address=address, port=port)
+
+
+def openCommDirect() -> int:
+    return open_comm_simulator()
+
+
+def closeComm(hcomm):
+    controllers.pop(hcomm).close()
+
+
+def loadBuffer(hcomm, buffnumber, program, count=512, wait=SYNCHRONOUS):
+    get_controller(hcomm).load_buffer(buffnumber, str(program))
+
+
+def runBuffer(hcomm, buffno, label=None, wait=SYNCHRONOUS):
+    get_controller(hcomm).run_buffer(buffno)
+
+
+def stopBuffer(hcomm, buffno, wait=SYNCHRONOUS):
+    get_controller(hcomm).stop_buffer(buffno)
+
+
+def getProgramState(hc, nbuf, wait=SYNCHRONOUS):
+    return get_controller(hc).program_state(nbuf)
+
+
+def waitProgramEnd(hcomm, buffno, timeout=INFINITE):
+    timeout = None if timeout == INFINITE else timeout / 1000.0
+    if not get_controller(hcomm).wait_program_end(buffno, timeout):
+        raise AcscError(f"Timed out waiting for buffer {buffno} to end")
+
+
+def _range(from1, to1, from2, to2):
+    if from1 in (None, NONE):
+        return None, None, None, None
+    if from2 in (None, NONE):
+        return from1, to1, None, None
+    return from1, to1, from2, to2
+
+
+def readReal(
+    hcomm,
+    buffno,
+    varname,
+    from1=NONE,
+    to1=NONE,
+    from2=NONE,
+    to2=NONE,
+    wait=SYNCHRONOUS,
+):
+    value = get_controller(hcomm).read(
+        varname, *_range(from1, to1, from2, to2)
+    )
+    if np.ndim(value):
+        return np.asarray(value, dtype=np.float64)
+    return float(value)
+
+
+def readInteger(
+    hcomm,
+    buffno,
+    varname,
+    from1=None,
+    to1=None,
+    from2=None,
+    to2=None,
+    wait=SYNCHRONOUS,
+):
+    value = get_controller(hcomm).read(
+        varname, *_range(from1, to1, from2, to2)
+    )
+    # Like the real library, only the first value of a range is returned
+    return int(np.ravel(value)[0])
+
+
+def writeInteger(
+    hcomm,
+    variable,
+    val_to_write,
+    nbuff=NONE,
+    from1=NONE,
+    to1=NONE,
+    from2=NONE,
+    to2=NONE,
+    wait=SYNCHRONOUS,
+):
+    index = None if from1 in (None, NONE) else from1
+    get_controller(hcomm).write(variable, int(val_to_write), index)
+
+
+def writeReal(
+    hcomm,
+    varname,
+    val_to_write,
+    nbuff=NONE,
+    from1=NONE,
+    to1=NONE,
+    from2=NONE,
+    to2=NONE,
+    wait=SYNCHRONOUS,
+):
+    index = None if from1 in (None, NONE) else from1
+    get_controller(hcomm).write(varname, float(val_to_write), index)
+
+
+def enable(hcomm, axis, wait=SYNCHRONOUS):
+    c = get_controller(hcomm)
+    with c.lock:
+        c.enable(axis)
+
+
+def disable(hcomm, axis, wait=SYNCHRONOUS):
+    c = get_controller(hcomm)
+    with c.lock:
+        c.disable(axis)
+
+
+def getMotorState(hcomm, axis, wait=SYNCHRONOUS):
+    c = get_controller(hcomm)
+    with c.lock:
+        state = c.mst[axis]
+    return {
+        "enabled": bool(state & MST_ENABLE),
+        "in position": bool(state & MST_INPOS),
+        "moving": bool(state & MST_MOVE),
+        "accelerating": bool(state & MST_ACC),
+    }
+
+
+def getMotorEnabled(hcomm, axis, wait=SYNCHRONOUS):
+    return getMotorState(hcomm, axis)["enabled"]
+
+
+def _read_axis(hcomm, name, axis):
+    return float(get_controller(hcomm).read(name, axis, axis)[0])
+
+
+def getRPosition(hcomm, axis, wait=SYNCHRONOUS):
+    return _read_axis(hcomm, "RPOS", axis)
+
+
+def getFPosition(hcomm, axis, wait=SYNCHRONOUS):
+    return _read_axis(hcomm, "FPOS", axis)
+
+
+def getRVelocity(hcomm, axis, wait=SYNCHRONOUS):
+    return _read_axis(hcomm, "RVEL", axis)
+
+
+def getFVelocity(hcomm, axis, wait=SYNCHRONOUS):
+    return _read_axis(hcomm, "FVEL", axis)
+
+
+def getVelocity(hcomm, axis, wait=SYNCHRONOUS):
+    return _read_axis(hcomm, "VEL", axis)
+
+
+def setVelocity(hcomm, axis, vel, wait=SYNCHRONOUS):
+    get_controller(hcomm).write("VEL", vel, axis)
+
+
+def setAcceleration(hcomm, axis, acc, wait=SYNCHRONOUS):
+    get_controller(hcomm).write("ACC", acc, axis)
+
+
+def setDeceleration(hcomm, axis, dec, wait=SYNCHRONOUS):
+    get_controller(hcomm).write("DEC", dec, axis)
+
+
+def setJerk(hcomm, axis, jerk, wait=SYNCHRONOUS):
+    get_controller(hcomm).write("JERK", jerk, axis)
+
+
+def toPoint(hcomm, flags, axis, target, wait=SYNCHRONOUS):
+    c = get_controller(hcomm)
+    with c.lock:
+        c.ptp(axis, target, relative=bool((flags or 0) & AMF_RELATIVE))
+
+
+def jog(hcomm, flags, axis, vel, wait=SYNCHRONOUS):
+    c = get_controller(hcomm)
+    with c.lock:
+        if not (flags or 0) & AMF_VELOCITY:
+            vel = np.sign(vel) * c.arrays["VEL"][axis]
+        c.jog(axis, vel)
+
+
+def halt(hcomm, axis, wait=SYNCHRONOUS):
+    c = get_controller(hcomm)
+    with c.lock:
+        c.halt(axis)
+
+
+def setOutput(hcomm, port, bit, val, wait=SYNCHRONOUS):
+    c = get_controller(hcomm)
+    with c.lock:
+        c.outputs[(port, bit)] = int(val)
+
+
+def getOutput(hcomm, port, bit, wait=SYNCHRONOUS):
+    c = get_controller(hcomm)
+    with c.lock:
+        return c.outputs.get((port, bit), 0)
+
+
+class Library(object):
+    """Stand-in for the ACS C library, for code that calls library
+    functions directly through ``call_acsc``.
+    """
+
+    @staticmethod
+    def acsc_ReadInteger(
+        hcomm, buffno, varname, from1, to1, from2, to2, values, wait
+    ):
+        value = get_controller(hcomm).read(
+            varname.decode(), *_range(from1, to1, from2, to2)
+        )
+        value = np.ravel(np.asarray(value, dtype=np.intc))
+        ctypes.memmove(values, value.ctypes.data, value.nbytes)
+        return 1
+
+    @staticmethod
+    def acsc_ReadReal(
+        hcomm, buffno, varname, from1, to1, from2, to2, values, wait
+    ):
+        value = get_controller(hcomm).read(
+            varname.decode(), *_range(from1, to1, from2, to2)
+        )
+        value = np.ravel(np.asarray(value, dtype=np.float64))
+        ctypes.memmove(values, value.ctypes.data, value.nbytes)
+        return 1
+
+
+acs = Library()
+
+
+def call_acsc(func, *args, **kwargs):
+    """Call a library function. The simulated functions raise
+    ``AcscError`` themselves on failure.
+    """
+    return func(*args, **kwargs)
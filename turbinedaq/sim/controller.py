@@ -0,0 +1,612 @@
+"""A simulated ACS motion controller.
+
+The controller runs a servo loop in a background thread that advances
+``TIME`` in 1 ms cycles, moves axes with simple trapezoidal velocity
+profiles, and performs cyclic data collection (``DC/c``) into global arrays.
+ACSPL+ programs loaded into buffers are run by a small interpreter that
+covers the subset of the language used by TurbineDAQ's programs, i.e.,
+variable declarations, assignments, ``PTP``, ``JOG``, ``HALT``, ``WAIT``,
+``TILL``, ``IF``/``WHILE``/``BLOCK`` blocks, ``DC``, and ``STOPDC``.
+"""
+
+import re
+import threading
+import time
+
+import numpy as np
+
+from . import signals
+
+NAXES = 8
+CYCLE_MS = 1.0
+# Axes used for the carriage and turbines
+CARRIAGE_AXIS = 5
+TURBINE_AXIS = 4
+AFT_TURBINE_AXIS = 6
+# Motor state bits, as in acspy.acsc
+MST_ENABLE = 0x00000001
+MST_INPOS = 0x00000010
+MST_MOVE = 0x00000020
+# Program states
+PST_COMPILED = 0x00000001
+PST_RUN = 0x00000002
+
+IDLE, PTP, JOG, HALT = 0, 1, 2, 3
+
+
+class AcscError(Exception):
+    pass
+
+
+class ProgramStopped(Exception):
+    pass
+
+
+class ArrayRef(object):
+    """Allows ACSPL+ style indexing, e.g., ``RPOS(4)`` or ``data(0)(5)``,
+    of an array in expressions.
+    """
+
+    def __init__(self, array):
+        self.array = array
+
+    def __call__(self, index):
+        value = self.array[int(index)]
+        if np.ndim(value):
+            return ArrayRef(value)
+        return value
+
+
+class Namespace(object):
+    """Mapping used to resolve names when evaluating expressions."""
+
+    def __init__(self, controller, local_vars=None):
+        self.controller = controller
+        self.local_vars = local_vars if local_vars is not None else {}
+
+    def __getitem__(self, name):
+        c = self.controller
+        if name == "TIME":
+            return c.sample_time if c.sample_time is not None else c.time_ms
+        for scope in (self.local_vars, c.variables, c.arrays):
+            if name in scope:
+                value = scope[name]
+                if isinstance(value, np.ndarray):
+                    return ArrayRef(value)
+                return value
+        raise KeyError(name)
+
+
+def split_args(text):
+    """Split comma separated arguments that aren't inside parentheses."""
+    args = []
+    depth = 0
+    current = ""
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            args.append(current.strip())
+            current = ""
+        else:
+            current += char
+    if current.strip():
+        args.append(current.strip())
+    return args
+
+
+def to_python(expr, condition=False):
+    """Translate an ACSPL+ expression into Python."""
+    expr = expr.replace("<>", "!=")
+    expr = expr.replace("&", " and ").replace("|", " or ")
+    if condition:
+        expr = re.sub(r"(?<![<>!=])=(?!=)", "==", expr)
+    return expr
+
+
+def compile_expr(expr, condition=False):
+    try:
+        return compile(to_python(expr, condition), "<acspl>", "eval")
+    except SyntaxError as e:
+        raise AcscError(f"Syntax error in '{expr}': {e}")
+
+
+RE_DECL = re.compile(r"^(?:(local|global)\s+)?(real|int)\s+(.+)$", re.I)
+RE_MOTION = re.compile(r"^(ptp|jog)(/\w+)?\s+(.+)$", re.I)
+RE_AXIS_CMD = re.compile(r"^(halt|enable|disable)\s*\(?\s*(.+?)\s*\)?$", re.I)
+RE_DC = re.compile(r"^dc(/\w+)?\s+(.+)$", re.I)
+RE_OUT = re.compile(r"^OUT(\d+)\.(\d+)\s*=\s*(.+)$")
+RE_ASSIGN = re.compile(r"^([A-Za-z_]\w*)(?:\((.+?)\))?\s*=\s*(.+)$")
+RE_KEYWORD = re.compile(r"^(if|while|till|wait)\s+(.+)$", re.I)
+
+
+def parse_program(text):
+    """Parse ACSPL+ program text into a list of ``(kind, args)``
+    statements, with block statements linked to their matching ``END``.
+    """
+    statements = []
+    stack = []
+    for line in text.splitlines():
+        line = line.split("!")[0].strip()
+        if not line:
+            continue
+        lower = line.lower()
+        if lower == "block":
+            stack.append(len(statements))
+            statements.append(["block", None])
+        elif lower == "end":
+            if not stack:
+                raise AcscError("END without matching block")
+            start = stack.pop()
+            statements[start].append(len(statements))
+            statements.append(["end", start])
+        elif lower == "else":
+            if not stack:
+                raise AcscError("ELSE without matching IF")
+            start = stack.pop()
+            statements[start].append(len(statements))
+            stack.append(len(statements))
+            statements.append(["else", None])
+        elif lower in ("stop", "stopdc"):
+            statements.append([lower, None])
+        elif RE_KEYWORD.match(line):
+            keyword, expr = RE_KEYWORD.match(line).groups()
+            keyword = keyword.lower()
+            cond = keyword != "wait"
+            if keyword in ("if", "while"):
+                stack.append(len(statements))
+            statements.append([keyword, compile_expr(expr, condition=cond)])
+        elif RE_DECL.match(line):
+            scope, vartype, names = RE_DECL.match(line).groups()
+            decls = []
+            for name in split_args(names):
+                m = re.match(r"^([A-Za-z_]\w*)((?:\(\d+\))*)$", name)
+                if m is None:
+                    raise AcscError(f"Invalid declaration '{name}'")
+                dims = [int(d) for d in re.findall(r"\((\d+)\)", m.group(2))]
+                decls.append((m.group(1), tuple(dims)))
+            statements.append(
+                [
+                    "decl",
+                    ((scope or "local").lower(), vartype.lower(), decls),
+                ]
+            )
+        elif RE_MOTION.match(line):
+            cmd, flags, args = RE_MOTION.match(line).groups()
+            args = [compile_expr(a) for a in split_args(args)]
+            statements.append([cmd.lower(), ((flags or "").lower(), args)])
+        elif RE_AXIS_CMD.match(line):
+            cmd, axis = RE_AXIS_CMD.match(line).groups()
+            statements.append([cmd.lower(), compile_expr(axis)])
+        elif RE_DC.match(line):
+            flags, args = RE_DC.match(line).groups()
+            args = split_args(args)
+            if len(args) < 4:
+                raise AcscError(f"Invalid DC command '{line}'")
+            exprs = [compile_expr(a) for a in args[3:]]
+            statements.append(
+                [
+                    "dc",
+                    (
+                        args[0],
+                        compile_expr(args[1]),
+                        compile_expr(args[2]),
+                        exprs,
+                    ),
+                ]
+            )
+        elif RE_OUT.match(line):
+            port, bit, expr = RE_OUT.match(line).groups()
+            statements.append(
+                ["out", (int(port), int(bit), compile_expr(expr))]
+            )
+        elif RE_ASSIGN.match(line):
+            name, index, expr = RE_ASSIGN.match(line).groups()
+            index = compile_expr(index) if index is not None else None
+            statements.append(["assign", (name, index, compile_expr(expr))])
+        else:
+            raise AcscError(f"Unsupported statement '{line}'")
+    if stack:
+        raise AcscError("Block without matching END")
+    return statements
+
+
+class Program(object):
+    """An ACSPL+ program running in a controller buffer."""
+
+    def __init__(self, controller, buffno, text):
+        self.controller = controller
+        self.buffno = buffno
+        self.text = text
+        self.statements = parse_program(text)
+        self.thread = None
+        self.stop_requested = False
+        self.error = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        self.stop_requested = False
+        self.error = None
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_requested = True
+        if self.thread is not None:
+            self.thread.join()
+
+    def sleep_until(self, done):
+        while not done():
+            if self.stop_requested or not self.controller.running:
+                raise ProgramStopped
+            time.sleep(0.0005)
+
+    def run(self):
+        try:
+            self.execute()
+        except ProgramStopped:
+            pass
+        except Exception as e:
+            self.error = e
+            print(f"Simulated ACS buffer {self.buffno} error: {e}")
+
+    def execute(self):
+        c = self.controller
+        ns = Namespace(c)
+        evaluate = lambda code: eval(code, {"__builtins__": {}}, ns)
+        n = 0
+        while n < len(self.statements):
+            if self.stop_requested:
+                raise ProgramStopped
+            kind, args, *link = self.statements[n]
+            n += 1
+            if kind == "stop":
+                return
+            elif kind == "wait":
+                with c.lock:
+                    tend = c.time_ms + evaluate(args)
+                self.sleep_until(lambda: c.time_ms >= tend)
+            elif kind == "till":
+                self.sleep_until(lambda: evaluate(args))
+            elif kind == "if":
+                with c.lock:
+                    if not evaluate(args):
+                        n = link[0] + 1
+            elif kind == "else":
+                # Reached the end of the IF branch
+                n = link[0] + 1
+            elif kind == "while":
+                with c.lock:
+                    if not evaluate(args):
+                        n = link[0] + 1
+            elif kind == "end":
+                if self.statements[args][0] == "while":
+                    n = args
+            elif kind == "block":
+                pass
+            elif kind == "decl":
+                scope, vartype, decls = args
+                target = ns.local_vars if scope == "local" else c.variables
+                with c.lock:
+                    for name, dims in decls:
+                        # Globals keep their values if already declared
+                        # with the same shape
+                        if (
+                            scope == "global"
+                            and name in target
+                            and np.shape(target[name]) == dims
+                        ):
+                            continue
+                        if dims:
+                            target[name] = np.zeros(dims)
+                        else:
+                            target[name] = 0 if vartype == "int" else 0.0
+            elif kind == "assign":
+                name, index, code = args
+                with c.lock:
+                    value = evaluate(code)
+                    if name in ns.local_vars:
+                        scope = ns.local_vars
+                    elif name in c.variables:
+                        scope = c.variables
+                    elif name in c.arrays:
+                        scope = c.arrays
+                    else:
+                        raise AcscError(f"Undefined variable '{name}'")
+                    if index is None:
+                        scope[name] = value
+                    else:
+                        scope[name][int(evaluate(index))] = value
+            elif kind == "out":
+                port, bit, code = args
+                with c.lock:
+                    c.outputs[(port, bit)] = int(evaluate(code))
+            elif kind in ("ptp", "jog"):
+                flags, exprs = args
+                with c.lock:
+                    values = [evaluate(e) for e in exprs]
+                    axis = int(values[0])
+                    if kind == "ptp":
+                        c.ptp(axis, values[1], relative="r" in flags)
+                    elif "v" in flags:
+                        c.jog(axis, values[1])
+                    else:
+                        c.jog(axis, c.arrays["VEL"][axis])
+                if kind == "ptp" and "e" in flags:
+                    self.sleep_until(lambda: c.mode[axis] == IDLE)
+            elif kind in ("halt", "enable", "disable"):
+                with c.lock:
+                    getattr(c, kind)(int(evaluate(args)))
+            elif kind == "dc":
+                name, nsamps, period, exprs = args
+                with c.lock:
+                    c.start_dc(
+                        self.buffno,
+                        name,
+                        int(evaluate(nsamps)),
+                        evaluate(period),
+                        exprs,
+                    )
+            elif kind == "stopdc":
+                with c.lock:
+                    c.dcs.pop(self.buffno, None)
+
+
+class SimController(object):
+    """A simulated ACS motion controller.
+
+    Parameters
+    ----------
+    seed : int
+        Seed for the random number generator used for sensor noise.
+    """
+
+    def __init__(self, seed=None):
+        self.lock = threading.RLock()
+        self.rng = np.random.default_rng(seed)
+        self.time_ms = 0.0
+        self.sample_time = None
+        self.variables = {}
+        self.arrays = {
+            "RPOS": np.zeros(NAXES),
+            "FPOS": np.zeros(NAXES),
+            "RVEL": np.zeros(NAXES),
+            "FVEL": np.zeros(NAXES),
+            "VEL": np.ones(NAXES),
+            "ACC": np.full(NAXES, 10.0),
+            "DEC": np.full(NAXES, 10.0),
+            "JERK": np.full(NAXES, 100.0),
+            "KDEC": np.full(NAXES, 100.0),
+        }
+        self.enabled = np.zeros(NAXES, dtype=bool)
+        self.mode = np.zeros(NAXES, dtype=int)
+        self.target = np.zeros(NAXES)
+        self.jogvel = np.zeros(NAXES)
+        self.outputs = {}
+        self.buffers = {}
+        # Data collection started by each buffer
+        self.dcs = {}
+        self.running = True
+        self.thread = threading.Thread(target=self.servo_loop, daemon=True)
+        self.thread.start()
+
+    @property
+    def mst(self):
+        """Motor state of each axis as an integer array."""
+        mst = np.where(self.enabled, MST_ENABLE, 0)
+        moving = self.arrays["RVEL"] != 0
+        mst |= np.where(moving, MST_MOVE, 0)
+        mst |= np.where((self.mode == IDLE) & ~moving, MST_INPOS, 0)
+        return mst
+
+    def servo_loop(self):
+        tlast = time.perf_counter()
+        while self.running:
+            time.sleep(0.001)
+            now = time.perf_counter()
+            ncycles = int((now - tlast) * 1000.0 / CYCLE_MS)
+            if ncycles < 1:
+                continue
+            tlast += ncycles * CYCLE_MS / 1000.0
+            with self.lock:
+                for _ in range(ncycles):
+                    self.step()
+
+    def step(self):
+        """Advance the controller by one cycle."""
+        dt = CYCLE_MS / 1000.0
+        a = self.arrays
+        rpos = a["RPOS"]
+        vel = a["RVEL"]
+        vdes = np.zeros(NAXES)
+        jog = self.mode == JOG
+        vdes[jog] = self.jogvel[jog]
+        ptp = self.mode == PTP
+        dist = self.target - rpos
+        vdes[ptp] = np.sign(dist[ptp]) * np.minimum(
+            a["VEL"][ptp], np.sqrt(2 * a["DEC"][ptp] * np.abs(dist[ptp]))
+        )
+        # Idle and halting axes decelerate to zero velocity
+        vdes[~self.enabled] = 0.0
+        accel = np.where(np.abs(vdes) > np.abs(vel), a["ACC"], a["DEC"])
+        vel += np.clip(vdes - vel, -accel * dt, accel * dt)
+        vel[~self.enabled] = 0.0
+        rpos += vel * dt
+        # Finish point-to-point moves that have reached their targets
+        done = ptp & (
+            np.abs(self.target - rpos) <= np.maximum(np.abs(vel) * dt, 1e-9)
+        )
+        rpos[done] = self.target[done]
+        vel[done] = 0.0
+        self.mode[done] = IDLE
+        self.mode[(self.mode == HALT) & (vel == 0)] = IDLE
+        a["FPOS"][:] = rpos
+        a["FVEL"][:] = vel + self.rng.normal(scale=1e-3, size=NAXES) * (
+            self.enabled
+        )
+        self.time_ms += CYCLE_MS
+        # Update simulated AFT load cell forces if they've been declared
+        if "ch1_force" in self.variables:
+            forces = signals.aft_forces(
+                rpos[AFT_TURBINE_AXIS] * signals.DEG_PER_UNIT,
+                vel[CARRIAGE_AXIS],
+                self.rng,
+            )
+            for n, force in enumerate(forces):
+                self.variables[f"ch{n + 1}_force"] = force
+        for dc in self.dcs.values():
+            self.collect(dc)
+
+    def start_dc(self, buffno, name, nsamps, period, exprs):
+        if name not in self.variables:
+            raise AcscError(f"Undefined variable '{name}'")
+        self.dcs[buffno] = {
+            "array": self.variables[name],
+            "nsamps": nsamps,
+            "period": period,
+            "exprs": exprs,
+            "next": self.time_ms,
+            "index": 0,
+        }
+
+    def collect(self, dc):
+        """Take any data collection samples due by the current time."""
+        ns = Namespace(self)
+        while dc["next"] <= self.time_ms:
+            self.sample_time = dc["next"]
+            col = dc["index"] % dc["nsamps"]
+            for row, code in enumerate(dc["exprs"]):
+                dc["array"][row, col] = eval(code, {"__builtins__": {}}, ns)
+            self.sample_time = None
+            dc["index"] += 1
+            dc["next"] += dc["period"]
+
+    def check_axis(self, axis):
+        if not 0 <= axis < NAXES:
+            raise AcscError(f"Invalid axis {axis}")
+
+    def enable(self, axis):
+        self.check_axis(axis)
+        self.enabled[axis] = True
+
+    def disable(self, axis):
+        self.check_axis(axis)
+        self.enabled[axis] = False
+        self.mode[axis] = IDLE
+        self.arrays["RVEL"][axis] = 0.0
+
+    def ptp(self, axis, target, relative=False):
+        self.check_axis(axis)
+        if not self.enabled[axis]:
+            raise AcscError(f"Axis {axis} is disabled")
+        if relative:
+            target += self.arrays["RPOS"][axis]
+        self.target[axis] = target
+        self.mode[axis] = PTP
+
+    def jog(self, axis, vel):
+        self.check_axis(axis)
+        if not self.enabled[axis]:
+            raise AcscError(f"Axis {axis} is disabled")
+        self.jogvel[axis] = vel
+        self.mode[axis] = JOG
+
+    def halt(self, axis):
+        self.check_axis(axis)
+        if self.mode[axis] != IDLE:
+            self.mode[axis] = HALT
+
+    def load_buffer(self, buffno, text):
+        with self.lock:
+            old = self.buffers.get(buffno)
+        if old is not None and old.running:
+            raise AcscError(f"Buffer {buffno} is running")
+        self.buffers[buffno] = Program(self, buffno, text)
+
+    def run_buffer(self, buffno):
+        try:
+            program = self.buffers[buffno]
+        except KeyError:
+            raise AcscError(f"Buffer {buffno} is empty")
+        if program.running:
+            raise AcscError(f"Buffer {buffno} is already running")
+        program.start()
+
+    def stop_buffer(self, buffno):
+        program = self.buffers.get(buffno)
+        if program is not None:
+            program.stop()
+
+    def wait_program_end(self, buffno, timeout=None):
+        """Wait for the program in a buffer to end, returning whether it
+        did within ``timeout`` seconds.
+        """
+        program = self.buffers.get(buffno)
+        if program is None or program.thread is None:
+            return True
+        program.thread.join(timeout)
+        return not program.running
+
+    def program_state(self, buffno):
+        program = self.buffers.get(buffno)
+        if program is None:
+            return 0
+        if program.running:
+            return PST_COMPILED | PST_RUN
+        return PST_COMPILED
+
+    def read(self, name, from1=None, to1=None, from2=None, to2=None):
+        """Read a variable, or a range of a 1-D or 2-D array."""
+        with self.lock:
+            if name == "TIME":
+                return self.time_ms
+            if name == "MST":
+                value = self.mst
+            elif name in self.variables:
+                value = self.variables[name]
+            elif name in self.arrays:
+                value = self.arrays[name]
+            else:
+                raise AcscError(f"Undefined variable '{name}'")
+            if from1 is None:
+                if isinstance(value, np.ndarray):
+                    raise AcscError(f"'{name}' is an array")
+                return value
+            if from2 is None:
+                return np.array(value[from1 : to1 + 1], dtype=float)
+            return np.array(value[from1 : to1 + 1, from2 : to2 + 1])
+
+    def write(self, name, value, from1=None):
+        with self.lock:
+            if name in self.arrays:
+                self.arrays[name][from1] = value
+            elif name in self.variables:
+                if from1 is None:
+                    self.variables[name] = value
+                else:
+                    self.variables[name][from1] = value
+            else:
+                raise AcscError(f"Undefined variable '{name}'")
+
+    def state(self):
+        """Return a snapshot of the carriage and turbine axes for
+        simulating other instruments.
+        """
+        with self.lock:
+            return {
+                "time": self.time_ms / 1000.0,
+                "pos": self.arrays["FPOS"].copy(),
+                "vel": self.arrays["RVEL"].copy(),
+                "outputs": dict(self.outputs),
+            }
+
+    def close(self):
+        for program in list(self.buffers.values()):
+            program.stop()
+        self.running = False
+        self.thread.join()
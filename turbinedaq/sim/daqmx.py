@@ -0,0 +1,87 @@
+"""A simulated replacement for the parts of the ``daqmx`` wrapper used by
+TurbineDAQ, operating on simulated ``nidaqmx`` tasks.
+"""
+
+Val_Rising = 10280
+Val_Falling = 10171
+Val_ContSamps = 10123
+Val_FiniteSamps = 10178
+Val_DigEdge = 10150
+Val_Degrees = 10146
+Val_Meters = 10219
+
+# Linear scales of the global virtual channels, keyed by scale name
+SCALES = {
+    "torque_trans_scale": (1.0, 0.0, "Nm", "Volts"),
+    "torque_arm_scale": (1.0, 0.0, "Nm", "Volts"),
+    "drag_left_scale": (1.0, 0.0, "N", "Volts"),
+    "drag_right_scale": (1.0, 0.0, "N", "Volts"),
+    "LF_left_scale": (1.0, 0.0, "N", "Volts"),
+    "LF_right_scale": (1.0, 0.0, "N", "Volts"),
+}
+DEFAULT_SCALE = (1.0, 0.0, "degC", "Volts")
+
+
+def GetScaleLinSlope(scale):
+    return SCALES.get(scale, DEFAULT_SCALE)[0]
+
+
+def GetScaleLinYIntercept(scale):
+    return SCALES.get(scale, DEFAULT_SCALE)[1]
+
+
+def GetScaleScaledUnits(scale):
+    return SCALES.get(scale, DEFAULT_SCALE)[2]
+
+
+def GetScalePreScaledUnits(scale):
+    return SCALES.get(scale, DEFAULT_SCALE)[3]
+
+
+def GetCIAngEncoderPulsesPerRev(taskhandle, channel):
+    return 100000
+
+
+def GetCIAngEncoderUnits(taskhandle, channel):
+    return "Degrees"
+
+
+def GetCILinEncoderDisPerPulse(taskhandle, channel):
+    return 1.0e-5
+
+
+def GetCILinEncoderUnits(taskhandle, channel):
+    return "Meters"
+
+
+def CfgSampClkTiming(
+    taskhandle, source, rate, active_edge, sample_mode, samps_per_chan
+):
+    taskhandle.sample_rate = float(rate)
+    taskhandle.samps_per_chan = samps_per_chan
+
+
+def GetTerminalNameWithDevPrefix(taskhandle, terminal):
+    return "/cDAQ9188-16D66BB/" + terminal
+
+
+def GetTrigSrcWithDevPrefix(taskhandle, terminal):
+    return GetTerminalNameWithDevPrefix(taskhandle, terminal)
+
+
+def CfgDigEdgeStartTrig(taskhandle, source, edge):
+    taskhandle.start_trigger = source
+
+
+def SetStartTrigType(taskhandle, trigger_type):
+    pass
+
+
+def SetDigEdgeStartTrigSrc(taskhandle, source):
+    # Counter tasks are started by the analog task's start trigger, and
+    # are read alongside it, so they don't need to wait themselves
+    pass
+
+
+def SetDigEdgeStartTrigEdge(taskhandle, edge):
+    pass
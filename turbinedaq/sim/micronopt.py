@@ -0,0 +1,108 @@
+"""A simulated replacement for ``micronopt.Interrogator``."""
+
+import time
+
+import numpy as np
+
+from turbinedaq.buffers import DataBuffer
+
+from . import acsc, signals
+from .controller import TURBINE_AXIS
+
+DEFAULT_SAMPLE_RATE = 1000.0
+
+
+class Sensor(object):
+    def __init__(self, name, properties):
+        self.name = name
+        self.properties = properties
+        self.type = properties.get("sensor type", "strain")
+        self.position = properties.get("position", 0)
+        self.nominal_wavelength = properties.get("nominal wavelength", 1550.0)
+
+
+class Interrogator(object):
+    """Simulates a Micron Optics interrogator that returns strain in
+    phase with the turbine loads.
+
+    Parameters
+    ----------
+    fbg_props : dict
+        Sensor properties keyed by sensor name.
+    sample_rate : float
+        Rate in Hz at which samples are generated.
+    """
+
+    def __init__(self, fbg_props={}, sample_rate=DEFAULT_SAMPLE_RATE):
+        self.fbg_props = fbg_props
+        self.sample_rate = sample_rate
+        self.connected = False
+        self.trig_mode = "untriggered"
+        self.trig_start_edge = "rising"
+        self.trig_stop_type = "edge"
+        self.trig_stop_edge = "rising"
+        self.trig_num_acq = 1
+        self.auto_retrig = False
+        self.data_interleave = 1
+        self.num_averages = 1
+        self.sensors = []
+        self.data = None
+        self.rng = np.random.default_rng()
+        self.t0 = None
+        self.nsamps = 0
+
+    def connect(self):
+        self.connected = True
+
+    def disconnect(self):
+        self.connected = False
+
+    def flush_buffer(self):
+        self.t0 = None
+        self.nsamps = 0
+
+    def create_sensors(self):
+        self.sensors = [
+            Sensor(name, props) for name, props in self.fbg_props.items()
+        ]
+
+    def zero_strain_sensors(self):
+        pass
+
+    def setup_append_data(self):
+        names = ["time"]
+        for sensor in self.sensors:
+            names += [sensor.name + "_wavelength", sensor.name + "_strain"]
+        self.data = DataBuffer(names)
+
+    @property
+    def effective_sample_rate(self):
+        return self.sample_rate / self.data_interleave / self.num_averages
+
+    def get_data(self):
+        """Append all samples acquired since the last call."""
+        now = time.perf_counter()
+        if self.t0 is None:
+            self.t0 = now
+        rate = self.effective_sample_rate
+        nsamps = int((now - self.t0) * rate) - self.nsamps
+        if nsamps <= 0:
+            return
+        t = (np.arange(nsamps) + self.nsamps) / rate
+        self.nsamps += nsamps
+        controller = acsc.current_controller()
+        angle = 0.0
+        if controller is not None:
+            angle = controller.state()["pos"][TURBINE_AXIS]
+        angle = angle * signals.DEG_PER_UNIT
+        self.data.append("time", t)
+        for sensor in self.sensors:
+            strain = 1e-4 * np.sin(
+                np.deg2rad(angle) * signals.NBLADES + sensor.position
+            ) + self.rng.normal(scale=1e-6, size=nsamps)
+            wavelength = sensor.nominal_wavelength * (1 + 0.8 * strain)
+            self.data.append(sensor.name + "_strain", strain)
+            self.data.append(sensor.name + "_wavelength", wavelength)
+
+    def sleep(self):
+        time.sleep(0.1)
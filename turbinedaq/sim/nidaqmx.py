@@ -0,0 +1,196 @@
+"""A simulated replacement for the parts of ``nidaqmx`` used by TurbineDAQ.
+
+Analog input tasks fire their every N samples callbacks from a clock thread
+at the configured sample rate, and generate turbine loads or temperatures
+from the state of the simulated ACS controller. Counter tasks report the
+carriage position and turbine angle from the controller's feedback
+positions.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from . import acsc, signals
+from .controller import CARRIAGE_AXIS, NAXES, TURBINE_AXIS
+
+DEFAULT_SAMPLE_RATE = 1000.0
+# Controller output used as the start trigger
+TRIGGER_OUTPUT = (1, 16)
+
+
+class PersistedChannel(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class DOChannelCollection(object):
+    def __init__(self, task):
+        self.task = task
+        self.lines = []
+
+    def add_do_chan(self, lines, **kwargs):
+        self.lines.append(lines)
+
+
+class InStream(object):
+    """Generates samples for a task at the time they are read.
+
+    Samples are timed backwards from the time of the read, so values that
+    follow the controller are interpolated using each axis' velocity.
+    """
+
+    def __init__(self, task):
+        self.task = task
+        self.rng = np.random.default_rng()
+
+    def sample_times(self, nsamps):
+        rate = self.task.sample_rate
+        return (np.arange(nsamps) - nsamps + 1) / rate
+
+    def axis_state(self):
+        """Return the position and velocity of each controller axis."""
+        controller = acsc.current_controller()
+        if controller is None:
+            return np.zeros(NAXES), np.zeros(NAXES)
+        state = controller.state()
+        return state["pos"], state["vel"]
+
+    def read_analog(self, nsamps):
+        names = self.task.channel_names
+        pos, vel = self.axis_state()
+        t = self.sample_times(nsamps)
+        angle = (pos[TURBINE_AXIS] + vel[TURBINE_AXIS] * t) * (
+            signals.DEG_PER_UNIT
+        )
+        values = signals.turbine_loads(
+            t, angle, vel[CARRIAGE_AXIS], vel[TURBINE_AXIS], self.rng
+        )
+        values.update(signals.temperatures(t, self.rng))
+        data = np.zeros((len(names), nsamps))
+        for n, name in enumerate(names):
+            if name in values:
+                data[n] = values[name]
+            else:
+                data[n] = self.rng.normal(scale=1e-3, size=nsamps)
+        return data
+
+    def read_counter(self, nsamps):
+        pos, vel = self.axis_state()
+        t = self.sample_times(nsamps)
+        if self.task.channel_names[0] == "turbine_angle":
+            return (pos[TURBINE_AXIS] + vel[TURBINE_AXIS] * t) * (
+                signals.DEG_PER_UNIT
+            )
+        return pos[CARRIAGE_AXIS] + vel[CARRIAGE_AXIS] * t
+
+
+class AnalogMultiChannelReader(object):
+    def __init__(self, in_stream):
+        self.in_stream = in_stream
+
+    def read_many_sample(
+        self, data, number_of_samples_per_channel=-1, timeout=10.0
+    ):
+        nsamps = number_of_samples_per_channel
+        data[:, :nsamps] = self.in_stream.read_analog(nsamps)
+        return nsamps
+
+
+class CounterReader(object):
+    def __init__(self, in_stream):
+        self.in_stream = in_stream
+
+    def read_many_sample_double(
+        self, data, number_of_samples_per_channel=-1, timeout=10.0
+    ):
+        nsamps = number_of_samples_per_channel
+        data[:nsamps] = self.in_stream.read_counter(nsamps)
+        return nsamps
+
+
+class Task(object):
+    """A simulated DAQmx task.
+
+    Timing and triggering are configured through the simulated ``daqmx``
+    module, which sets attributes on the task's ``_handle``, i.e., the task
+    itself.
+    """
+
+    def __init__(self, new_task_name=""):
+        self.name = new_task_name
+        self._handle = self
+        self.channel_names = []
+        self.do_channels = DOChannelCollection(self)
+        self.in_stream = InStream(self)
+        self.sample_rate = DEFAULT_SAMPLE_RATE
+        self.samps_per_chan = 1000
+        self.start_trigger = None
+        self.every_n_samples = None
+        self.callback = None
+        self.running = False
+        self.thread = None
+        self.nsamps_acquired = 0
+        # Time each block was acquired, and when its callback started and
+        # returned since the task was last started, for measuring latency
+        self.callback_log = []
+
+    def add_global_channels(self, global_channels):
+        self.channel_names += [c.name for c in global_channels]
+
+    def register_every_n_samples_acquired_into_buffer_event(
+        self, sample_interval, callback_method
+    ):
+        self.every_n_samples = sample_interval
+        self.callback = callback_method
+
+    def triggered(self):
+        if self.start_trigger is None:
+            return True
+        controller = acsc.current_controller()
+        if controller is None:
+            return True
+        return controller.state()["outputs"].get(TRIGGER_OUTPUT, 0) == 1
+
+    def run_clock(self):
+        while self.running and not self.triggered():
+            time.sleep(0.001)
+        t0 = time.perf_counter()
+        nblocks = 0
+        while self.running:
+            nblocks += 1
+            nsamps = nblocks * self.every_n_samples
+            # Sleep until the block would be acquired, catching up without
+            # sleeping if we've fallen behind
+            tacquired = t0 + nsamps / self.sample_rate
+            delay = tacquired - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if not self.running:
+                break
+            tstart = time.perf_counter()
+            self.callback(self._handle, 1, self.every_n_samples, None)
+            self.callback_log.append((tacquired, tstart, time.perf_counter()))
+            self.nsamps_acquired = nsamps
+
+    def start(self):
+        self.running = True
+        self.callback_log = []
+        if self.callback is not None:
+            self.thread = threading.Thread(target=self.run_clock, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if (
+            self.thread is not None
+            and self.thread is not threading.current_thread()
+        ):
+            self.thread.join()
+
+    def close(self):
+        self.stop()
+
+    def write(self, data, auto_start=False, timeout=10.0):
+        return 1
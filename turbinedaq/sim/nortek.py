@@ -0,0 +1,116 @@
+"""A simulated replacement for ``nortek.controls.PdControl``, for the
+Vectrino acoustic Doppler velocimeter.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from turbinedaq.buffers import DataBuffer
+
+from . import acsc, signals
+from .controller import CARRIAGE_AXIS
+from .nidaqmx import TRIGGER_OUTPUT
+
+COLUMNS = [
+    "time",
+    "u",
+    "v",
+    "w",
+    "corr_u",
+    "corr_v",
+    "corr_w",
+    "snr_u",
+    "snr_v",
+    "snr_w",
+]
+
+
+class PdControl(object):
+    """Simulates a Vectrino that measures the flow relative to the
+    carriage.
+    """
+
+    def __init__(self):
+        self.serial_port = None
+        self.connected = False
+        self.state = "Not connected"
+        self.start_on_sync = False
+        self.sync_master = True
+        self.sample_on_sync = False
+        self.sample_rate = 200
+        self.transmit_length = 3
+        self.sampling_volume = 3
+        self.sound_speed_mode = "measured"
+        self.salinity = 0.0
+        self.power_level = "High"
+        self.vel_range = 1
+        self.recording = False
+        self.data = DataBuffer(COLUMNS, capacity=self.sample_rate * 60)
+        self.rng = np.random.default_rng()
+        self.thread = None
+
+    def connect(self):
+        self.connected = True
+        self.state = "Command mode"
+
+    def disconnect(self):
+        self.stop()
+        self.connected = False
+        self.state = "Not connected"
+
+    def set_config(self):
+        pass
+
+    def start_disk_recording(self, filename):
+        self.recording = True
+
+    def stop_disk_recording(self):
+        self.recording = False
+
+    def synced(self):
+        if not self.start_on_sync:
+            return True
+        controller = acsc.current_controller()
+        if controller is None:
+            return True
+        return controller.state()["outputs"].get(TRIGGER_OUTPUT, 0) == 1
+
+    def sample(self):
+        while self.state == "Confirmation mode" and not self.synced():
+            time.sleep(0.001)
+        t0 = time.perf_counter()
+        n = 0
+        while self.state == "Confirmation mode":
+            delay = t0 + n / self.sample_rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            controller = acsc.current_controller()
+            tow_speed = 0.0
+            if controller is not None:
+                tow_speed = controller.state()["vel"][CARRIAGE_AXIS]
+            sample = signals.vectrino_sample(tow_speed, self.rng)
+            sample["time"] = n / self.sample_rate
+            # The data may have been reset to a dict after a run
+            if isinstance(self.data, DataBuffer):
+                self.data.extend({k: [v] for k, v in sample.items()})
+            n += 1
+
+    def start(self):
+        if not self.connected:
+            return
+        if isinstance(self.data, DataBuffer):
+            self.data.clear()
+        else:
+            self.data = DataBuffer(COLUMNS, capacity=self.sample_rate * 60)
+        self.state = "Confirmation mode"
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.connected:
+            self.state = "Command mode"
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
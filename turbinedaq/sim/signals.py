@@ -0,0 +1,104 @@
+"""Synthetic signals resembling those measured in the tow tank."""
+
+import numpy as np
+
+RHO = 1000.0
+# Frontal area (m^2) and radius (m) of the simulated turbine
+AREA = 1.0
+RADIUS = 0.5
+# Number of blades, which sets the frequency of load fluctuations
+NBLADES = 3
+# Degrees of turbine rotation per unit of turbine axis position in the
+# controller, i.e., the axis has 60 units per revolution
+DEG_PER_UNIT = 6.0
+
+
+def power_coeff(tsr):
+    """A smooth power coefficient curve peaking at a tip speed ratio of
+    about 2.
+    """
+    tsr = np.asarray(tsr, dtype=float)
+    return np.where(
+        (tsr > 0) & (tsr < 4), 0.45 * np.sin(np.pi * tsr / 4) ** 2, 0.0
+    )
+
+
+def turbine_loads(t, angle_deg, tow_speed, rpm, rng):
+    """Return a dict of turbine load cell signals.
+
+    Parameters
+    ----------
+    t : numpy.ndarray
+        Sample times in seconds.
+    angle_deg : numpy.ndarray
+        Turbine angle at each sample in degrees.
+    tow_speed : float
+        Carriage speed in m/s.
+    rpm : float
+        Turbine speed in RPM.
+    rng : numpy.random.Generator
+        Random number generator for measurement noise.
+    """
+    n = len(t)
+    U = float(tow_speed)
+    omega = rpm * 2 * np.pi / 60.0
+    angle = np.deg2rad(angle_deg)
+    ripple = np.sin(NBLADES * angle)
+    dyn_pressure = 0.5 * RHO * AREA * U * abs(U)
+    drag = 0.8 * dyn_pressure * (1 + 0.1 * ripple)
+    if abs(omega) > 1e-3 and abs(U) > 1e-3:
+        tsr = omega * RADIUS / abs(U)
+        power = power_coeff(tsr) * dyn_pressure * abs(U)
+        torque = power / omega * (1 + 0.2 * ripple)
+    else:
+        torque = np.zeros(n)
+    torque_trans = torque + rng.normal(scale=0.2, size=n)
+    return {
+        "torque_trans": torque_trans,
+        "torque_arm": 1.02 * torque + rng.normal(scale=0.2, size=n),
+        "drag_left": drag / 2 + rng.normal(scale=1.0, size=n),
+        "drag_right": drag / 2 + rng.normal(scale=1.0, size=n),
+        "LF_left": 0.1 * drag * np.sin(angle) + rng.normal(scale=0.5, size=n),
+        "LF_right": -0.1 * drag * np.sin(angle)
+        + rng.normal(scale=0.5, size=n),
+    }
+
+
+def temperatures(t, rng):
+    """Return a dict of AFT temperature signals in degrees C."""
+    n = len(t)
+    return {
+        "resistor_temp": 25.0 + rng.normal(scale=0.05, size=n),
+        "water_temp": 20.0 + rng.normal(scale=0.02, size=n),
+        "fore_temp": 21.0 + rng.normal(scale=0.05, size=n),
+        "aft_temp": 21.5 + rng.normal(scale=0.05, size=n),
+    }
+
+
+def aft_forces(angle_deg, tow_speed, rng):
+    """Return the four AFT load cell forces in N for a single sample."""
+    U = float(tow_speed)
+    thrust = 0.5 * RHO * AREA * U * abs(U) * 0.8
+    angle = np.deg2rad(angle_deg)
+    phases = np.arange(4) * np.pi / 2
+    return thrust / 4 * (
+        1 + 0.1 * np.sin(NBLADES * angle + phases)
+    ) + rng.normal(scale=0.5, size=4)
+
+
+def vectrino_sample(tow_speed, rng):
+    """Return a dict of a single Vectrino sample, with the flow relative to
+    the carriage.
+    """
+    u = float(tow_speed) + rng.normal(scale=0.02)
+    return {
+        "u": u,
+        "v": rng.normal(scale=0.02),
+        "w": rng.normal(scale=0.02),
+        "corr_u": 90.0 + rng.normal(scale=2.0),
+        "corr_v": 90.0 + rng.normal(scale=2.0),
+        "corr_w": 90.0 + rng.normal(scale=2.0),
+        "snr_u": 20.0 + rng.normal(scale=1.0),
+        "snr_v": 20.0 + rng.normal(scale=1.0),
+        "snr_w": 20.0 + rng.normal(scale=1.0),
+    }
@@ -0,0 +1,60 @@
+"""Streaming versions of signal processing done during acquisition."""
+
+import numpy as np
+from pxl import fdiff
+from pxl import timeseries as ts
+
+
+class SmoothedDerivative(object):
+    """Incrementally compute ``ts.smooth(fdiff.second_order_diff(y, x) /
+    scale, window)`` as ``y`` and ``x`` grow.
+
+    Each update only processes the newest samples plus a small overlap, so
+    the cost per update is constant regardless of how much data has been
+    collected. The overlap covers the previous last point, which was
+    computed with a backward difference and becomes a central difference once
+    more data arrives, plus enough history to warm up the moving average, so
+    results are identical to the batch computation.
+
+    Parameters
+    ----------
+    scale : float
+        Value to divide the derivative by, e.g., 6.0 to convert deg/s to RPM.
+    window : int
+        Moving average filter width passed to ``ts.smooth``.
+    """
+
+    def __init__(self, scale=1.0, window=8):
+        self.scale = scale
+        self.window = window
+        self.nprocessed = 0
+
+    def update(self, y, x):
+        """Process all new samples in ``y`` and ``x``.
+
+        Returns
+        -------
+        start : int
+            Index of the first output sample that should be (over)written.
+        values : numpy.ndarray
+            New output values for indices ``start`` onward.
+        """
+        n = len(y)
+        # Wait for more than one filter window of data so the moving average
+        # is computed the same way it would be in batch mode
+        if n <= max(self.window, 2):
+            return self.nprocessed, np.array([])
+        # The last point from the previous update must be recomputed
+        start = max(self.nprocessed - 1, 0)
+        # Extra points needed to fill the moving average window
+        iwarm = max(start - max(self.window - 1, 0), 0)
+        # Interior points need their left neighbor for a central difference
+        idiff = max(iwarm - 1, 0)
+        dydx = fdiff.second_order_diff(y[idiff:n], x[idiff:n]) / self.scale
+        dydx = dydx[iwarm - idiff :]
+        values = ts.smooth(dydx, self.window)[start - iwarm :]
+        self.nprocessed = n
+        return start, values
+
+    def reset(self):
+        self.nprocessed = 0
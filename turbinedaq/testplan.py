@@ -0,0 +1,433 @@
+"""Test plan scheduling and Qt model for showing the test plan."""
+
+import os
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import scipy.interpolate
+from PyQt5 import QtCore, QtGui
+
+
+def load_settling_times(fpath):
+    """Return a function interpolating the time in seconds for the tank to
+    settle after a tow from a CSV with ``tow_speed`` and ``settling_time``
+    columns, e.g., ``config/settling_times.csv``.
+
+    Tow speeds outside the table get the settling time of the nearest end.
+    """
+    stdf = pd.read_csv(fpath, skipinitialspace=True)
+    return scipy.interpolate.interp1d(
+        stdf.tow_speed,
+        stdf.settling_time,
+        bounds_error=False,
+        fill_value=(stdf.settling_time.iloc[0], stdf.settling_time.iloc[-1]),
+    )
+
+
+def tare_idle_time(section, U=None):
+    """Return the time in seconds to wait after a tare run."""
+    if U is None:
+        if "strut" in section.lower() and "torque" in section.lower():
+            return 30
+        return 5
+    elif U <= 0.6:
+        return 30
+    elif U <= 1.0:
+        return 60
+    elif U <= 1.1:
+        return 90
+    return 120
+
+
+def load_test_plan(wdir):
+    """Load the test plan from CSVs in the ``config/test-plan`` (or legacy
+    ``config/test plan``) subdirectory of ``wdir``.
+
+    Returns
+    -------
+    test_plan : dict
+        Mapping of section names to DataFrames.
+    """
+    tpdir = os.path.join(wdir, "config", "test-plan")
+    tpdir_legacy = os.path.join(wdir, "config", "test plan")
+    if not os.path.isdir(tpdir) and os.path.isdir(tpdir_legacy):
+        print("Using legacy test plan directory")
+        tpdir = tpdir_legacy
+    test_plan = {}
+    if os.path.isdir(tpdir):
+        for f in sorted(os.listdir(tpdir)):
+            if f.endswith(".csv"):
+                section = f.replace(".csv", "")
+                test_plan[section] = pd.read_csv(os.path.join(tpdir, f))
+    return test_plan
+
+
+def run_kind(section) -> str:
+    """Return the kind of runs in a test plan section from its name, i.e.,
+    ``"tare drag"``, ``"tare torque"``, ``"strut torque"``, or
+    ``"turbine tow"``.
+    """
+    name = section.lower()
+    if "tare" in name and "drag" in name:
+        return "tare drag"
+    elif "tare" in name and "torque" in name:
+        return "tare torque"
+    elif "strut" in name and "torque" in name:
+        return "strut torque"
+    return "turbine tow"
+
+
+def run_params(section, run_props, turbine_properties) -> tuple:
+    """Return the kind of a run in the test plan and the parameters for
+    executing it.
+
+    Parameters
+    ----------
+    section : str
+        Test plan section name.
+    run_props : pandas.Series
+        Row of the test plan section.
+    turbine_properties : dict
+        Turbine properties keyed by turbine name. Runs without a
+        ``turbine`` column use the first turbine.
+
+    Returns
+    -------
+    kind : str
+        Kind of run, from ``run_kind``.
+    params : dict
+        Parameters of the run, i.e., ``U`` for tare drag runs, ``rpm`` and
+        ``dur`` for tare torque runs, ``ref_speed``, ``tsr``, ``radius``,
+        and ``revs`` for strut torque runs, and the turbine name and
+        ``runtypes.TurbineTow`` settings for turbine tows. Settings not in
+        the test plan get their defaults.
+    """
+    kind = run_kind(section)
+    if kind == "tare drag":
+        return kind, {"U": run_props.tow_speed}
+    elif kind == "tare torque":
+        dur = run_props.revs / run_props.rpm * 60
+        return kind, {"rpm": run_props.rpm, "dur": dur}
+    turbine = run_props.get("turbine", list(turbine_properties)[0])
+    if kind == "strut torque":
+        return kind, {
+            "ref_speed": run_props.ref_speed,
+            "tsr": run_props.tsr,
+            "radius": turbine_properties[turbine]["radius"],
+            "revs": run_props.revs,
+        }
+    vectrino = run_props.get("vectrino", True)
+    return kind, {
+        "U": run_props.tow_speed,
+        "tsr": run_props.tsr,
+        "y_R": run_props["y/R"] if vectrino else None,
+        "z_H": run_props["z/H"] if vectrino else None,
+        "turbine": turbine,
+        "vectrino": vectrino,
+        "fbg": run_props.get("fbg", False),
+        "odisi": run_props.get("odisi", False),
+        "settling": "settling" in section.lower(),
+        "acs_sample_rate": run_props.get("acs_sample_rate", 1000),
+        "acs_bufflen": run_props.get("acs_buffer_rows", 100),
+        "ni_sample_rate": run_props.get("ni_sample_rate"),
+        "ni_block_size": run_props.get("ni_block_size"),
+    }
+
+
+def idle_time(section, run_props, settling_time) -> float:
+    """Return the time in seconds to wait for the tank to settle after a run
+    in the test plan.
+
+    Parameters
+    ----------
+    section : str
+        Test plan section name.
+    run_props : pandas.Series
+        Row of the test plan section.
+    settling_time : callable
+        Settling time for a turbine tow speed, e.g., from
+        ``load_settling_times``.
+    """
+    kind = run_kind(section)
+    if kind == "tare drag":
+        return tare_idle_time(section, run_props.tow_speed)
+    elif kind in ("tare torque", "strut torque"):
+        return tare_idle_time(section)
+    elif "settling" in section.lower():
+        return 5
+    return float(settling_time(run_props.tow_speed))
+
+
+def run_duration(section, run_props, turbine_properties={}) -> float:
+    """Estimate the time in seconds to execute a run in the test plan, the
+    same way the run types estimate it to size their data buffers.
+    """
+    kind = run_kind(section)
+    if kind == "tare drag":
+        return 24.5 / run_props.tow_speed + 24.5 / 0.6 + 15.0
+    elif kind == "tare torque":
+        return run_props.revs / run_props.rpm * 60
+    elif kind == "strut torque":
+        params = run_params(section, run_props, turbine_properties)[1]
+        omega = params["tsr"] / params["radius"] * params["ref_speed"]
+        rpm = omega * 60 / (2 * np.pi)
+        return params["revs"] / rpm * 60
+    return 24.5 / run_props.tow_speed + 30.0
+
+
+def predict_duration(
+    section, df, runs, settling_time, turbine_properties={}
+) -> float:
+    """Predict the time in seconds to execute ``runs`` of a test plan section
+    in order, including waiting for the tank to settle between runs.
+    """
+    rows = df.set_index("run", drop=False)
+    total = 0.0
+    for i, nrun in enumerate(runs):
+        run_props = rows.loc[nrun]
+        total += run_duration(section, run_props, turbine_properties)
+        if i < len(runs) - 1:
+            total += idle_time(section, run_props, settling_time)
+    return total
+
+
+def optimize_order(section, df, runs, settling_time) -> list:
+    """Return the order of ``runs`` that minimizes the predicted time to
+    execute them.
+
+    The wait after each run depends only on that run, so the total waiting
+    time is the same in any order except that there is no wait after the
+    last run. The run with the longest wait is therefore moved to the end,
+    keeping the rest in their current order.
+    """
+    runs = list(runs)
+    if len(runs) < 2:
+        return runs
+    rows = df.set_index("run", drop=False)
+    waits = [idle_time(section, rows.loc[n], settling_time) for n in runs]
+    # Take the last of any ties so runs move as little as possible
+    last = len(waits) - 1 - int(np.argmax(waits[::-1]))
+    return runs[:last] + runs[last + 1 :] + [runs[last]]
+
+
+class TestPlanModel(QtCore.QAbstractTableModel):
+    """Table model for a test plan section, backed by its DataFrame.
+
+    A "Done?" column is appended to the section's columns. Cells are
+    formatted and runs looked up in the run index only when the view asks for
+    them, i.e., for visible rows, so large sections cost nothing up front.
+    """
+
+    def __init__(self, parent=None):
+        QtCore.QAbstractTableModel.__init__(self, parent)
+        self.section = None
+        self.df = None
+        self.run_index = None
+        self.done_brushes = {
+            QtCore.Qt.ForegroundRole: QtGui.QBrush(QtCore.Qt.darkGreen),
+            QtCore.Qt.BackgroundRole: QtGui.QBrush(QtCore.Qt.lightGray),
+        }
+
+    def set_section(self, section, df, run_index):
+        """Show test plan section ``section`` with DataFrame ``df``, looking
+        up which runs are done in ``run_index``.
+        """
+        self.beginResetModel()
+        self.section = section
+        self.df = df
+        self.run_index = run_index
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self.section = None
+        self.df = None
+        self.endResetModel()
+
+    @property
+    def toplevel(self) -> bool:
+        return str(self.section).lower() == "top level"
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if self.df is None or parent.isValid():
+            return 0
+        return len(self.df)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if self.df is None or parent.isValid():
+            return 0
+        return len(self.df.columns) + 1
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole or self.df is None:
+            return None
+        if orientation == QtCore.Qt.Vertical:
+            return str(section)
+        if section == len(self.df.columns):
+            return "Done?"
+        return str(self.df.columns[section])
+
+    def is_done(self, row) -> bool:
+        """Whether the run in ``row`` is done, or ``None`` for the top
+        level section.
+        """
+        if self.toplevel:
+            return None
+        return self.run_index.is_done(self.section, row)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or self.df is None:
+            return None
+        row, col = index.row(), index.column()
+        if role == QtCore.Qt.TextAlignmentRole:
+            return QtCore.Qt.AlignCenter
+        if role == QtCore.Qt.DisplayRole:
+            if col < len(self.df.columns):
+                return str(self.df.iat[row, col])
+            isdone = self.is_done(row)
+            if isdone is None:
+                return None
+            return "Yes" if isdone else "No"
+        if role in self.done_brushes and self.is_done(row):
+            return self.done_brushes[role]
+        return None
+
+
+class RunScheduler(object):
+    """Queue of the pending runs in a test plan section.
+
+    Runs are queued in test plan order, skipping any already done. A run
+    stays at the front of the queue until it's marked done, so an aborted
+    run is redone next. Runs marked done are dropped lazily once they reach
+    the front, so getting the next run and marking one done are O(1).
+
+    Parameters
+    ----------
+    section : str
+        Test plan section name.
+    df : pandas.DataFrame
+        Test plan section, with a ``run`` column.
+    run_index : RunIndex, optional
+        Index used to skip runs that are already done.
+    """
+
+    def __init__(self, section, df, run_index=None):
+        self.section = section
+        self.df = df
+        done = set()
+        if run_index is not None:
+            done = run_index.done_runs(section)
+        self.pending = deque(int(n) for n in df["run"] if int(n) not in done)
+        self.queued = set(self.pending)
+
+    def __len__(self):
+        return len(self.queued)
+
+    def runs(self) -> list:
+        """Return the pending runs in the order they'll be executed."""
+        return list(dict.fromkeys(n for n in self.pending if n in self.queued))
+
+    @property
+    def done(self) -> bool:
+        return not self.queued
+
+    def peek(self):
+        """Return the next run without removing it, or ``None`` if the
+        section is done.
+        """
+        while self.pending and self.pending[0] not in self.queued:
+            self.pending.popleft()
+        return self.pending[0] if self.pending else None
+
+    def pop(self):
+        """Remove and return the next run, or ``None`` if the section is
+        done.
+        """
+        nrun = self.peek()
+        if nrun is not None:
+            self.pending.popleft()
+            self.queued.discard(nrun)
+        return nrun
+
+    def mark_done(self, nrun):
+        self.queued.discard(int(nrun))
+
+    def reorder(self, by, ascending=True):
+        """Reorder the pending runs by the test plan column(s) ``by``,
+        keeping their current order within ties, e.g.,
+        ``reorder("tow_speed")`` to group runs at the same tow speed.
+        """
+        runs = self.runs()
+        position = {nrun: i for i, nrun in enumerate(runs)}
+        rows = self.df[self.df["run"].isin(runs)].copy()
+        rows["_position"] = rows["run"].map(position)
+        by = [by] if isinstance(by, str) else list(by)
+        if isinstance(ascending, bool):
+            ascending = [ascending] * len(by)
+        rows = rows.sort_values(
+            by + ["_position"], ascending=list(ascending) + [True]
+        )
+        self.pending = deque(int(n) for n in rows["run"])
+
+    def set_order(self, runs):
+        """Execute the pending runs in the order of ``runs``, followed by any
+        pending runs not in it in their current order.
+        """
+        order = [int(n) for n in runs if int(n) in self.queued]
+        ordered = set(order)
+        order += [n for n in self.runs() if n not in ordered]
+        self.pending = deque(dict.fromkeys(order))
+
+
+class PlanScheduler(object):
+    """Run schedulers for each section of a test plan sharing a run index.
+
+    Schedulers are created when first needed. They're rebuilt when the run
+    index picks up runs saved or deleted elsewhere, keeping any order set
+    with ``set_order``.
+
+    Parameters
+    ----------
+    test_plan : dict
+        Mapping of section names to DataFrames.
+    run_index : RunIndex
+        Index of done runs.
+    """
+
+    def __init__(self, test_plan, run_index):
+        self.test_plan = test_plan
+        self.run_index = run_index
+        self.schedulers = {}
+        # Order to execute runs in for sections that have been reordered
+        self.orders = {}
+
+    def get(self, section) -> RunScheduler:
+        """Return the queue of pending runs for a test plan section."""
+        if section not in self.schedulers:
+            scheduler = RunScheduler(
+                section, self.test_plan[section], self.run_index
+            )
+            if section in self.orders:
+                scheduler.set_order(self.orders[section])
+            self.schedulers[section] = scheduler
+        return self.schedulers[section]
+
+    def refresh(self) -> bool:
+        """Pick up runs saved or deleted elsewhere, returning whether
+        anything changed.
+        """
+        changed = self.run_index.refresh()
+        if changed:
+            self.schedulers = {}
+        return changed
+
+    def set_order(self, section, runs):
+        self.orders[section] = list(runs)
+        self.get(section).set_order(runs)
+
+    def mark_done(self, section, nrun):
+        """Add a run that was just saved to the index and its queue."""
+        self.run_index.mark_done(section, nrun)
+        if section in self.schedulers:
+            self.schedulers[section].mark_done(nrun)
@@ -1,5 +1,7 @@
 """Tests for the ``acsprgs`` module."""
 
+import pytest
+
 from turbinedaq.acsprgs import tare_drag_prg, tare_torque_prg, turbine_tow_prg
 
 
@@ -13,3 +15,28 @@ def test_tare_torque():
 
 def test_tare_drag():
     print(tare_drag_prg(tow_speed=1.0, prgdir="../acsprgs"))
+
+
+def test_turbine_tow_dc_params():
+    prg = turbine_tow_prg(
+        1.0,
+        1.9,
+        0.5,
+        prgdir="../acsprgs",
+        sample_period_ms=0.5,
+        n_buffer_rows=400,
+    )
+    assert "global real data(3)(400)" in prg
+    assert "sample_period_ms = 0.5" in prg
+    assert "DC/c data, 400, sample_period_ms" in prg
+    with pytest.raises(ValueError):
+        turbine_tow_prg(1.0, 1.9, 0.5, prgdir="../acsprgs", n_buffer_rows=1)
+    for sample_period_ms in [float("nan"), float("inf")]:
+        with pytest.raises(ValueError):
+            turbine_tow_prg(
+                1.0,
+                1.9,
+                0.5,
+                prgdir="../acsprgs",
+                sample_period_ms=sample_period_ms,
+            )
@@ -0,0 +1,52 @@
+"""Tests for the ``acsstatus`` module."""
+
+import time
+
+import pytest
+from acspy import acsc
+
+from turbinedaq.acsstatus import (
+    AXES,
+    HOME_COUNTERS,
+    AcsStatusThread,
+    probe_integers,
+    read_home_counters,
+    read_status,
+)
+
+
+@pytest.fixture
+def acs_hcomm():
+    hc = acsc.open_comm_simulator()
+    yield hc
+    acsc.closeComm(hc)
+
+
+def test_read_status(acs_hcomm):
+    status = read_status(acs_hcomm)
+    for name, axis in AXES.items():
+        assert status.rpos[name] == acsc.getRPosition(acs_hcomm, axis)
+        assert (
+            status.enabled[name]
+            == acsc.getMotorState(acs_hcomm, axis)["enabled"]
+        )
+
+
+def test_acsstatusthread(acs_hcomm):
+    thread = AcsStatusThread(acs_hcomm, interval=0.05)
+    thread.start()
+    time.sleep(0.5)
+    thread.stop()
+    thread.wait()
+    assert thread.status is not None
+    assert set(thread.status.fvel) == set(AXES)
+
+
+def test_read_home_counters(acs_hcomm):
+    assert probe_integers(acs_hcomm, ["NOT_A_VARIABLE"]) == []
+    available = probe_integers(acs_hcomm, HOME_COUNTERS.values())
+    values = read_home_counters(acs_hcomm, available)
+    assert set(values) == set(HOME_COUNTERS)
+    for name, varname in HOME_COUNTERS.items():
+        if varname not in available:
+            assert values[name] == 0
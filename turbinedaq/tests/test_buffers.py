@@ -0,0 +1,39 @@
+"""Tests for the ``buffers`` module."""
+
+import numpy as np
+
+from turbinedaq.buffers import DataBuffer
+
+
+def test_databuffer_append():
+    buf = DataBuffer(["time", "x"], capacity=3)
+    chunks = [np.arange(n, n + 2, dtype=float) for n in range(0, 10, 2)]
+    for chunk in chunks:
+        buf.append("x", chunk)
+    assert np.all(buf["x"] == np.arange(10))
+    assert buf.capacity("x") >= 10
+    assert len(buf["time"]) == 0
+    assert set(dict(buf)) == {"time", "x"}
+
+
+def test_databuffer_set():
+    buf = DataBuffer(["x"], capacity=2)
+    buf.set("x", np.ones(5))
+    assert np.all(buf["x"] == 1)
+    buf.set("x", np.zeros(2))
+    assert len(buf["x"]) == 2
+    buf.clear()
+    assert len(buf["x"]) == 0
+
+
+def test_databuffer_generation():
+    buf = DataBuffer(["x"])
+    gen = buf.generation
+    buf.append("x", np.ones(3))
+    assert buf.generation > gen
+    gen = buf.generation
+    buf.put("x", 1, np.zeros(4))
+    assert buf.generation > gen
+    gen = buf.generation
+    buf.clear()
+    assert buf.generation > gen
@@ -0,0 +1,35 @@
+"""Tests for the ``configcache`` module."""
+
+import json
+import os
+
+import pytest
+
+from turbinedaq.configcache import ConfigCache
+
+
+def test_configcache(tmp_path):
+    config = tmp_path / "config"
+    config.mkdir()
+    cache = ConfigCache(str(tmp_path))
+    assert cache.fbg_properties() == {}
+    with pytest.raises(IOError):
+        cache.settling_time()
+    stpath = config / "settling_times.csv"
+    stpath.write_text("tow_speed, settling_time\n0.2,100\n1.2,200\n")
+    f_interp = cache.settling_time()
+    assert f_interp(0.7) == 150
+    # The interpolator is only rebuilt once the file is modified
+    assert cache.settling_time() is f_interp
+    stpath.write_text("tow_speed, settling_time\n0.2,100\n1.2,300\n")
+    mtime = os.stat(stpath).st_mtime + 1
+    os.utime(stpath, (mtime, mtime))
+    assert cache.settling_time()(0.7) == 200
+    tppath = config / "turbine_properties.json"
+    tppath.write_text(json.dumps({"UNH-RVAT": {"kind": "CFT", "radius": 1}}))
+    turbine_properties = cache.turbine_properties()
+    assert turbine_properties["UNH-RVAT"]["diameter"] == 2
+    assert turbine_properties["RM2"]["radius"] == 0.5375
+    # Modifying the returned properties doesn't change the cache
+    turbine_properties["UNH-RVAT"]["radius"] = 3
+    assert cache.turbine_properties()["UNH-RVAT"]["radius"] == 1
@@ -6,7 +6,14 @@ import numpy as np
 import pytest
 from acspy import acsc
 
-from turbinedaq.daqtasks import AcsDaqThread, AftAcsDaqThread
+from turbinedaq.daqtasks import (
+    AcsDaqThread,
+    AftAcsDaqThread,
+    NiDaqThread,
+    NiTaskPool,
+    default_block_size,
+    validate_ni_timing,
+)
 
 
 @pytest.fixture
@@ -21,6 +28,7 @@ def test_aftacsdaqthread(acs_hcomm):
     thread.start()
     time.sleep(2)
     thread.stop()
+    thread.wait()
     assert np.all(np.round(np.diff(thread.data["time"]), decimals=6) == 0.001)
 
 
@@ -29,4 +37,61 @@ def test_acsdaqthread(acs_hcomm):
     thread.start()
     time.sleep(2)
     thread.stop()
+    thread.wait()
     assert np.all(np.round(np.diff(thread.data["time"]), decimals=6) == 0.001)
+
+
+def test_aftacsdaqthread_pingpong(acs_hcomm):
+    thread = AftAcsDaqThread(acs_hc=acs_hcomm, makeprg=True, pingpong=True)
+    thread.start()
+    time.sleep(2)
+    thread.stop()
+    thread.wait()
+    assert thread.overruns == 0
+    assert np.all(np.round(np.diff(thread.data["time"]), decimals=6) == 0.001)
+
+
+def test_default_block_size():
+    assert default_block_size(2000) == 200
+    assert default_block_size(100) == 10
+    # 300 doesn't divide the 10 kS buffer
+    assert default_block_size(3000) == 250
+
+
+def test_validate_ni_timing():
+    assert validate_ni_timing(2000, 200) == 10000
+    assert validate_ni_timing(20000, 5000) == 100000
+    for sample_rate, nsamps in [
+        (0, 10),
+        (1e6, 1000),
+        (2000, 10),
+        (2000, 300),
+        (2000, 10000),
+    ]:
+        with pytest.raises(ValueError):
+            validate_ni_timing(sample_rate, nsamps)
+
+
+def test_nitaskpool():
+    pool = NiTaskPool()
+    ndata = []
+    for n in range(2):
+        thread = NiDaqThread(usetrigger=False, duration=5.0, pool=pool)
+        if n == 0:
+            tasks = thread.tasks
+        # The tasks are reused by the next run with the same settings
+        assert thread.tasks is tasks
+        thread.start()
+        time.sleep(0.5)
+        thread.clear()
+        thread.wait()
+        ndata.append(len(thread.data["time"]))
+    assert min(ndata) >= 400
+    thread = NiDaqThread(
+        usetrigger=False, duration=5.0, sample_rate=5000, pool=pool
+    )
+    assert thread.tasks is not tasks
+    assert thread.metadata["Channel info"]["drag_left"]["Scale name"] == (
+        "drag_left_scale"
+    )
+    pool.close()
@@ -0,0 +1,94 @@
+"""Tests for the ``engine`` module."""
+
+import os
+
+import pytest
+from acspy import acsc
+
+from turbinedaq import runtypes, writers
+from turbinedaq.engine import RunEngine, load_test_plan, tare_idle_time
+from turbinedaq.runindex import RunIndex
+
+
+@pytest.fixture
+def wdir(tmp_path):
+    tpdir = tmp_path / "config" / "test-plan"
+    tpdir.mkdir(parents=True)
+    (tpdir / "tare-drag.csv").write_text("run,tow_speed\n0,0.3\n1,0.4\n")
+    return str(tmp_path)
+
+
+@pytest.fixture
+def acs_hcomm():
+    hc = acsc.open_comm_simulator()
+    yield hc
+    acsc.closeComm(hc)
+
+
+def test_load_test_plan(wdir):
+    test_plan = load_test_plan(wdir)
+    assert list(test_plan) == ["tare-drag"]
+    assert list(test_plan["tare-drag"].run) == [0, 1]
+
+
+def test_next_run(wdir, acs_hcomm):
+    engine = RunEngine(wdir, hc=acs_hcomm)
+    assert engine.next_run("tare-drag") == 0
+    rundir = engine.rundir("tare-drag", 0)
+    assert rundir == os.path.join(wdir, "data", "raw", "tare-drag", "0")
+    os.makedirs(rundir)
+    with open(os.path.join(rundir, "metadata.json"), "w") as f:
+        f.write("{}")
+    assert engine.next_run("tare-drag") == 1
+    assert not engine.is_section_done("tare-drag")
+
+
+def test_optimize_section(wdir, acs_hcomm):
+    config = os.path.join(wdir, "config")
+    with open(os.path.join(config, "test-plan", "perf.csv"), "w") as f:
+        f.write("run,tow_speed,tsr\n0,1.2,2\n1,0.4,2\n2,0.8,2\n")
+    with open(os.path.join(config, "settling_times.csv"), "w") as f:
+        f.write("tow_speed,settling_time\n0.2,100\n1.2,200\n")
+    engine = RunEngine(wdir, hc=acs_hcomm)
+    predicted, baseline = engine.optimize_section("perf")
+    assert engine.plan_scheduler.get("perf").runs() == [1, 2, 0]
+    assert baseline - predicted == pytest.approx(200 - 160)
+    assert engine.next_run("perf") == 1
+
+
+def test_wait_for_save(wdir, acs_hcomm):
+    engine = RunEngine(wdir, hc=acs_hcomm)
+    rundir = engine.rundir("tare-drag", 0)
+    os.makedirs(rundir)
+    engine.savethread = writers.SaveThread(rundir, {}, {})
+    engine.saving = ("tare-drag", 0)
+    engine.savethread.start()
+    engine.wait_for_save()
+    assert engine.next_run("tare-drag") == 1
+    # The GUI sees the run as done through the run index manifest
+    assert RunIndex(engine.run_index.rawdir).is_done("tare-drag", 0)
+
+
+def test_tare_idle_time():
+    assert tare_idle_time("tare-torque") == 5
+    assert tare_idle_time("strut-torque") == 30
+    assert tare_idle_time("tare-drag", 1.2) == 120
+
+
+def test_execute_interrupted(wdir, acs_hcomm, monkeypatch):
+    # ACSPL+ programs are loaded relative to the repo root
+    monkeypatch.chdir("..")
+
+    def interrupt(hc, nbuf):
+        raise KeyboardInterrupt
+
+    # Interrupt while waiting for the tow to finish
+    monkeypatch.setattr(runtypes, "wait_program_end", interrupt)
+    engine = RunEngine(wdir, hc=acs_hcomm)
+    acsc.enable(acs_hcomm, 5)
+    with pytest.raises(KeyboardInterrupt):
+        engine.execute("tare-drag", 0)
+    assert engine.run.aborted
+    assert not engine.running
+    assert not acsc.getProgramState(acs_hcomm, 19) & runtypes.PST_RUN
+    assert engine.run.acsdaqthread.isFinished()
@@ -0,0 +1,78 @@
+"""Tests for the ``plotting`` module."""
+
+import numpy as np
+
+from turbinedaq.buffers import DataBuffer
+from turbinedaq.plotting import (
+    PlotScheduler,
+    minmax_decimate,
+    window_decimate,
+    window_start,
+)
+
+
+def test_window_start():
+    t = np.arange(1000) / 100.0
+    assert window_start(t, 2.0) == 799
+    assert window_start(t, 100.0) == 0
+    assert window_start(np.array([]), 2.0) == 0
+
+
+def test_minmax_decimate():
+    x = np.arange(10001, dtype=float)
+    y = np.sin(x / 100.0)
+    y[1234] = 5.0
+    y[5678] = -5.0
+    xd, yd = minmax_decimate(x, y, 100)
+    assert len(xd) <= 2 * 100 + 3
+    assert np.all(np.diff(xd) > 0)
+    assert yd.max() == 5.0 and yd.min() == -5.0
+    assert xd[-1] == x[-1]
+    # The latest sample is kept even when there are no leftover samples
+    xd, yd = minmax_decimate(x[:10000], y[:10000], 100)
+    assert xd[-1] == x[9999]
+    assert np.all(np.diff(xd) > 0)
+    # Constant bins don't repeat samples
+    xd, yd = minmax_decimate(x[:1000], np.ones(1000), 100)
+    assert np.all(np.diff(xd) > 0)
+    # Short arrays are returned unchanged
+    xd, yd = minmax_decimate(x[:50], y[:50], 100)
+    assert np.all(yd == y[:50])
+
+
+def test_window_decimate():
+    t = np.arange(100000) / 1000.0
+    y = np.ones(100001)
+    td, yd = window_decimate(t, y, 30.0, 500)
+    assert td[0] >= t[-1] - 30.0
+    assert len(td) <= 1003
+    assert len(td) == len(yd)
+
+
+def test_plotscheduler():
+    data = DataBuffer(["time"])
+    visible = {"NI": True, "LF": False}
+    calls = []
+    scheduler = PlotScheduler()
+    for name in visible:
+        scheduler.add(
+            name,
+            lambda name=name: calls.append(name),
+            lambda: data,
+            lambda name=name: visible[name],
+            rate=10.0,
+        )
+    data.append("time", np.arange(10))
+    assert scheduler.tick(now=1.0) == ["NI"]
+    # New data, but too soon for the refresh rate
+    data.append("time", np.arange(10))
+    assert scheduler.tick(now=1.05) == []
+    assert scheduler.tick(now=1.2) == ["NI"]
+    # No new data
+    assert scheduler.tick(now=2.0) == []
+    # Hidden plots are updated once shown
+    visible["LF"] = True
+    assert scheduler.tick(now=3.0) == ["LF"]
+    scheduler.set_rate("LF", 2.0)
+    assert scheduler.rates == {"NI": 10.0, "LF": 2.0}
+    assert calls == ["NI", "NI", "LF"]
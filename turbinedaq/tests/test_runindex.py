@@ -0,0 +1,77 @@
+"""Tests for the ``runindex`` module."""
+
+import os
+import shutil
+
+from turbinedaq.runindex import MANIFEST_FNAME, RunIndex
+
+
+def save_run(rawdir, section, nrun):
+    rundir = rawdir / section / str(nrun)
+    rundir.mkdir(parents=True)
+    (rundir / "metadata.json").write_text("{}")
+
+
+def test_runindex(tmp_path):
+    rawdir = tmp_path / "data" / "raw"
+    save_run(rawdir, "perf-0.8", 0)
+    save_run(rawdir, "perf-0.8", 1)
+    # A run that was started but never saved
+    (rawdir / "perf-0.8" / "2").mkdir()
+    save_run(rawdir, "tare-drag", 0)
+    index = RunIndex(str(rawdir))
+    assert index.done_runs("perf-0.8") == {0, 1}
+    assert index.is_done("tare-drag", "0")
+    assert not index.is_done("perf-0.8", 2)
+    assert not index.is_done("perf-1.0", 0)
+    assert os.path.isfile(rawdir / MANIFEST_FNAME)
+    # Saved runs are added without rescanning
+    (rawdir / "perf-0.8" / "2" / "metadata.json").write_text("{}")
+    index.mark_done("perf-0.8", 2)
+    assert not index.refresh()
+    # The manifest is used by the next session
+    index = RunIndex(str(rawdir))
+    assert index.done_runs("perf-0.8") == {0, 1, 2}
+    # Deleting a run so it's redone is picked up
+    shutil.rmtree(rawdir / "perf-0.8" / "1")
+    assert index.refresh()
+    assert index.done_runs("perf-0.8") == {0, 2}
+    shutil.rmtree(rawdir / "tare-drag")
+    index.refresh()
+    assert index.done_runs("tare-drag") == set()
+
+
+def test_runindex_no_data(tmp_path):
+    index = RunIndex(str(tmp_path / "data" / "raw"))
+    assert not index.is_done("perf-0.8", 0)
+    assert not os.path.exists(tmp_path / "data")
+
+
+def test_runindex_saved_into_existing_dir(tmp_path):
+    rawdir = tmp_path / "data" / "raw"
+    # Runs are saved into directories created before they start
+    (rawdir / "perf-0.8" / "0").mkdir(parents=True)
+    index = RunIndex(str(rawdir))
+    assert not index.is_done("perf-0.8", 0)
+    (rawdir / "perf-0.8" / "0" / "metadata.json").write_text("{}")
+    # A new session using the manifest picks up the saved run too
+    assert RunIndex(str(rawdir)).is_done("perf-0.8", 0)
+    assert index.refresh()
+    assert index.is_done("perf-0.8", 0)
+    assert not index.refresh()
+
+
+def test_runindex_metadata_deleted(tmp_path):
+    rawdir = tmp_path / "data" / "raw"
+    save_run(rawdir, "perf-0.8", 0)
+    save_run(rawdir, "perf-0.8", 1)
+    index = RunIndex(str(rawdir))
+    # Deleting only the metadata doesn't change the section directory
+    os.remove(rawdir / "perf-0.8" / "1" / "metadata.json")
+    assert index.refresh()
+    assert index.done_runs("perf-0.8") == {0}
+    assert not RunIndex(str(rawdir)).is_done("perf-0.8", 1)
+    # Saving it again is picked up too
+    (rawdir / "perf-0.8" / "1" / "metadata.json").write_text("{}")
+    assert index.refresh()
+    assert index.done_runs("perf-0.8") == {0, 1}
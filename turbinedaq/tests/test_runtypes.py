@@ -0,0 +1,92 @@
+"""Tests for the ``runtypes`` module."""
+
+import os
+import time
+
+import pytest
+from acspy import acsc
+
+from turbinedaq.engine import RunEngine
+from turbinedaq.runtypes import TurbineTow, wait_program_end
+
+
+@pytest.fixture
+def acs_hcomm():
+    hc = acsc.open_comm_simulator()
+    yield hc
+    acsc.closeComm(hc)
+
+
+def test_turbinetow_arm(acs_hcomm, monkeypatch):
+    # ACSPL+ programs are loaded relative to the repo root
+    monkeypatch.chdir("..")
+    run = TurbineTow(
+        acs_hcomm,
+        U=1.0,
+        tsr=2.0,
+        y_R=0.2,
+        z_H=0.1,
+        turbine_properties={"kind": "CFT", "radius": 0.5, "height": 1.0},
+    )
+    run.vec_settle_time = 0.1
+    run.recordvno = False
+    assert run.arm()
+    assert run.daqthread.armed.is_set()
+    assert run.vec.state == "Confirmation mode"
+    assert acsc.getFPosition(acs_hcomm, 0) == pytest.approx(0.1, abs=1e-3)
+    assert acsc.getFPosition(acs_hcomm, 1) == pytest.approx(0.1, abs=1e-3)
+    run.disarm()
+    run.daqthread.wait()
+
+
+def test_turbinetow_arm_failed(acs_hcomm, monkeypatch, tmp_path):
+    monkeypatch.chdir("..")
+    monkeypatch.setattr(TurbineTow, "arm", lambda self: False)
+    tpdir = tmp_path / "config" / "test-plan"
+    tpdir.mkdir(parents=True)
+    (tpdir / "perf.csv").write_text("run,tow_speed,tsr,vectrino\n0,1,2,0\n")
+    engine = RunEngine(str(tmp_path), hc=acs_hcomm, wait=False)
+    acsc.enable(acs_hcomm, 5)
+    finished = []
+    create_run = engine.create_run
+
+    def create_run_connected(section, nrun):
+        run = create_run(section, nrun)
+        run.towfinished.connect(lambda: finished.append(True))
+        return run
+
+    monkeypatch.setattr(engine, "create_run", create_run_connected)
+    assert engine.run_section("perf") == 1
+    assert engine.run.arm_failed
+    assert finished
+    # Nothing is saved, so the run is still to be done
+    assert not os.path.isdir(engine.rundir("perf", 0))
+    assert engine.next_run("perf") == 0
+
+
+def test_turbinetow_blank_acs_settings(acs_hcomm, monkeypatch):
+    monkeypatch.chdir("..")
+    # Blank test plan cells are read as NaN
+    run = TurbineTow(
+        acs_hcomm,
+        U=1.0,
+        tsr=2.0,
+        y_R=None,
+        z_H=None,
+        turbine_properties={"kind": "CFT", "radius": 0.5, "height": 1.0},
+        vectrino=False,
+        acs_sample_rate=float("nan"),
+        acs_bufflen=float("nan"),
+    )
+    assert run.acs_sample_rate == 1000
+    assert run.acs_bufflen == 100
+    assert "sample_period_ms = 1.0" in run.acs_prg
+
+
+def test_wait_program_end(acs_hcomm):
+    acsc.loadBuffer(acs_hcomm, 19, "WAIT 300\nSTOP")
+    acsc.runBuffer(acs_hcomm, 19)
+    tstart = time.time()
+    wait_program_end(acs_hcomm, 19, poll_ms=50)
+    assert time.time() - tstart > 0.2
+    assert acsc.getProgramState(acs_hcomm, 19) != 3
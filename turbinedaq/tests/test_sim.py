@@ -0,0 +1,170 @@
+"""Tests for the simulated hardware backends."""
+
+import time
+
+import numpy as np
+import pytest
+
+from turbinedaq import sim
+from turbinedaq.sim.controller import AcscError, parse_program
+
+
+@pytest.fixture
+def acs_hcomm():
+    with sim.simulated():
+        from acspy import acsc
+
+        hc = acsc.open_comm_simulator()
+        yield hc
+        acsc.closeComm(hc)
+
+
+def wait_for_program(acsc, hc, nbuf, timeout=10.0):
+    tstart = time.time()
+    while acsc.getProgramState(hc, nbuf) == 3:
+        assert time.time() - tstart < timeout
+        time.sleep(0.01)
+
+
+def test_parse_program():
+    statements = parse_program("if x = 1\n  y = 2\nelse\n  y = 3\nend")
+    kinds = [s[0] for s in statements]
+    assert kinds == ["if", "assign", "else", "assign", "end"]
+    with pytest.raises(AcscError):
+        parse_program("while 1\n")
+    with pytest.raises(AcscError):
+        parse_program("frobnicate 4")
+
+
+def test_interpreter(acs_hcomm):
+    from acspy import acsc
+
+    prg = """
+    global int count, branch
+    global real total, arr(3)
+    local real x
+    x = 0.5
+    WHILE count < 5
+        count = count + 1
+        total = total + x
+    END
+    if count <> 5 & total = 2.5
+        branch = 1
+    else
+        branch = 2
+    end
+    arr(1) = TIME
+    STOP
+    """
+    acsc.loadBuffer(acs_hcomm, 1, prg)
+    # Let the controller clock advance past zero
+    time.sleep(0.01)
+    acsc.runBuffer(acs_hcomm, 1)
+    wait_for_program(acsc, acs_hcomm, 1)
+    assert acsc.readInteger(acs_hcomm, acsc.NONE, "count") == 5
+    assert acsc.readReal(acs_hcomm, acsc.NONE, "total") == 2.5
+    assert acsc.readInteger(acs_hcomm, acsc.NONE, "branch") == 2
+    assert acsc.readReal(acs_hcomm, acsc.NONE, "arr", 1, 1)[0] > 0
+
+
+def test_wait_program_end(acs_hcomm):
+    from acspy import acsc
+
+    acsc.loadBuffer(acs_hcomm, 19, "WAIT 200\nSTOP")
+    acsc.runBuffer(acs_hcomm, 19)
+    with pytest.raises(AcscError):
+        acsc.waitProgramEnd(acs_hcomm, 19, timeout=10)
+    tstart = time.time()
+    acsc.waitProgramEnd(acs_hcomm, 19)
+    assert acsc.getProgramState(acs_hcomm, 19) != 3
+    assert time.time() - tstart < 0.3
+    # Stopping the buffer ends the wait too
+    acsc.runBuffer(acs_hcomm, 19)
+    acsc.stopBuffer(acs_hcomm, 19)
+    acsc.waitProgramEnd(acs_hcomm, 19, timeout=100)
+
+
+def test_motion(acs_hcomm):
+    from acspy import acsc
+
+    acsc.enable(acs_hcomm, 5)
+    acsc.setVelocity(acs_hcomm, 5, 2.0)
+    acsc.toPoint(acs_hcomm, None, 5, 0.5)
+    time.sleep(0.05)
+    assert acsc.getMotorState(acs_hcomm, 5)["moving"]
+    tstart = time.time()
+    while not acsc.getMotorState(acs_hcomm, 5)["in position"]:
+        assert time.time() - tstart < 5
+        time.sleep(0.01)
+    assert acsc.getRPosition(acs_hcomm, 5) == 0.5
+    with pytest.raises(AcscError):
+        acsc.toPoint(acs_hcomm, None, 4, 1.0)
+
+
+def test_data_collection(acs_hcomm):
+    from acspy import acsc
+
+    prg = """
+    global real data(3)(100)
+    global int collect_data
+    collect_data = 1
+    DC/c data, 100, 2, TIME, RVEL(5), FVEL(4)
+    TILL collect_data = 0
+    STOPDC
+    STOP
+    """
+    acsc.loadBuffer(acs_hcomm, 19, prg)
+    acsc.runBuffer(acs_hcomm, 19)
+    time.sleep(0.5)
+    data = acsc.readReal(acs_hcomm, acsc.NONE, "data", 0, 2, 0, 99)
+    acsc.writeInteger(acs_hcomm, "collect_data", 0)
+    wait_for_program(acsc, acs_hcomm, 19)
+    # The buffer is filled cyclically, so sample times are 2 ms apart except
+    # where the newest sample wrapped around
+    dt = np.diff(data[0])
+    assert np.sum(dt != 2.0) <= 1
+
+
+def test_nidaqmx_task():
+    with sim.simulated():
+        import daqmx
+        import nidaqmx
+        from nidaqmx.stream_readers import AnalogMultiChannelReader
+        from nidaqmx.system.storage.persisted_channel import (
+            PersistedChannel,
+        )
+
+        task = nidaqmx.Task("analog-inputs")
+        task.add_global_channels([PersistedChannel("torque_trans")])
+        daqmx.CfgSampClkTiming(
+            task._handle, "", 2000, daqmx.Val_Rising, daqmx.Val_ContSamps, 200
+        )
+        reader = AnalogMultiChannelReader(task.in_stream)
+        data = np.zeros((1, 200))
+        nsamps = []
+
+        def every_n_samples(handle, event_type, n, callback_data):
+            nsamps.append(reader.read_many_sample(data, n))
+            return 0
+
+        task.register_every_n_samples_acquired_into_buffer_event(
+            sample_interval=200, callback_method=every_n_samples
+        )
+        task.start()
+        time.sleep(0.55)
+        task.close()
+        assert 4 <= len(nsamps) <= 6
+        assert set(nsamps) == {200}
+
+
+def test_acsdaqthread(acs_hcomm):
+    from turbinedaq.daqtasks import AcsDaqThread
+
+    thread = AcsDaqThread(acs_hcomm, makeprg=True)
+    thread.start()
+    time.sleep(1.0)
+    thread.stop()
+    thread.wait()
+    t = thread.data["time"]
+    assert len(t) > 500
+    assert np.all(np.diff(t) > 0)
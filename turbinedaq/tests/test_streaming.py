@@ -0,0 +1,31 @@
+"""Tests for the ``streaming`` module."""
+
+import numpy as np
+import pytest
+from pxl import fdiff
+from pxl import timeseries as ts
+
+from turbinedaq.buffers import DataBuffer
+from turbinedaq.streaming import SmoothedDerivative
+
+
+@pytest.mark.parametrize("nsamps", [3, 200])
+def test_smoothed_derivative_matches_batch(nsamps):
+    sr = 2000
+    rng = np.random.default_rng(0)
+    angle = np.cumsum(rng.uniform(0, 0.5, size=20 * nsamps + 37))
+    data = DataBuffer(["time", "turbine_angle", "turbine_rpm"])
+    calc = SmoothedDerivative(scale=6.0, window=8)
+    for i0 in range(0, len(angle), nsamps):
+        block = angle[i0 : i0 + nsamps]
+        nt = len(data["time"])
+        data.append(
+            "time", np.arange(nt, nt + len(block), dtype=float) / sr
+        )
+        data.append("turbine_angle", block)
+        start, rpm = calc.update(data["turbine_angle"], data["time"])
+        data.put("turbine_rpm", start, rpm)
+    t = np.arange(len(angle), dtype=float) / sr
+    batch = ts.smooth(fdiff.second_order_diff(angle, t) / 6.0, 8)
+    assert np.array_equal(data["time"], t)
+    assert np.array_equal(data["turbine_rpm"], batch)
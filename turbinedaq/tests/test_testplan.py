@@ -0,0 +1,124 @@
+"""Tests for the ``testplan`` module."""
+
+import pandas as pd
+import pytest
+from PyQt5 import QtCore
+
+from turbinedaq import testplan
+from turbinedaq.runindex import RunIndex
+
+
+def test_testplanmodel(tmp_path):
+    rawdir = tmp_path / "data" / "raw"
+    (rawdir / "perf-0.8" / "1").mkdir(parents=True)
+    (rawdir / "perf-0.8" / "1" / "metadata.json").write_text("{}")
+    df = pd.DataFrame(
+        {"run": [0, 1, 2], "tow_speed": [0.8, 0.8, 0.8], "tsr": [1, 2, 3]}
+    )
+    model = testplan.TestPlanModel()
+    assert model.rowCount() == 0
+    model.set_section("perf-0.8", df, RunIndex(str(rawdir)))
+    assert model.rowCount() == 3
+    assert model.columnCount() == 4
+    assert model.headerData(3, QtCore.Qt.Horizontal) == "Done?"
+    assert model.data(model.index(2, 2)) == "3"
+    assert model.data(model.index(0, 3)) == "No"
+    assert model.data(model.index(1, 3)) == "Yes"
+    assert model.data(model.index(1, 0), QtCore.Qt.BackgroundRole) is not None
+    assert model.data(model.index(0, 0), QtCore.Qt.BackgroundRole) is None
+    model.clear()
+    assert model.rowCount() == 0
+
+
+def test_runscheduler(tmp_path):
+    rawdir = tmp_path / "data" / "raw"
+    (rawdir / "perf" / "1").mkdir(parents=True)
+    (rawdir / "perf" / "1" / "metadata.json").write_text("{}")
+    df = pd.DataFrame(
+        {"run": [0, 1, 2, 3, 4], "tow_speed": [1.0, 0.5, 1.0, 0.5, 0.8]}
+    )
+    scheduler = testplan.RunScheduler("perf", df, RunIndex(str(rawdir)))
+    assert len(scheduler) == 4
+    # The next run stays queued until it's done
+    assert scheduler.peek() == 0
+    assert scheduler.peek() == 0
+    scheduler.mark_done(0)
+    scheduler.mark_done(3)
+    assert scheduler.peek() == 2
+    scheduler.reorder("tow_speed")
+    assert list(scheduler.pending) == [4, 2]
+    assert scheduler.pop() == 4
+    assert scheduler.pop() == 2
+    assert scheduler.pop() is None
+    assert scheduler.done
+
+
+def test_load_settling_times():
+    settling_time = testplan.load_settling_times(
+        "../example/config/settling_times.csv"
+    )
+    assert settling_time(0.3) == 135
+    # Speeds outside the table are clamped to its ends
+    assert settling_time(0.1) == 120
+    assert settling_time(2.0) == 520
+
+
+def test_optimize_order():
+    df = pd.DataFrame(
+        {"run": [0, 1, 2, 3], "tow_speed": [1.0, 1.4, 0.6, 1.4], "tsr": 2.0}
+    )
+
+    def settling_time(U):
+        return 200 * U
+
+    assert testplan.idle_time("perf", df.iloc[1], settling_time) == 280
+    assert testplan.idle_time("settling", df.iloc[1], settling_time) == 5
+    assert testplan.idle_time("tare-drag", df.iloc[1], settling_time) == 120
+    runs = [0, 1, 2, 3]
+    order = testplan.optimize_order("perf", df, runs, settling_time)
+    # The last of the slowest settling runs is already last
+    assert order == runs
+    order = testplan.optimize_order("perf", df, [3, 0, 2], settling_time)
+    assert order == [0, 2, 3]
+    baseline = testplan.predict_duration("perf", df, [3, 0, 2], settling_time)
+    predicted = testplan.predict_duration("perf", df, order, settling_time)
+    assert baseline - predicted == pytest.approx(280 - 120)
+    scheduler = testplan.RunScheduler("perf", df)
+    scheduler.mark_done(1)
+    scheduler.set_order([3, 0])
+    assert scheduler.runs() == [3, 0, 2]
+
+
+def test_planscheduler(tmp_path):
+    rawdir = tmp_path / "data" / "raw"
+    df = pd.DataFrame({"run": [0, 1, 2]})
+    plan_scheduler = testplan.PlanScheduler({"perf": df}, RunIndex(rawdir))
+    plan_scheduler.set_order("perf", [2, 1, 0])
+    (rawdir / "perf" / "2").mkdir(parents=True)
+    (rawdir / "perf" / "2" / "metadata.json").write_text("{}")
+    # The order is kept when runs saved elsewhere are picked up
+    assert plan_scheduler.refresh()
+    assert plan_scheduler.get("perf").runs() == [1, 0]
+    plan_scheduler.mark_done("perf", 1)
+    assert plan_scheduler.get("perf").peek() == 0
+    assert plan_scheduler.run_index.is_done("perf", 1)
+
+
+def test_run_params():
+    turbine_properties = {"RVAT": {"radius": 0.5}, "RM2": {"radius": 0.54}}
+    row = pd.Series({"run": 0, "tow_speed": 0.8, "rpm": 60.0, "revs": 2.0})
+    assert testplan.run_params("tare-drag", row, turbine_properties) == (
+        "tare drag",
+        {"U": 0.8},
+    )
+    kind, params = testplan.run_params("tare-torque", row, turbine_properties)
+    assert kind == "tare torque"
+    assert params == {"rpm": 60.0, "dur": 2.0}
+    row = pd.Series({"run": 0, "tow_speed": 1.0, "tsr": 2.0, "vectrino": 0})
+    kind, params = testplan.run_params("perf-1.0", row, turbine_properties)
+    assert kind == "turbine tow"
+    assert params["turbine"] == "RVAT"
+    assert params["y_R"] is None
+    assert params["acs_sample_rate"] == 1000
+    assert params["ni_sample_rate"] is None
+    assert not params["settling"]
@@ -0,0 +1,74 @@
+"""Tests for the ``timing`` module."""
+
+import time
+
+import numpy as np
+
+from turbinedaq.timing import TimingRegistry, TimingRing
+
+
+def test_timingring():
+    ring = TimingRing(capacity=4)
+    start, duration = ring.snapshot()
+    assert len(start) == len(duration) == 0
+    for n in range(6):
+        ring.record(float(n), n / 1000)
+    start, duration = ring.snapshot()
+    assert np.all(start == [2.0, 3.0, 4.0, 5.0])
+    assert np.all(duration == np.array([2, 3, 4, 5]) / 1000)
+    assert ring.count == 6
+    assert ring.dropped() == 2
+    # The dropped events started before 2.0
+    assert ring.dropped(since=1.5) == 2
+    assert ring.dropped(since=2.5) == 0
+
+
+def test_timingregistry_dropped():
+    registry = TimingRegistry(capacity=4)
+    for n in range(6):
+        registry.record("callback", 100.0 + n, 0.001)
+    registry.record("poll", 100.0, 0.001)
+    summary = registry.summary(since=100.0)
+    assert summary["callback"]["count"] == 4
+    assert summary["callback"]["dropped"] == 2
+    assert summary["poll"]["dropped"] == 0
+    report = registry.report(since=103.0)
+    assert report["Summary"]["callback"]["dropped"] == 0
+
+
+def test_timingregistry():
+    registry = TimingRegistry()
+
+    @registry.timed("callback")
+    def callback(x):
+        time.sleep(0.01)
+        return x
+
+    for n in range(3):
+        assert callback(n) == n
+    with registry.measure("poll"):
+        pass
+    summary = registry.summary()
+    assert summary["callback"]["count"] == 3
+    assert summary["callback"]["mean_ms"] >= 10
+    assert summary["callback"]["max_interval_ms"] >= 10
+    assert summary["poll"]["count"] == 1
+    assert summary["poll"]["max_interval_ms"] is None
+
+
+def test_timingregistry_report():
+    registry = TimingRegistry()
+    registry.record("callback", 100.0, 0.002)
+    registry.record("callback", 101.0, 0.004)
+    registry.record("callback", 102.5, 0.006)
+    registry.record("poll", 100.5, 0.001)
+    report = registry.report(since=101.0)
+    assert report["Start time"] == 101.0
+    assert report["Events"]["callback"]["start"] == [0.0, 1.5]
+    assert report["Events"]["callback"]["duration_ms"] == [4.0, 6.0]
+    assert report["Events"]["poll"]["start"] == []
+    assert "poll" not in report["Summary"]
+    assert report["Summary"]["callback"]["max_ms"] == 6.0
+    assert report["Summary"]["callback"]["max_interval_ms"] == 1500.0
+    registry.clear()
+    assert registry.summary() == {}
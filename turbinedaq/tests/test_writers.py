@@ -0,0 +1,84 @@
+"""Tests for the ``writers`` module."""
+
+import json
+import time
+
+import h5py
+import numpy as np
+
+from turbinedaq.buffers import DataBuffer
+from turbinedaq.writers import HdfStreamWriter, SaveThread, savehdf
+
+
+def test_hdfstreamwriter(tmp_path):
+    data = DataBuffer(["time", "x", "turbine_rpm"])
+    writer = HdfStreamWriter(
+        str(tmp_path),
+        {"nidata.h5": data},
+        interval=0.05,
+        chunksize=16,
+        exclude={"nidata.h5": ["turbine_rpm"]},
+    )
+    writer.start()
+    for n in range(5):
+        data.append("time", np.arange(n * 10, (n + 1) * 10) / 10.0)
+        data.append("x", np.ones(10) * n)
+        data.append("turbine_rpm", np.zeros(10))
+        time.sleep(0.06)
+    writer.finish()
+    with h5py.File(tmp_path / "nidata.h5", "r") as f:
+        assert np.all(f["data/time"][:] == data["time"])
+        assert np.all(f["data/x"][:] == data["x"])
+        assert "turbine_rpm" not in f["data"]
+
+
+def test_savehdf_compressed(tmp_path):
+    fpath = tmp_path / "nidata.h5"
+    data = {"time": np.arange(100) / 10.0, "drag_left": np.ones(100)}
+    savehdf(fpath, data, fmt="hdf5-gzip-float32", float32_keys=["drag_left"])
+    with h5py.File(fpath, "r") as f:
+        assert f["data/time"].dtype == np.float64
+        assert f["data/time"].compression == "gzip"
+        assert f["data/drag_left"].dtype == np.float32
+        assert np.all(f["data/drag_left"][:] == 1.0)
+
+
+def test_savethread(tmp_path):
+    savedir = str(tmp_path / "run")
+    rawdata = {
+        "acsdata.h5": {"time": np.arange(10) / 10.0},
+        "nidata.h5": {"time": np.arange(20) / 20.0, "drag_left": np.ones(20)},
+    }
+    thread = SaveThread(
+        savedir,
+        rawdata,
+        {"Tow speed (m/s)": 1.0},
+        fmt="hdf5-gzip-float32",
+        float32_keys={"nidata.h5": ["drag_left"]},
+    )
+    thread.start()
+    thread.wait()
+    assert thread.error is None
+    with open(tmp_path / "run" / "metadata.json") as f:
+        assert json.load(f) == {"Tow speed (m/s)": 1.0}
+    with h5py.File(tmp_path / "run" / "nidata.h5", "r") as f:
+        assert f["data/drag_left"].dtype == np.float32
+        assert len(f["data/time"]) == 20
+    with h5py.File(tmp_path / "run" / "acsdata.h5", "r") as f:
+        assert np.all(f["data/time"][:] == rawdata["acsdata.h5"]["time"])
+
+
+def test_savethread_timing_report(tmp_path):
+    savedir = str(tmp_path / "run")
+    thread = SaveThread(
+        savedir,
+        {"acsdata.h5": {"time": np.arange(10) / 10.0}},
+        {},
+        timing_since=time.time(),
+    )
+    thread.start()
+    thread.wait()
+    assert thread.error is None
+    with open(tmp_path / "run" / "timing.json") as f:
+        report = json.load(f)
+    assert report["Summary"]["Save"]["count"] == 1
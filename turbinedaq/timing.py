@@ -0,0 +1,210 @@
+"""Timing instrumentation for the acquisition hot paths.
+
+Each timed event, e.g., an NI callback or an ACS poll, records its start
+time and duration in a fixed size ring buffer for its name. Each event name
+is only recorded by one thread at a time, e.g., the NI callback thread or
+the GUI thread, so each ring has a single writer and recording doesn't need
+a lock. The module-level ``registry`` collects all the rings so they can be
+summarized live or dumped as a per-run report. Events overwritten before
+they're summarized are counted as dropped, so a report covering more events
+than fit in the ring says so rather than silently covering only the latest.
+"""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# Number of events kept for each event name
+DEFAULT_CAPACITY = 4096
+
+# File name of the timing report saved with each run
+REPORT_FNAME = "timing.json"
+
+
+def summarize(events, dropped=None):
+    """Return a dict of statistics for each event name from a dict of start
+    times and durations.
+
+    Durations are in ms. The maximum interval between the starts of
+    consecutive events shows when a periodic task, e.g., the NI callback, was
+    late. ``dropped`` optionally maps event names to the number of events
+    that were overwritten and aren't included in the statistics.
+    """
+    if dropped is None:
+        dropped = {}
+    summary = {}
+    for name, (start, duration) in events.items():
+        if not len(start):
+            continue
+        duration = duration * 1000
+        interval = np.diff(start) * 1000
+        summary[name] = {
+            "count": len(start),
+            "mean_ms": float(np.mean(duration)),
+            "p50_ms": float(np.percentile(duration, 50)),
+            "p95_ms": float(np.percentile(duration, 95)),
+            "p99_ms": float(np.percentile(duration, 99)),
+            "max_ms": float(np.max(duration)),
+            "max_interval_ms": (
+                float(np.max(interval)) if len(interval) else None
+            ),
+            "dropped": dropped.get(name, 0),
+        }
+    return summary
+
+
+class TimingRing(object):
+    """Ring buffer of event start times and durations for a single writer.
+
+    Parameters
+    ----------
+    capacity : int
+        Number of events to keep. Older events are overwritten.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.start = np.zeros(capacity)
+        self.duration = np.zeros(capacity)
+        self.count = 0
+
+    def record(self, start, duration):
+        i = self.count % self.capacity
+        self.start[i] = start
+        self.duration[i] = duration
+        # Increment the count last so readers never see unwritten events
+        self.count += 1
+
+    def snapshot(self):
+        """Return copies of the start times and durations of the events in
+        the buffer, oldest first.
+        """
+        count = self.count
+        n = min(count, self.capacity)
+        index = np.arange(count - n, count) % self.capacity
+        return self.start[index], self.duration[index]
+
+    def dropped(self, since=None):
+        """Return the number of events that have been overwritten, or 0 if
+        all events that started at or after ``since`` are still in the buffer.
+
+        The count includes every overwritten event, so it's an upper bound on
+        those that started after ``since``.
+        """
+        count = self.count
+        ndropped = count - self.capacity
+        if ndropped <= 0:
+            return 0
+        # The oldest event still in the buffer
+        oldest = self.start[count % self.capacity]
+        if since is not None and oldest < since:
+            return 0
+        return ndropped
+
+
+class TimingRegistry(object):
+    """Collection of timing rings keyed by event name."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.rings = {}
+        self.lock = threading.Lock()
+
+    def ring(self, name):
+        ring = self.rings.get(name)
+        if ring is None:
+            # Only creating a ring needs the lock
+            with self.lock:
+                ring = self.rings.setdefault(name, TimingRing(self.capacity))
+        return ring
+
+    def record(self, name, start, duration):
+        """Record an event that started at time ``start`` (s since the
+        epoch) and took ``duration`` seconds.
+        """
+        self.ring(name).record(start, duration)
+
+    @contextmanager
+    def measure(self, name):
+        """Context manager that records the time taken by its body."""
+        start = time.time()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter() - t0)
+
+    def timed(self, name):
+        """Decorator that records the time taken by each call of a
+        function.
+        """
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.measure(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def events(self, since=None, until=None):
+        """Return a dict of the start times and durations of the events
+        for each name, optionally only those that started between ``since``
+        and ``until``.
+        """
+        with self.lock:
+            rings = list(self.rings.items())
+        events = {}
+        for name, ring in rings:
+            start, duration = ring.snapshot()
+            keep = np.ones(len(start), dtype=bool)
+            if since is not None:
+                keep &= start >= since
+            if until is not None:
+                keep &= start <= until
+            events[name] = (start[keep], duration[keep])
+        return events
+
+    def dropped(self, since=None):
+        """Return a dict of the number of events overwritten for each name
+        that may have started after ``since``.
+        """
+        with self.lock:
+            rings = list(self.rings.items())
+        return {name: ring.dropped(since) for name, ring in rings}
+
+    def summary(self, since=None, until=None):
+        """Return a dict of statistics for each event name."""
+        return summarize(self.events(since, until), self.dropped(since))
+
+    def report(self, since=None, until=None):
+        """Return a JSON serializable report of the summary and all events,
+        with start times in seconds relative to ``since``.
+        """
+        events = self.events(since, until)
+        t0 = since if since is not None else 0.0
+        return {
+            "Start time": since,
+            "Summary": summarize(events, self.dropped(since)),
+            "Events": {
+                name: {
+                    "start": np.round(start - t0, 6).tolist(),
+                    "duration_ms": np.round(duration * 1000, 4).tolist(),
+                }
+                for name, (start, duration) in events.items()
+            },
+        }
+
+    def clear(self):
+        with self.lock:
+            self.rings = {}
+
+
+registry = TimingRegistry()
+measure = registry.measure
+timed = registry.timed
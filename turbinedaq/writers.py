@@ -0,0 +1,304 @@
+"""Writers for saving raw data to disk."""
+
+import json
+import os
+import subprocess
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import h5py
+import numpy as np
+from PyQt5 import QtCore
+
+from turbinedaq import timing
+
+# Raw data formats that can be selected for each working directory. The
+# default "hdf5" format is plain float64 datasets, as written by
+# ``pxl.timeseries.savehdf``. The others store chunked datasets filtered with
+# shuffle and gzip, optionally storing analog channels as float32, which is
+# enough for the 24-bit resolution of the DAQ.
+RAW_DATA_FORMATS = {
+    "hdf5": {},
+    "hdf5-gzip": {"compression": "gzip", "compression_opts": 4},
+    "hdf5-gzip-float32": {
+        "compression": "gzip",
+        "compression_opts": 4,
+        "float32": True,
+    },
+}
+
+
+def dataset_kwargs(fmt):
+    """Return HDF5 dataset creation keyword arguments for a raw data format."""
+    opts = RAW_DATA_FORMATS[fmt]
+    if "compression" not in opts:
+        return {}
+    return {
+        "compression": opts["compression"],
+        "compression_opts": opts["compression_opts"],
+        "shuffle": True,
+    }
+
+
+def storage_dtype(fmt, key, dtype, float32_keys=()):
+    """Return the data type used to store a column in a raw data format."""
+    if RAW_DATA_FORMATS[fmt].get("float32") and key in float32_keys:
+        return np.dtype(np.float32)
+    return np.dtype(dtype)
+
+
+def savehdf(fpath, datadict, fmt="hdf5", float32_keys=(), chunksize=16384):
+    """Save a dict of arrays to the ``data`` group of an HDF5 file using one
+    of the raw data formats.
+    """
+    kwargs = dataset_kwargs(fmt)
+    with h5py.File(fpath, "a") as f:
+        group = f.require_group("data")
+        for key, value in datadict.items():
+            value = np.asarray(value)
+            dtype = storage_dtype(fmt, key, value.dtype, float32_keys)
+            value = value.astype(dtype)
+            if key in group:
+                del group[key]
+            if kwargs and value.size:
+                group.create_dataset(
+                    key,
+                    data=value,
+                    chunks=(min(chunksize, value.size),),
+                    **kwargs,
+                )
+            else:
+                group.create_dataset(key, data=value)
+
+
+def save_raw_data(savedir, fname, datadict, fmt="hdf5", float32_keys=()):
+    """Save a dict of raw data to ``savedir``, creating it if necessary."""
+    if not os.path.isdir(savedir):
+        os.makedirs(savedir)
+    savehdf(
+        os.path.join(savedir, fname),
+        datadict,
+        fmt=fmt,
+        float32_keys=float32_keys,
+    )
+
+
+class HdfStreamWriter(QtCore.QThread):
+    """Thread that periodically appends newly acquired data to HDF5 files.
+
+    Each source is a mapping of column names to growing arrays, e.g., the
+    ``data`` attribute of one of the DAQ threads. Every ``interval`` seconds,
+    samples that haven't been written yet are appended to resizable, chunked
+    datasets, so data are on disk as the run progresses and there is little
+    left to save when it ends. Files use the same layout as
+    ``pxl.timeseries.savehdf``, i.e., one dataset per column in the ``data``
+    group, so they can be read with ``pxl.timeseries.loadhdf``.
+
+    Parameters
+    ----------
+    savedir : str
+        Directory in which to create the files.
+    sources : dict
+        Mapping of file names, e.g., ``"nidata.h5"``, to data mappings.
+    interval : float
+        Time in seconds between writes.
+    chunksize : int
+        Number of samples per HDF5 chunk.
+    exclude : dict
+        Mapping of file names to lists of columns that should not be saved,
+        e.g., derived quantities.
+    fmt : str
+        Raw data format, i.e., a key of ``RAW_DATA_FORMATS``.
+    float32_keys : dict
+        Mapping of file names to lists of columns that may be stored as
+        float32 if the format allows.
+    """
+
+    finished_writing = QtCore.pyqtSignal()
+
+    def __init__(
+        self,
+        savedir,
+        sources,
+        interval=1.0,
+        chunksize=4096,
+        exclude={},
+        fmt="hdf5",
+        float32_keys={},
+    ):
+        QtCore.QThread.__init__(self)
+        self.savedir = savedir
+        self.sources = sources
+        self.interval = interval
+        self.chunksize = chunksize
+        self.exclude = exclude
+        self.fmt = fmt
+        self.float32_keys = float32_keys
+        self.writing = True
+        self.files = {}
+        self.nwritten = {fname: {} for fname in sources}
+
+    def open(self):
+        if not os.path.isdir(self.savedir):
+            os.makedirs(self.savedir)
+        for fname in self.sources:
+            fpath = os.path.join(self.savedir, fname)
+            self.files[fname] = h5py.File(fpath, "w")
+            self.files[fname].create_group("data")
+
+    def create_dataset(self, group, key, dtype):
+        return group.create_dataset(
+            key,
+            shape=(0,),
+            maxshape=(None,),
+            chunks=(self.chunksize,),
+            dtype=dtype,
+            **dataset_kwargs(self.fmt),
+        )
+
+    def flush(self):
+        """Write all samples collected since the last flush."""
+        for fname, source in self.sources.items():
+            group = self.files[fname]["data"]
+            nwritten = self.nwritten[fname]
+            exclude = self.exclude.get(fname, [])
+            for key in list(source.keys()):
+                if key in exclude:
+                    continue
+                n0 = nwritten.get(key, 0)
+                new = np.asarray(source[key][n0:])
+                if key not in group:
+                    dtype = storage_dtype(
+                        self.fmt,
+                        key,
+                        new.dtype if new.size else np.float64,
+                        self.float32_keys.get(fname, []),
+                    )
+                    self.create_dataset(group, key, dtype)
+                if not new.size:
+                    continue
+                dset = group[key]
+                dset.resize((n0 + new.size,))
+                dset[n0:] = new
+                nwritten[key] = n0 + new.size
+            self.files[fname].flush()
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        self.files = {}
+
+    def run(self):
+        self.open()
+        try:
+            while self.writing:
+                tnext = time.time() + self.interval
+                while self.writing and time.time() < tnext:
+                    time.sleep(0.05)
+                self.flush()
+        finally:
+            self.close()
+        self.finished_writing.emit()
+
+    def stop(self):
+        self.writing = False
+
+    def finish(self):
+        """Stop the thread, waiting for the final write to complete."""
+        self.stop()
+        self.wait()
+
+
+class SaveThread(QtCore.QThread):
+    """Thread that saves the data from a finished run.
+
+    Raw data files are written concurrently by a thread pool, so saving
+    doesn't block the GUI, and the next run's idle time can overlap with it.
+    The metadata file is written last, since its presence marks a run as
+    done, followed by the timing report if requested, and an optional
+    post-processing command. The ``saved`` signal is emitted with the save
+    directory once everything is complete, whether or not it succeeded, so
+    ``error`` should be checked.
+
+    Parameters
+    ----------
+    savedir : str
+        Directory in which to save the files.
+    rawdata : dict
+        Mapping of file names, e.g., ``"nidata.h5"``, to dicts of arrays.
+    metadata : dict
+        Run metadata to save as ``metadata.json``.
+    fmt : str
+        Raw data format, i.e., a key of ``RAW_DATA_FORMATS``.
+    float32_keys : dict
+        Mapping of file names to lists of columns that may be stored as
+        float32 if the format allows.
+    postcmd : list of str
+        Shell command to run after saving, e.g., to process the run.
+    timing_since : float
+        Start time of the run. If provided, a report of the events recorded
+        in ``timing.registry`` since then, including this save, is written
+        to ``timing.json``.
+    """
+
+    saved = QtCore.pyqtSignal(str)
+
+    def __init__(
+        self,
+        savedir,
+        rawdata,
+        metadata,
+        fmt="hdf5",
+        float32_keys={},
+        postcmd=None,
+        timing_since=None,
+    ):
+        QtCore.QThread.__init__(self)
+        self.savedir = savedir
+        self.rawdata = rawdata
+        self.metadata = metadata
+        self.fmt = fmt
+        self.float32_keys = float32_keys
+        self.postcmd = postcmd
+        self.timing_since = timing_since
+        self.error = None
+
+    def save_file(self, fname):
+        save_raw_data(
+            self.savedir,
+            fname,
+            self.rawdata[fname],
+            fmt=self.fmt,
+            float32_keys=self.float32_keys.get(fname, []),
+        )
+
+    def save(self):
+        if not os.path.isdir(self.savedir):
+            os.makedirs(self.savedir)
+        if self.rawdata:
+            with ThreadPoolExecutor(max_workers=len(self.rawdata)) as pool:
+                # Consume the results so exceptions are raised here
+                list(pool.map(self.save_file, self.rawdata))
+        fpath = os.path.join(self.savedir, "metadata.json")
+        with open(fpath, "w") as fn:
+            json.dump(self.metadata, fn, indent=4, default=str)
+
+    def save_timing_report(self):
+        fpath = os.path.join(self.savedir, timing.REPORT_FNAME)
+        with open(fpath, "w") as fn:
+            json.dump(timing.registry.report(since=self.timing_since), fn)
+
+    def run(self):
+        try:
+            with timing.measure("Save"):
+                self.save()
+            if self.timing_since is not None:
+                self.save_timing_report()
+        except Exception as e:
+            self.error = e
+            traceback.print_exc()
+        else:
+            if self.postcmd is not None:
+                subprocess.call(self.postcmd, shell=True)
+        self.saved.emit(self.savedir)